@@ -1,10 +1,44 @@
 import streamlit as st
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-import yaml
 import json
+import time
+import zipfile
 from dotenv import load_dotenv
 import os
+import re
+
+from lambda_tools.batch import (
+    REPORT_FIELDS, analyze_batch, discover_functions, report_to_csv, report_to_markdown, sort_report
+)
+from lambda_tools.bench import SAMPLE_EVENT_BUILDERS, compare_interpreters, find_interpreters, run_benchmark
+from lambda_tools.cache import cached_invoke, cached_stream, get_response_cache, make_cache_key
+from lambda_tools.costs import (
+    DEFAULT_FIXED_MS, SWEEP_BATCH_SIZES, SWEEP_CONCURRENCIES, SWEEP_MEMORIES, config_batch_size, config_concurrency,
+    estimate, profile_from_benchmark, profile_from_duration, sweep, sweep_rows
+)
+from lambda_tools.llm import get_shared_llm, invoke_concurrently, pool_stats, run_plan
+from lambda_tools.logs import analyze_log_file, format_log_stats
+from lambda_tools.packaging import (
+    DEFAULT_BUDGET_MB, LAMBDA_UNZIPPED_LIMIT_MB, build_project_archive, dependency_report, package_report,
+    requirements_txt
+)
+from lambda_tools.power_tuning import ARCHITECTURE_PRICES, MEMORY_TIERS, STRATEGIES, TIMEOUT_OPTIONS, recommend
+from lambda_tools.profiling import profile_cold_start
+from lambda_tools.prompts import (
+    build_code_prompt, build_generation_prompt, build_improvement_prompt, extract_python_code, plan_analysis,
+    split_generation
+)
+from lambda_tools.sam import (
+    ARCHITECTURES, ASYNC_TRIGGERS, DEFAULT_ARCHITECTURE, DEFAULT_RUNTIME, DEFAULT_SERVICE_NAME,
+    DEFAULT_TARGET_UTILIZATION, RUNTIMES, SQS_DEFAULTS, TRAFFIC_SHIFTING_TYPES, generate_project_template,
+    generate_sam_template, snapstart_blocker, snapstart_enabled, sqs_settings, trigger_errors, validate_config
+)
+from lambda_tools.semantic_cache import generation_scope, get_semantic_cache
+from lambda_tools.skeletons import (
+    DEFAULT_CHUNK_SIZE, SKELETONS, WHOLE_OBJECT_MEMORY_SHARE, fill_skeleton, skeleton_settings, skeletons_for
+)
+from lambda_tools.static_analysis import analyze_handler, check_cold_start_structure, format_findings
+from lambda_tools.tokens import DEFAULT_PROMPT_BUDGET, count_tokens
+from lambda_tools.validation import DEFAULT_MAX_REPAIRS, STATUS_ICONS, failed_stages, validate_and_repair
 
 # Cargar variables de entorno
 load_dotenv()
@@ -12,72 +46,6 @@ load_dotenv()
 ############################
 # Funciones de Generación
 ############################
-def generate_sam_template(config):
-    """Genera el template SAM incluyendo la configuración avanzada."""
-    template = {
-        "AWSTemplateFormatVersion": "2010-09-09",
-        "Transform": "AWS::Serverless-2016-10-31",
-        "Description": "Lambda generada con AWS Lambda Generator Pro",
-        "Resources": {
-            "MyFunction": {
-                "Type": "AWS::Serverless::Function",
-                "Properties": {
-                    "Handler": f"handler.{config['handler_name']}",
-                    "Runtime": "python3.9",
-                    "MemorySize": config["memory"],
-                    "Timeout": config["timeout"],
-                    "Environment": {
-                        "Variables": config.get("env_vars", {})
-                    }
-                }
-            }
-        }
-    }
-    
-    # Añadir configuración avanzada si está presente
-    function_props = template["Resources"]["MyFunction"]["Properties"]
-    
-    # Concurrencia
-    if config.get("concurrency", {}).get("reserved", 0) > 0:
-        function_props["ReservedConcurrentExecutions"] = config["concurrency"]["reserved"]
-    
-    if config.get("concurrency", {}).get("provisioned", 0) > 0:
-        function_props["ProvisionedConcurrencyConfig"] = {
-            "ProvisionedConcurrentExecutions": config["concurrency"]["provisioned"]
-        }
-    
-    # VPC
-    if config.get("vpc", {}).get("enabled"):
-        function_props["VpcConfig"] = {
-            "SubnetIds": config["vpc"]["subnet_ids"].split(","),
-            "SecurityGroupIds": config["vpc"]["security_group_ids"].split(",")
-        }
-    
-    # Observabilidad
-    if config.get("observability", {}).get("xray"):
-        function_props["Tracing"] = "Active"
-    
-    # DLQ
-    if config.get("error_handling", {}).get("use_dlq"):
-        function_props["DeadLetterQueue"] = {
-            "Type": config["error_handling"]["dlq_type"],
-            "TargetArn": config["error_handling"]["dlq_arn"]
-        }
-    
-    # Deployment
-    if config.get("deployment", {}).get("type") == "container":
-        function_props["ImageUri"] = config["deployment"]["ecr_uri"]
-        function_props.pop("Handler", None)
-        function_props.pop("Runtime", None)
-    elif config.get("deployment", {}).get("layers"):
-        function_props["Layers"] = config["deployment"]["layers"].split("\n")
-    
-    # Auto-publicar versión
-    if config.get("deployment", {}).get("auto_publish"):
-        function_props["AutoPublishAlias"] = "live"
-    
-    return yaml.dump(template, sort_keys=False)
-
 def get_llm():
     """Configura y retorna la instancia de LangChain."""
     api_key = os.getenv("OPENAI_API_KEY")
@@ -88,10 +56,299 @@ def get_llm():
         st.error("No se ha configurado la API key de OpenAI. Por favor, configúrala en el archivo .env o en los secrets de Streamlit.")
         st.stop()
     
-    return ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.2,
-        api_key=api_key
+    return get_shared_llm(api_key)
+
+def render_stream(chunks, render, min_interval=0.05):
+    """Pinta el texto a medida que llegan los fragmentos y devuelve el texto completo."""
+    text = ""
+    last_render = 0.0
+    for chunk in chunks:
+        text += chunk
+        now = time.monotonic()
+        if now - last_render >= min_interval:
+            render(text)
+            last_render = now
+    render(text)
+    return text
+
+def show_improved_code(improved_code):
+    """Muestra el código mejorado con sus botones de descarga y copia."""
+    st.markdown("### 📝 Código Mejorado Sugerido")
+    st.code(improved_code, language="python")
+    
+    # Botones para descargar y copiar
+    st.download_button(
+        "⬇️ Descargar Código Mejorado",
+        improved_code,
+        file_name="handler_improved.py",
+        mime="text/plain"
+    )
+    
+    if st.button("📋 Copiar al Portapapeles"):
+        st.write(
+            f'<script>navigator.clipboard.writeText(`{improved_code}`)</script>', 
+            unsafe_allow_html=True
+        )
+        st.success("¡Código copiado al portapapeles!")
+
+def show_cold_start_profile(profile):
+    """Muestra el informe de init del handler (tiempos de import y memoria)."""
+    if profile.get("init_ms") is None:
+        st.error(f"No se pudo importar el handler: {profile['error']}")
+        return
+    if profile["error"]:
+        st.warning(f"El init terminó con error (los tiempos son parciales): {profile['error']}")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Init del módulo", f"{profile['init_ms']} ms")
+    col2.metric("Imports directos", f"{profile['import_ms']} ms")
+    col3.metric("Pico de memoria en init", f"{profile['peak_memory_kb'] / 1024:.1f} MB")
+
+    st.markdown("**Imports del handler (tiempo acumulado)**")
+    st.dataframe(
+        [{"Módulo": entry["module"], "Acumulado (ms)": entry["cumulative_ms"], "Propio (ms)": entry["self_ms"]}
+         for entry in profile["imports"]],
+        use_container_width=True
+    )
+    st.markdown("**Módulos más costosos (tiempo propio)**")
+    st.dataframe(
+        [{"Módulo": entry["module"], "Propio (ms)": entry["self_ms"], "Profundidad": entry["depth"]}
+         for entry in profile["top_imports"]],
+        use_container_width=True
+    )
+
+    if profile["lazy_candidates"]:
+        st.info("💡 Estos imports solo se usan dentro de funciones y podrían hacerse perezosos "
+                "(importándolos dentro de la función que los necesita):\n\n" + "\n".join(
+                    f"- Línea {candidate['line']}: `{candidate['module']}` ({candidate['cumulative_ms']} ms)"
+                    for candidate in profile["lazy_candidates"]
+                ))
+    else:
+        st.success("No hay imports costosos que puedan diferirse.")
+
+def show_structure_check(findings):
+    """Muestra si el código generado sigue la estructura optimizada para el cold start."""
+    if findings:
+        st.warning("❄️ El código no sigue del todo la estructura optimizada para el cold start:\n\n"
+                   + format_findings(findings))
+    else:
+        st.success("❄️ El código sigue la estructura optimizada para el cold start.")
+
+def show_dependency_report(report):
+    """Muestra el requirements.txt mínimo del handler con su tamaño y coste de import."""
+    st.markdown("#### 📦 Dependencias")
+    if not report["packages"]:
+        st.success("El handler solo usa la librería estándar y lo que ya incluye el runtime: no necesita requirements.txt.")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Paquete descomprimido", f"{report['total_size_mb']} MB")
+    col2.metric("Import de dependencias", f"{report['total_import_ms']} ms")
+    st.dataframe([{
+        "Módulo": package["module"],
+        "Distribución": package["distribution"],
+        "Versión": package["version"] or "no instalada",
+        "Tamaño (MB)": package["size_mb"],
+        "Import (ms)": package["import_ms"] if package["import_ms"] is not None else "—"
+    } for package in report["packages"]], use_container_width=True)
+    if report["excluded"]:
+        st.caption("Excluidas porque ya vienen en el runtime de Lambda: " + ", ".join(report["excluded"]))
+    if report["not_installed"]:
+        st.caption("No instaladas en local (sin tamaño ni tiempo de import): " + ", ".join(report["not_installed"]))
+    st.download_button(
+        "⬇️ Descargar requirements.txt",
+        report["requirements_txt"],
+        file_name="requirements.txt",
+        mime="text/plain"
+    )
+
+def show_validation(report, repairs=0):
+    """Muestra el resultado de cada etapa de validación local del handler generado."""
+    st.markdown("#### 🧪 Validación Local")
+    st.dataframe([{
+        "Etapa": stage["label"],
+        "Estado": STATUS_ICONS[stage["status"]],
+        "Detalle": stage["detail"],
+        "Tiempo (ms)": stage["ms"] if stage["ms"] is not None else "—"
+    } for stage in report["stages"]], use_container_width=True)
+    note = f" · corregido automáticamente {repairs} {'vez' if repairs == 1 else 'veces'}" if repairs else ""
+    st.caption(f"Validado en {report['seconds']} s con boto3 simulado y un evento sintético{note}")
+    if not report["passed"]:
+        st.error("❌ El código no supera la validación: revísalo antes de desplegarlo.")
+
+def show_generation_result(generated):
+    """Muestra el resultado de la última generación guardada en la sesión."""
+    st.markdown("## Resultado Final 🎉")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("📄 Código Python (handler.py)")
+        st.code(generated["code"], language="python")
+        st.download_button(
+            "⬇️ Descargar handler.py",
+            generated["code"],
+            file_name="handler.py",
+            mime="text/plain"
+        )
+        if generated.get("validation"):
+            show_validation(generated["validation"], generated.get("repairs", 0))
+        if generated.get("structure_findings") is not None:
+            show_structure_check(generated["structure_findings"])
+        if generated.get("dependencies"):
+            show_dependency_report(generated["dependencies"])
+
+    with col2:
+        st.subheader("🏗️ Template SAM (template.yaml)")
+        st.code(generated["sam_template"], language="yaml")
+        st.download_button(
+            "⬇️ Descargar template.yaml",
+            generated["sam_template"],
+            file_name="template.yaml",
+            mime="text/plain"
+        )
+
+    st.markdown("### 📚 Explicación del Código")
+    st.info(generated["explanation"])
+
+def show_benchmark(report):
+    """Muestra los percentiles de latencia y la memoria de un benchmark local."""
+    if report["error"]:
+        st.warning(f"{report['errors']} invocaciones terminaron con error. Primer error: {report['error']}")
+    if not report["cold"]:
+        st.error("No se pudo completar ninguna invocación.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cold start p50", f"{report['cold']['p50']} ms")
+    col2.metric("Warm p50", f"{report['warm']['p50']} ms" if report["warm"] else "—")
+    col3.metric("Warm p99", f"{report['warm']['p99']} ms" if report["warm"] else "—")
+    col4.metric("Pico de RSS", f"{report['peak_rss_mb']:.1f} MB" if report["peak_rss_mb"] else "—")
+
+    rows = []
+    for label, key in [("Init del módulo", "init"), ("Cold start", "cold"), ("Warm", "warm"), ("Warm (CPU)", "warm_cpu")]:
+        if report[key]:
+            rows.append({"Fase": label, **{name: report[key][name] for name in ("p50", "p95", "p99", "mean", "max", "count")}})
+    st.dataframe(rows, use_container_width=True)
+    st.caption(
+        f"Trigger: {report['trigger']} · Registros por evento: {report['records']} · "
+        f"Stubs de AWS: {report['aws_mode']} · Tiempos en ms"
+    )
+
+def format_seconds(seconds):
+    """Convierte segundos en un texto corto ("45 s", "12 min", "3.5 h")."""
+    if seconds == float("inf"):
+        return "∞ (no se vacía)"
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def show_cost_estimate(result, rate, backlog):
+    """Muestra el coste y el throughput de la configuración actual."""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Coste mensual", f"{result['monthly_cost']:.2f} USD")
+    col2.metric("Throughput máximo", f"{result['max_throughput']:.0f} reg/s",
+                delta=f"{result['max_throughput'] - rate:+.0f} sobre lo esperado", delta_color="normal")
+    col3.metric("Concurrencia necesaria", f"{result['needed_concurrency']:.1f}",
+                delta=f"de {result['concurrency']}", delta_color="off")
+    col4.metric("Vaciado de la cola", format_seconds(result["drain_s"]) if backlog else "—")
+    if not result["feasible"]:
+        st.error("❌ Con esta configuración la función no aguanta el ritmo esperado: la duración supera el "
+                 "timeout o la concurrencia necesaria supera la disponible.")
+
+def show_interpreter_comparison(rows):
+    """Muestra la latencia en caliente del handler con cada versión de Python."""
+    st.dataframe([{
+        "Python": row["version"],
+        "Warm p50 (ms)": row["warm_p50"],
+        "Warm p99 (ms)": row["warm_p99"],
+        "CPU p50 (ms)": row["cpu_p50"],
+        "Init (ms)": row["init_ms"],
+        "Aceleración": f"{row['speedup']}x" if row["speedup"] else "—",
+        "Error": row["error"] or ""
+    } for row in rows], use_container_width=True)
+    fastest = min((row for row in rows if row["warm_p50"]), key=lambda row: row["warm_p50"], default=None)
+    if fastest:
+        runtime = f"python{fastest['version']}"
+        note = "" if runtime in RUNTIMES else " (no disponible como runtime de Lambda)"
+        st.success(f"La versión más rápida para este handler es **{runtime}**{note}.")
+
+def show_log_stats(stats):
+    """Muestra las distribuciones extraídas de los logs de CloudWatch o de las trazas de X-Ray."""
+    distributions = [("Duración", "duration"), ("Init (cold start)", "init_duration")]
+    if stats["kind"] == "cloudwatch":
+        if not stats["invocations"]:
+            st.warning("No se encontraron líneas REPORT en los logs.")
+            return
+        distributions[1:1] = [("Duración facturada", "billed_duration")]
+        distributions.append(("Memoria máxima usada (MB)", "max_memory_used"))
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Invocaciones", stats["invocations"])
+        col2.metric("Cold starts", f"{stats['cold_start_rate']:.1%}")
+        col3.metric("Timeouts", stats["timeouts"])
+        col4.metric("Errores", stats["errors"])
+    else:
+        if not stats["traces"]:
+            st.warning("No se encontraron trazas en el fichero.")
+            return
+        col1, col2 = st.columns(2)
+        col1.metric("Trazas", stats["traces"])
+        col2.metric("Cold starts", f"{stats['cold_start_rate']:.1%}" if stats["cold_start_rate"] is not None else "—")
+
+    rows = [{"Métrica": label, **stats[key]} for label, key in distributions if stats[key]]
+    rows.extend({"Métrica": f"Subsegmento {entry['name']}", **{name: value for name, value in entry.items() if name != "name"}}
+                for entry in stats.get("subsegments", []))
+    st.dataframe(rows, use_container_width=True)
+
+    memory = stats.get("memory")
+    if memory and memory["overprovisioned"]:
+        st.warning(f"💾 La función usa como máximo {memory['max_used_mb']:.0f} MB de los {memory['configured_mb']} MB "
+                   f"configurados: prueba con {memory['suggested_mb']} MB y comprueba que la duración no empeora "
+                   "(la CPU escala con la memoria).")
+
+def show_package_report(report):
+    """Muestra la capa compartida y el tamaño de cada función frente al presupuesto."""
+    layer = report["layer"]
+    col1, col2 = st.columns(2)
+    col1.metric("Capa compartida", f"{layer['size_mb']} MB")
+    col2.metric("Presupuesto por función", f"{report['budget_mb']} MB")
+    if layer["requirements"]:
+        st.code(requirements_txt(layer["requirements"]), language="text")
+    if layer["not_installed"]:
+        st.caption("No instaladas en local (su tamaño no se incluye): " + ", ".join(layer["not_installed"]))
+    if layer["over_limit"]:
+        st.error("La capa supera el límite de 250 MB descomprimidos de Lambda.")
+
+    st.dataframe([{
+        "Función": row["function"],
+        "Dependencias": ", ".join(row["dependencies"]) or "—",
+        "Código (KB)": row["code_kb"],
+        "Solo sus dependencias (MB)": row["own_dependencies_mb"],
+        "Código + capa (MB)": row["total_mb"],
+        "Presupuesto": "❌ Excedido" if row["over_budget"] else "✅"
+    } for row in report["functions"]], use_container_width=True)
+    if any(row["over_budget"] for row in report["functions"]):
+        st.warning("Alguna función supera el presupuesto: si usa pocas dependencias de la capa, "
+                   "dale una capa propia más pequeña o mueve las dependencias pesadas a la función que las usa.")
+
+def show_project_result(project):
+    """Muestra el template, el código de cada función y el informe de tamaños de un proyecto."""
+    st.markdown("## Resultado 🎉")
+    names = list(project["handlers"])
+    for tab, name in zip(st.tabs(names), names):
+        with tab:
+            st.code(project["handlers"][name], language="python")
+
+    st.subheader("🏗️ Template SAM (template.yaml)")
+    st.code(project["template"], language="yaml")
+    st.subheader("📦 Tamaño de los paquetes")
+    show_package_report(project["report"])
+    st.download_button(
+        "⬇️ Descargar proyecto (.zip)",
+        project["archive"],
+        file_name="proyecto-sam.zip",
+        mime="application/zip"
     )
 
 def show_help(title, content):
@@ -152,8 +409,8 @@ st.title("⚡ AWS Lambda Tools")
 
 tool_selection = st.radio(
     "Selecciona la herramienta que necesitas:",
-    ["🛠️ Generador de Lambdas", "🔍 Debugger de Lambdas"],
-    help="Escoge entre crear una nueva Lambda o analizar/debuggear una existente"
+    ["🛠️ Generador de Lambdas", "🧩 Proyecto Multi-función", "🔍 Debugger de Lambdas"],
+    help="Escoge entre crear una nueva Lambda, un proyecto con varias funciones o analizar/debuggear una existente"
 )
 
 if tool_selection == "🛠️ Generador de Lambdas":
@@ -281,6 +538,86 @@ if tool_selection == "🛠️ Generador de Lambdas":
             help="GET para obtener datos, POST para enviar datos"
         )
 
+    elif selected_trigger == "Scheduled Event":
+        with st.expander("ℹ️ ¿Cómo configurar la programación?"):
+            st.markdown("""
+            ⏰ **Configuración de la ejecución periódica:**
+
+            - `rate(5 minutes)`, `rate(1 hour)`, `rate(1 day)`: cada cierto tiempo
+            - `cron(0 8 * * ? *)`: todos los días a las 8:00 UTC
+            - `cron(0 9 ? * MON-FRI *)`: de lunes a viernes a las 9:00 UTC
+            """)
+
+        config_values["schedule"] = st.text_input(
+            "Expresión de programación",
+            value="rate(5 minutes)",
+            help="Expresión rate() o cron() de EventBridge"
+        )
+
+    elif selected_trigger == "SNS":
+        config_values["topic_arn"] = st.text_input(
+            "ARN del Topic SNS (opcional)",
+            help="Déjalo vacío para crear un topic nuevo en el template"
+        )
+
+    elif selected_trigger == "SQS":
+        with st.expander("ℹ️ ¿Cómo configurar el procesamiento por lotes?"):
+            st.markdown("""
+            📬 **El batching es lo que más influye en el throughput y el coste:**
+
+            1. **Tamaño del lote**: mensajes que recibe cada invocación (hasta 10.000)
+               - Lotes grandes = menos invocaciones y menos coste
+            2. **Ventana de agrupación**: segundos que se espera a llenar el lote
+               - Obligatoria (≥ 1 s) con lotes de más de 10 mensajes
+            3. **Concurrencia máxima**: invocaciones simultáneas que abre la cola
+               - Protege bases de datos y APIs de terceros de picos de carga
+            4. **Fallos parciales**: la función devuelve solo los mensajes fallidos
+               - Así no se reprocesa el lote completo cuando falla un mensaje
+            """)
+
+        config_values["queue_arn"] = st.text_input(
+            "ARN de la cola SQS (opcional)",
+            help="Déjalo vacío para crear una cola nueva en el template"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            batch_size = st.number_input(
+                "Tamaño del lote (mensajes)",
+                min_value=1,
+                max_value=10000,
+                value=SQS_DEFAULTS["batch_size"],
+                help="Mensajes que recibe cada invocación"
+            )
+            max_concurrency = st.number_input(
+                "Concurrencia máxima",
+                min_value=0,
+                max_value=1000,
+                value=SQS_DEFAULTS["max_concurrency"],
+                help="Invocaciones simultáneas desde la cola (0 = sin límite, mínimo 2)"
+            )
+        with col2:
+            batching_window = st.number_input(
+                "Ventana de agrupación (segundos)",
+                min_value=0,
+                max_value=300,
+                value=SQS_DEFAULTS["batching_window"],
+                help="Tiempo máximo de espera para llenar el lote"
+            )
+            report_failures = st.checkbox(
+                "Reportar fallos parciales del lote",
+                value=SQS_DEFAULTS["report_failures"],
+                help="Activa ReportBatchItemFailures: solo se reintentan los mensajes que fallan"
+            )
+        config_values["sqs"] = {
+            "batch_size": batch_size,
+            "batching_window": batching_window,
+            "max_concurrency": max_concurrency,
+            "report_failures": report_failures
+        }
+        normalized = sqs_settings(config_values)
+        if normalized["batching_window"] != batching_window:
+            st.info(f"Con lotes de más de 10 mensajes SQS exige una ventana de al menos 1 s; se usará {normalized['batching_window']} s.")
+
     ############################
     # 3. Configuración común
     ############################
@@ -310,23 +647,49 @@ if tool_selection == "🛠️ Generador de Lambdas":
 
     config_values["handler_name"] = "lambda_handler"  # Simplificamos quitando esta opción
 
+    # La recomendación del power tuning se aplica antes de crear los sliders
+    if "pending_tuning" in st.session_state:
+        tuning = st.session_state.pop("pending_tuning")
+        st.session_state["config_memory"] = tuning["memory"]
+        st.session_state["config_timeout"] = tuning["timeout"]
+    st.session_state.setdefault("config_memory", 256)
+    st.session_state.setdefault("config_timeout", 30)
+
     col1, col2 = st.columns(2)
     with col1:
         config_values["memory"] = st.select_slider(
             "💾 Memoria (MB)",
-            options=[128, 256, 512, 1024, 2048],
-            value=256,
-            help="Cuánta memoria necesita tu Lambda. Para empezar, 256MB está bien."
+            options=MEMORY_TIERS,
+            key="config_memory",
+            help="Cuánta memoria necesita tu Lambda. Para empezar, 256MB está bien; "
+                 "el Power Tuning del benchmark te recomienda el valor óptimo."
         )
 
     with col2:
         config_values["timeout"] = st.select_slider(
             "⏱️ Tiempo máximo (segundos)",
-            options=[5, 10, 30, 60, 300],
-            value=30,
+            options=TIMEOUT_OPTIONS,
+            key="config_timeout",
             help="Cuánto tiempo puede ejecutarse tu Lambda como máximo"
         )
 
+    col1, col2 = st.columns(2)
+    with col1:
+        config_values["runtime"] = st.selectbox(
+            "🐍 Versión de Python",
+            RUNTIMES,
+            index=RUNTIMES.index(DEFAULT_RUNTIME),
+            help="Las versiones más nuevas de CPython suelen ejecutar el mismo código más rápido"
+        )
+    with col2:
+        config_values["architecture"] = st.selectbox(
+            "🖥️ Arquitectura",
+            ARCHITECTURES,
+            index=ARCHITECTURES.index(DEFAULT_ARCHITECTURE),
+            format_func=lambda arch: "arm64 (Graviton, ~20% más barato)" if arch == "arm64" else "x86_64 (Intel/AMD)",
+            help="arm64 cuesta menos por GB-segundo; elige x86_64 si dependes de binarios compilados solo para x86"
+        )
+
     # Variables de entorno
     st.markdown("### Variables de configuración")
     with st.expander("ℹ️ Variables de Entorno"):
@@ -359,6 +722,8 @@ if tool_selection == "🛠️ Generador de Lambdas":
         
         - **Reserved Concurrency**: Límite máximo de ejecuciones simultáneas
         - **Provisioned Concurrency**: Instancias pre-calentadas para evitar cold starts
+        - **Autoescalado**: Ajusta la provisioned concurrency a la carga y a los picos programados
+        - **Optimización del cold start**: SnapStart y un código estructurado para un init rápido
         """)
         
         config_values["concurrency"] = {
@@ -374,11 +739,77 @@ if tool_selection == "🛠️ Generador de Lambdas":
                 min_value=0,
                 max_value=100,
                 value=0,
-                help="Número de instancias pre-calentadas"
+                help="Número de instancias pre-calentadas (se aplica sobre el alias `live`)"
             )
         }
 
-        if selected_trigger in ["S3 Upload", "SNS", "SQS"]:
+        autoscaling_enabled = st.checkbox(
+            "📈 Autoescalar la provisioned concurrency",
+            help="Application Auto Scaling ajusta las instancias pre-calentadas según su utilización, "
+                 "para mantener el p99 estable en los picos sin pagar el máximo todo el día"
+        )
+        if autoscaling_enabled:
+            col1, col2 = st.columns(2)
+            with col1:
+                autoscaling_max = st.number_input(
+                    "Máximo de instancias pre-calentadas",
+                    min_value=1,
+                    max_value=1000,
+                    value=max(10, config_values["concurrency"]["provisioned"] * 2),
+                    help="El mínimo es la Provisioned Concurrency"
+                )
+            with col2:
+                target_utilization = st.slider(
+                    "Utilización objetivo",
+                    min_value=0.1,
+                    max_value=0.9,
+                    value=DEFAULT_TARGET_UTILIZATION,
+                    step=0.05,
+                    help="Se añaden instancias cuando la utilización media las supera; un valor bajo deja "
+                         "más margen para ráfagas"
+                )
+            timezone = st.text_input("Zona horaria de las ventanas", value="UTC", help="Ejemplo: Europe/Madrid")
+            st.caption("🗓️ Ventanas programadas: suben la capacidad antes de un pico conocido y la devuelven "
+                       "a los valores base al terminar")
+            windows = st.data_editor(
+                [{"name": "pico-laboral", "start": "cron(0 8 ? * MON-FRI *)", "end": "cron(0 20 ? * MON-FRI *)",
+                  "min": 10, "max": 20}],
+                num_rows="dynamic",
+                column_config={
+                    "name": "Nombre",
+                    "start": "Inicio (cron/at)",
+                    "end": "Fin (cron/at)",
+                    "min": st.column_config.NumberColumn("Mínimo", min_value=0, step=1),
+                    "max": st.column_config.NumberColumn("Máximo", min_value=0, step=1)
+                },
+                key="scaling_windows"
+            )
+            config_values["concurrency"]["autoscaling"] = {
+                "enabled": True,
+                "max": autoscaling_max,
+                "target_utilization": target_utilization,
+                "timezone": timezone,
+                "windows": windows
+            }
+
+        config_values["cold_start"] = {
+            "enabled": st.checkbox(
+                "❄️ Modo optimización de cold start",
+                help="Activa SnapStart cuando el runtime lo soporta y pide al generador un código con "
+                     "clientes en el init, imports diferidos y conexiones pre-calentadas"
+            )
+        }
+        if config_values["cold_start"]["enabled"]:
+            # El tipo de despliegue se elige más abajo: se toma el valor actual del widget
+            deployment = {"type": st.session_state.get("deployment_type", "zip")}
+            blocker = snapstart_blocker(dict(config_values, deployment=deployment))
+            if blocker:
+                st.info(f"{blocker} Se aplicará solo la optimización del código.")
+            else:
+                st.success("SnapStart activado sobre las versiones publicadas (alias `live`).")
+
+        # Solo las invocaciones asíncronas tienen cola interna con reintentos y antigüedad máxima
+        if selected_trigger in ASYNC_TRIGGERS:
             col1, col2 = st.columns(2)
             with col1:
                 config_values["max_event_age"] = st.number_input(
@@ -392,7 +823,7 @@ if tool_selection == "🛠️ Generador de Lambdas":
                 config_values["max_retry"] = st.number_input(
                     "Maximum Retry Attempts",
                     min_value=0,
-                    max_value=10,
+                    max_value=2,
                     value=2,
                     help="Intentos máximos en caso de fallo"
                 )
@@ -434,6 +865,8 @@ if tool_selection == "🛠️ Generador de Lambdas":
         - **X-Ray**: Trazabilidad detallada de ejecuciones
         - **Log Retention**: Cuánto tiempo guardar los logs
         - **Log Level**: Nivel de detalle de los logs
+        - **Alarmas de rendimiento**: Avisan de regresiones de latencia, throttling y colas atascadas
+        - **Powertools**: Logs estructurados, métricas (incluido el cold start) y trazas en el código
         """)
         
         config_values["observability"] = {
@@ -449,8 +882,31 @@ if tool_selection == "🛠️ Generador de Lambdas":
                 ["DEBUG", "INFO", "WARNING", "ERROR"],
                 index=1,
                 help="Nivel de detalle de los logs"
+            ),
+            "performance_alarms": st.checkbox(
+                "Crear alarmas de rendimiento",
+                value=True,
+                help="Duración p99, throttling, concurrencia y, con SQS, antigüedad del mensaje más antiguo"
+            ),
+            "p99_threshold_ms": st.number_input(
+                "Umbral de duración p99 (ms)",
+                min_value=0,
+                max_value=900000,
+                value=0,
+                help="0 = 80% del tiempo máximo configurado"
+            ),
+            "powertools": st.checkbox(
+                "Instrumentar con Lambda Powertools",
+                value=True,
+                help="Logger, Metrics (incluida la métrica de cold start) y Tracer en el handler generado"
             )
         }
+        if config_values["observability"]["powertools"]:
+            config_values["observability"]["service_name"] = st.text_input(
+                "Nombre del servicio",
+                value=DEFAULT_SERVICE_NAME,
+                help="Namespace de las métricas y nombre del servicio en logs y trazas"
+            )
 
     with st.expander("🌐 Configuración de Red (VPC)"):
         show_help("VPC", """
@@ -497,11 +953,19 @@ if tool_selection == "🛠️ Generador de Lambdas":
             "type": st.selectbox(
                 "Tipo de Deployment",
                 ["zip", "container"],
-                help="Método de empaquetado del código"
+                help="Método de empaquetado del código",
+                key="deployment_type"
             ),
             "auto_publish": st.checkbox(
                 "Auto-publicar nueva versión",
                 help="Crea una nueva versión en cada despliegue"
+            ),
+            "traffic_shifting": st.selectbox(
+                "🚦 Despliegue gradual (CodeDeploy)",
+                [None] + TRAFFIC_SHIFTING_TYPES,
+                format_func=lambda shifting: shifting or "Sin despliegue gradual",
+                help="Desplaza el tráfico del alias `live` a la nueva versión por fases (canary o lineal) "
+                     "y vuelve atrás si saltan las alarmas de errores o de latencia p99"
             )
         }
         
@@ -537,6 +1001,10 @@ if tool_selection == "🛠️ Generador de Lambdas":
                 help="Clave para cifrar variables de entorno"
             )
 
+    # Vista previa en vivo: el template se regenera solo por las secciones que cambian
+    with st.expander("👀 Vista previa del template SAM"):
+        st.code(generate_sam_template(config_values), language="yaml")
+
     ############################
     # 4. Lógica de negocio
     ############################
@@ -571,124 +1039,611 @@ if tool_selection == "🛠️ Generador de Lambdas":
         height=100
     )
 
+    skeleton_name = st.selectbox(
+        "🧱 Plantilla del handler",
+        skeletons_for(selected_trigger) + [None],
+        format_func=lambda name: SKELETONS[name]["label"] if name else "✍️ Sin plantilla (handler completo)",
+        help="Las plantillas revisadas ya resuelven el manejo del evento, los fallos y el paralelismo: "
+             "el modelo solo escribe la función de negocio"
+    )
+    if skeleton_name:
+        config_values["skeleton"] = {"name": skeleton_name}
+        if skeleton_name != "api_gateway":
+            config_values["skeleton"]["max_workers"] = st.number_input(
+                "🧵 Hilos por invocación",
+                min_value=1,
+                max_value=64,
+                value=skeleton_settings(config_values)["max_workers"],
+                help="Registros o elementos que se procesan a la vez; útil cuando el trabajo espera a E/S "
+                     "(llamadas a APIs, S3, DynamoDB). 1 = secuencial"
+            )
+        if skeleton_name == "s3_stream":
+            config_values["skeleton"]["whole_object"] = st.checkbox(
+                "📥 Leer cada objeto entero",
+                help="Para formatos que necesitan el fichero completo (imágenes con Pillow, zip). El tamaño "
+                     f"máximo por objeto es el {WHOLE_OBJECT_MEMORY_SHARE:.0%} de la memoria de la función "
+                     "repartido entre los hilos; los objetos mayores fallan. El tamaño de bloque no se aplica"
+            )
+            if config_values["skeleton"]["whole_object"]:
+                st.caption(f"Máximo por objeto: {skeleton_settings(config_values)['max_object_mb']} MB con "
+                           f"{config_values['memory']} MB de memoria. Súbela para objetos más grandes.")
+            config_values["skeleton"]["chunk_size"] = st.select_slider(
+                "📦 Tamaño de bloque de lectura",
+                options=[64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024],
+                value=DEFAULT_CHUNK_SIZE,
+                format_func=lambda size: f"{size // 1024} KB" if size < 1024 * 1024 else f"{size // (1024 * 1024)} MB",
+                disabled=config_values["skeleton"]["whole_object"],
+                help="Bytes que se leen de S3 en cada bloque con iter_chunks: la memoria usada no depende "
+                     "del tamaño del objeto. No se aplica si se lee el objeto entero"
+            )
+
     ############################
     # 5. Generación de código
     ############################
-    if st.button("🚀 Generar Código"):
-        with st.spinner("Generando código personalizado..."):
-            # Primero, generamos la lógica específica con LangChain
-            logic_prompt = f"""Genera el código Python para una función AWS Lambda que haga lo siguiente:
-            
-            Descripción: {logic_description}
-            Tipo de trigger: {selected_trigger}
-            
-            La función debe:
-            1. Seguir las mejores prácticas de AWS Lambda
-            2. Incluir manejo de errores y logging apropiado
-            3. Ser eficiente y clara
-            4. Incluir las importaciones necesarias
-            5. Incluir comentarios explicativos
-            6. NO incluir código de ejemplo o plantillas
-            7. Implementar SOLO la funcionalidad solicitada
-            
-            Importante:
-            - El código debe ser una única implementación coherente
-            - NO incluir múltiples versiones o ejemplos
-            - NO incluir código comentado o alternativas
-            - Asegurarse de que todas las funciones estén correctamente definidas
-            - Incluir solo las dependencias estrictamente necesarias
-            
-            Estructura el código en este orden:
-            1. Imports
-            2. Configuración de logging
-            3. Configuración de clientes AWS necesarios
-            4. Función principal lambda_handler
-            5. Funciones auxiliares necesarias
-            """
-
-            llm = get_llm()
-            logic_response = llm.invoke(logic_prompt)
-            
-            # Generar el código completo
-            code_template = logic_response.content
+    streaming_mode = st.checkbox(
+        "⚡ Mostrar resultados en tiempo real",
+        value=True,
+        help="Muestra el código y la explicación a medida que se generan, sin esperar a la respuesta completa"
+    )
 
-            # Generar template SAM
-            sam_template = generate_sam_template(config_values)
+    max_repairs = st.number_input(
+        "🔁 Correcciones automáticas",
+        min_value=0,
+        max_value=5,
+        value=DEFAULT_MAX_REPAIRS,
+        help="Si el código no supera la validación local (sintaxis, importación, invocación de prueba o timeout), "
+             "se pide al modelo que lo corrija con el error, hasta este número de veces"
+    )
 
-            # Mostrar resultados
-            st.markdown("## Resultado Final 🎉")
-            
-            # Análisis con LangChain
-            with st.spinner("Analizando el código generado..."):
-                review_template = """Analiza y explica el siguiente código de AWS Lambda:
+    semantic_mode = st.checkbox(
+        "🧠 Reutilizar generaciones parecidas",
+        value=True,
+        help="Si ya se generó una Lambda con una descripción casi igual y la misma configuración, "
+             "te la ofrece antes de volver a llamar al modelo"
+    )
 
-                DESCRIPCIÓN DE LA FUNCIONALIDAD:
-                {description}
+    config_errors = validate_config(config_values)
+    for error in config_errors:
+        st.error(f"❌ {error}")
+
+    # Todo lo que no es la descripción: solo se reutilizan generaciones con la misma configuración
+    scope = generation_scope(build_generation_prompt("", config_values))
+    run_generation = False
+    reused_response = None
+    refresh = False
+
+    if st.button("🚀 Generar Código", disabled=bool(config_errors)):
+        st.session_state.pop("semantic_match", None)
+        match = get_semantic_cache().lookup(logic_description, scope) if semantic_mode else None
+        if match:
+            st.session_state["semantic_match"] = dict(match, scope=scope, request=logic_description)
+        else:
+            run_generation = True
+
+    semantic_match = st.session_state.get("semantic_match")
+    if semantic_match and (semantic_match["scope"] != scope or semantic_match["request"] != logic_description):
+        # La descripción o la configuración han cambiado desde la búsqueda
+        st.session_state.pop("semantic_match")
+        semantic_match = None
+    if semantic_match:
+        st.info(f"🧠 Ya se generó una Lambda muy parecida (similitud {semantic_match['similarity']:.0%}):\n\n"
+                f"> {semantic_match['description']}")
+        col1, col2 = st.columns(2)
+        with col1:
+            accept_clicked = st.button("✅ Usar esta generación")
+        with col2:
+            regenerate_clicked = st.button("🔄 Generar de nuevo")
+        if accept_clicked or regenerate_clicked:
+            st.session_state.pop("semantic_match")
+            run_generation = True
+            reused_response = semantic_match["content"] if accept_clicked else None
+            refresh = regenerate_clicked
 
-                CÓDIGO PYTHON:
-                {python_code}
+    if run_generation:
+        # Primero, generamos la lógica específica con LangChain
+        logic_prompt = build_generation_prompt(logic_description, config_values)
 
-                TEMPLATE SAM:
-                {sam_template}
+        llm = get_llm() if reused_response is None else None
 
-                Por favor, proporciona una explicación clara y estructurada:
-                1. 📝 Explicación general del código y su funcionamiento
-                2. 🔍 Desglose de cada parte importante
-                3. 🎯 Cómo cumple con los requisitos solicitados
-                4. ⚠️ Consideraciones importantes a tener en cuenta
-                
-                Usa un lenguaje simple y claro, enfocado a desarrolladores con conocimientos básicos."""
+        # El template SAM es local: se muestra antes de llamar al LLM
+        sam_template = generate_sam_template(config_values)
 
-                prompt = ChatPromptTemplate.from_template(review_template)
-                chain = prompt | llm
+        # Mostrar resultados
+        st.markdown("## Resultado Final 🎉")
+        col1, col2 = st.columns(2)
 
-                response = chain.invoke({
-                    "description": logic_description,
-                    "python_code": code_template,
-                    "sam_template": sam_template
-                })
+        with col2:
+            st.subheader("🏗️ Template SAM (template.yaml)")
+            st.code(sam_template, language="yaml")
+            st.download_button(
+                "⬇️ Descargar template.yaml",
+                sam_template,
+                file_name="template.yaml",
+                mime="text/plain"
+            )
 
-            # Mostrar el código y la explicación
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("📄 Código Python (handler.py)")
-                st.code(code_template, language="python")
-                st.download_button(
-                    "⬇️ Descargar handler.py",
-                    code_template,
-                    file_name="handler.py",
-                    mime="text/plain"
+        with col1:
+            st.subheader("📄 Código Python (handler.py)")
+            code_placeholder = st.empty()
+
+        st.markdown("### 📚 Explicación del Código")
+        explanation_placeholder = st.empty()
+
+        def render_generation(text, partial=True):
+            code_part, explanation_part = split_generation(text, partial)
+            code_placeholder.code(extract_python_code(code_part), language="python")
+            if explanation_part:
+                explanation_placeholder.info(explanation_part)
+
+        # Código y explicación llegan en la misma respuesta (reutilizando respuestas cacheadas)
+        if reused_response is not None:
+            response = reused_response
+        elif streaming_mode:
+            response = render_stream(cached_stream(llm, logic_prompt, refresh=refresh), render_generation)
+        else:
+            with st.spinner("Generando código personalizado..."):
+                response = cached_invoke(llm, logic_prompt, refresh=refresh)
+        render_generation(response, partial=False)
+        if reused_response is None and semantic_mode:
+            get_semantic_cache().add(
+                logic_description, scope, make_cache_key(logic_prompt, llm.model_name, llm.temperature)
+            )
+        code_part, explanation = split_generation(response)
+        code_template = extract_python_code(code_part)
+        if skeleton_name:
+            # El modelo solo ha escrito la lógica de negocio: se monta en la plantilla
+            code_template = fill_skeleton(config_values, code_template)
+            code_placeholder.code(code_template, language="python")
+
+        with col1:
+            validation_status = st.empty()
+
+            def report_validation(attempt, code, report):
+                code_placeholder.code(code, language="python")
+                if not report["passed"] and attempt < max_repairs:
+                    failed = ", ".join(stage["label"] for stage in failed_stages(report))
+                    validation_status.warning(f"🔁 Falló la validación ({failed}): pidiendo una corrección "
+                                              f"al modelo ({attempt + 1}/{max_repairs})...")
+
+            with st.spinner("Validando el código generado..."):
+                code_template, validation, repairs = validate_and_repair(
+                    llm or (get_llm() if max_repairs else None), code_template, selected_trigger, config_values,
+                    max_repairs=max_repairs, on_attempt=report_validation
                 )
+            validation_status.empty()
+            show_validation(validation, repairs)
+
+            st.download_button(
+                "⬇️ Descargar handler.py",
+                code_template,
+                file_name="handler.py",
+                mime="text/plain"
+            )
 
-            with col2:
-                st.subheader("🏗️ Template SAM (template.yaml)")
-                st.code(sam_template, language="yaml")
-                st.download_button(
-                    "⬇️ Descargar template.yaml",
-                    sam_template,
-                    file_name="template.yaml",
-                    mime="text/plain"
+            structure_findings = None
+            if config_values["cold_start"]["enabled"]:
+                structure_findings = check_cold_start_structure(
+                    code_template,
+                    config_values["handler_name"],
+                    snapstart=snapstart_enabled(config_values)
                 )
+                show_structure_check(structure_findings)
+
+            dependencies = dependency_report(code_template)
+            show_dependency_report(dependencies)
+
+        # Guardar el resultado para que sobreviva a las siguientes interacciones
+        st.session_state["generated"] = {
+            "code": code_template,
+            "sam_template": sam_template,
+            "explanation": explanation,
+            "trigger": selected_trigger,
+            "config": config_values,
+            "structure_findings": structure_findings,
+            "dependencies": dependencies,
+            "validation": validation,
+            "repairs": repairs
+        }
+        st.session_state.pop("generator_benchmark", None)
+        st.session_state.pop("generator_interpreters", None)
+
+    elif st.session_state.get("generated"):
+        show_generation_result(st.session_state["generated"])
+
+    if st.session_state.get("generated"):
+        generated = st.session_state["generated"]
 
-            # Mostrar la explicación
-            st.markdown("### 📚 Explicación del Código")
-            st.info(response.content)
+        # Agregar instrucciones de despliegue
+        st.markdown("""
+        ### 🚀 Próximos Pasos
+        
+        1. Descarga los archivos generados
+        2. Colócalos en una carpeta de tu proyecto
+        3. Abre una terminal en esa carpeta
+        4. Ejecuta los siguientes comandos:
+        ```bash
+        sam build
+        sam deploy --guided
+        ```
+        """)
 
-            # Agregar instrucciones de despliegue
+        ############################
+        # 6. Benchmark local
+        ############################
+        st.markdown("### 📈 Benchmark Local")
+        with st.expander("ℹ️ ¿Qué mide el benchmark?"):
             st.markdown("""
-            ### 🚀 Próximos Pasos
-            
-            1. Descarga los archivos generados
-            2. Colócalos en una carpeta de tu proyecto
-            3. Abre una terminal en esa carpeta
-            4. Ejecuta los siguientes comandos:
-            ```bash
-            sam build
-            sam deploy --guided
-            ```
+            Ejecuta el código generado en tu máquina con un evento de ejemplo del trigger elegido,
+            sin conectarse a AWS (las llamadas van a stubs locales):
+
+            - **Cold start**: inicialización del módulo + primera invocación, en procesos nuevos
+            - **Warm**: invocaciones siguientes reutilizando el mismo contenedor
+            - **p50/p95/p99**: latencia típica y de cola
+            - **Pico de RSS**: memoria máxima del proceso
+            """)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bench_iterations = st.number_input("Invocaciones en caliente", 1, 1000, 50, key="generator_bench_iterations")
+        with col2:
+            bench_cold_runs = st.number_input("Arranques en frío", 1, 20, 3, key="generator_bench_cold_runs")
+        with col3:
+            bench_records = st.number_input(
+                "Registros por evento", 1, 10000,
+                sqs_settings(generated["config"])["batch_size"] if generated["trigger"] == "SQS" else 1,
+                key="generator_bench_records",
+                help="Número de registros en los eventos que agrupan mensajes (S3, SNS, SQS)"
+            )
+
+        if st.button("📈 Ejecutar Benchmark"):
+            with st.spinner("Ejecutando el handler con eventos sintéticos..."):
+                st.session_state["generator_benchmark"] = run_benchmark(
+                    extract_python_code(generated["code"]),
+                    generated["trigger"],
+                    generated["config"],
+                    iterations=bench_iterations,
+                    cold_runs=bench_cold_runs,
+                    records=bench_records
+                )
+
+        if st.session_state.get("generator_benchmark"):
+            show_benchmark(st.session_state["generator_benchmark"])
+
+            ############################
+            # 7. Power Tuning
+            ############################
+            benchmark = st.session_state["generator_benchmark"]
+            if benchmark["warm"] and benchmark["warm_cpu"]:
+                st.markdown("### 🎛️ Power Tuning")
+                with st.expander("ℹ️ ¿Cómo se calcula la recomendación?"):
+                    st.markdown("""
+                    Lambda asigna CPU en proporción a la memoria (1 vCPU completa a 1769 MB):
+
+                    - Del benchmark se separa el tiempo de **CPU** del tiempo de **espera** (red, disco)
+                    - Para cada nivel de memoria se proyecta la duración escalando solo la parte de CPU
+                      y se calcula el coste con el precio por GB-segundo de Lambda
+                    - Es una proyección analítica de una sola medición local: no se ejecuta el handler
+                      con cada nivel de CPU
+                    - Los niveles por debajo del pico de RSS medido se descartan
+                    - El timeout deja margen sobre el peor caso (cold start + p99)
+                    """)
+
+                strategy = st.radio(
+                    "¿Qué quieres optimizar?",
+                    list(STRATEGIES),
+                    format_func=STRATEGIES.get,
+                    index=2,
+                    horizontal=True
+                )
+                architecture = generated["config"].get("architecture", DEFAULT_ARCHITECTURE)
+                tuning = recommend(benchmark, strategy, price_per_gb_second=ARCHITECTURE_PRICES[architecture])
+                recommended = tuning["recommended"]
+
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Memoria recomendada", f"{recommended['memory']} MB",
+                            delta=recommended["memory"] - generated["config"]["memory"], delta_color="off")
+                col2.metric("Timeout recomendado", f"{recommended['timeout']} s",
+                            delta=recommended["timeout"] - generated["config"]["timeout"], delta_color="off")
+                projection = tuning["projection"]
+                col3.metric("Modelo de la proyección", f"{projection['io_ms']:.1f} + {projection['cpu_ms']:.1f} ms",
+                            help="Espera (E/S) + CPU medidas en local con una vCPU completa; la CPU se escala "
+                                 "con la fracción de vCPU de cada nivel")
+
+                st.dataframe([{
+                    "Memoria (MB)": row["memory"],
+                    "Duración proyectada (ms)": row["duration_ms"],
+                    "p99 proyectado (ms)": row["p99_ms"],
+                    "USD por millón de invocaciones": row["cost_per_million"],
+                    "Viable": "✅" if row["viable"] else "❌ sin memoria"
+                } for row in tuning["rows"]], use_container_width=True)
+                st.caption("Proyección analítica a partir de una medición en tu máquina local, no medida en cada "
+                           "nivel de memoria; valida el resultado con tráfico real en AWS.")
+
+                if st.button("✅ Aplicar recomendación"):
+                    config = dict(generated["config"], memory=recommended["memory"], timeout=recommended["timeout"])
+                    generated["config"] = config
+                    generated["sam_template"] = generate_sam_template(config)
+                    st.session_state["pending_tuning"] = recommended
+                    st.rerun()
+
+        ############################
+        # 7.5 Coste y throughput
+        ############################
+        st.markdown("### 💰 Coste y Throughput")
+        with st.expander("ℹ️ ¿Cómo se calcula?"):
+            st.markdown("""
+            Estimación determinista a partir de la configuración y de un perfil de carga:
+
+            - La duración de cada registro se separa en **espera** (E/S) y **CPU**; la CPU se escala con la
+              fracción de vCPU que da cada nivel de memoria
+            - **Coste mensual**: peticiones + GB-segundos (y la provisioned concurrency, si la hay)
+            - **Throughput máximo**: concurrencia × registros por invocación / duración
+            - **Concurrencia necesaria**: invocaciones por segundo × duración (ley de Little)
+            - **Vaciado de la cola** (SQS): mensajes acumulados / throughput sobrante
+            - La rejilla evalúa todas las combinaciones de memoria × lote × concurrencia a la vez y
+              marca el **frente de Pareto**: las que no se pueden abaratar sin tardar más
             """)
 
+        config = generated["config"]
+        is_sqs = generated["trigger"] == "SQS"
+        col1, col2 = st.columns(2)
+        with col1:
+            rate = st.number_input(
+                "Mensajes por segundo esperados" if is_sqs else "Peticiones por segundo esperadas",
+                min_value=0.01,
+                value=10.0,
+                help="Ritmo medio de llegada de registros (para el coste mensual y la concurrencia necesaria)"
+            )
+        with col2:
+            backlog = st.number_input(
+                "Mensajes acumulados en la cola",
+                min_value=0,
+                value=100000,
+                step=1000,
+                help="Para estimar cuánto se tarda en vaciar la cola tras un pico"
+            ) if is_sqs else 0
+
+        benchmark = st.session_state.get("generator_benchmark")
+        has_benchmark = bool(benchmark and benchmark.get("warm") and benchmark.get("warm_cpu"))
+        sources = ["manual"] + (["benchmark"] if has_benchmark else [])
+        source = st.radio(
+            "Duración por invocación",
+            sources,
+            index=len(sources) - 1,
+            format_func={"manual": "✍️ Indicarla a mano", "benchmark": "📈 Del benchmark local"}.get,
+            horizontal=True
+        )
+        if source == "benchmark":
+            profile = profile_from_benchmark(benchmark)
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                duration_ms = st.number_input(
+                    f"Duración por invocación con {config['memory']} MB (ms)",
+                    min_value=1.0,
+                    value=100.0,
+                    help=f"Duración media procesando {config_batch_size(config)} registro(s)"
+                )
+            with col2:
+                cpu_fraction = st.slider(
+                    "Parte de CPU", 0.0, 1.0, 0.3, 0.05,
+                    help="Fracción de la duración que es cálculo; el resto es espera a red o disco"
+                )
+            profile = profile_from_duration(duration_ms, config["memory"], cpu_fraction, config_batch_size(config))
+        fixed_ms = st.number_input(
+            "Sobrecoste fijo por invocación (ms)",
+            min_value=0.0,
+            value=DEFAULT_FIXED_MS,
+            help="Tiempo que no depende del número de registros (arranque del handler, una escritura agrupada...)"
+        ) if is_sqs else 0.0
+
+        show_cost_estimate(estimate(config, profile, rate, fixed_ms, backlog), rate, backlog)
+
+        with st.expander("🧮 Explorar configuraciones (rejilla y frente de Pareto)"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                # Los valores de la configuración actual se añaden a las opciones: el multiselect
+                # exige que todos los valores por defecto estén entre ellas
+                memories = st.multiselect("Memoria (MB)", sorted({*SWEEP_MEMORIES, config["memory"]}),
+                                          default=sorted({*SWEEP_MEMORIES[:5], config["memory"]}))
+            with col2:
+                batch_options = sorted({*SWEEP_BATCH_SIZES, config_batch_size(config)})
+                batch_sizes = st.multiselect("Tamaño de lote", batch_options, default=batch_options) \
+                    if is_sqs else [1]
+            with col3:
+                concurrency = config_concurrency(config)
+                concurrencies = st.multiselect("Concurrencia", sorted({*SWEEP_CONCURRENCIES, concurrency}),
+                                               default=sorted({*SWEEP_CONCURRENCIES[:4], concurrency}))
+            if memories and batch_sizes and concurrencies:
+                grid = sweep(
+                    profile, rate, memories, batch_sizes, concurrencies, timeout_s=config["timeout"],
+                    architecture=config.get("architecture", DEFAULT_ARCHITECTURE),
+                    provisioned=(config.get("concurrency") or {}).get("provisioned", 0), fixed_ms=fixed_ms,
+                    backlog=backlog
+                )
+                time_key = "drain_s" if backlog else "duration_ms"
+                time_label = "Vaciado de la cola (s)" if backlog else "Duración (ms)"
+                rows = sweep_rows(grid)
+                st.scatter_chart(
+                    {
+                        "Coste mensual (USD)": [row["monthly_cost"] for row in rows if row["feasible"]],
+                        time_label: [row[time_key] for row in rows if row["feasible"]],
+                        "Punto": ["Pareto" if row["pareto"] else "Dominado" for row in rows if row["feasible"]]
+                    },
+                    x="Coste mensual (USD)",
+                    y=time_label,
+                    color="Punto"
+                )
+                st.markdown(f"**Frente de Pareto** ({int(grid['pareto'].sum())} de {len(rows)} combinaciones, "
+                            f"{int(grid['feasible'].sum())} factibles):")
+                st.dataframe([{
+                    "Memoria (MB)": row["memory"],
+                    "Lote": row["batch_size"],
+                    "Concurrencia": row["concurrency"],
+                    "Duración (ms)": round(row["duration_ms"], 1),
+                    "Coste mensual (USD)": round(row["monthly_cost"], 2),
+                    "Throughput máx. (reg/s)": round(row["max_throughput"], 1),
+                    "Vaciado": format_seconds(row["drain_s"]) if backlog else "—"
+                } for row in sweep_rows(grid, only_pareto=True)], use_container_width=True)
+        st.caption("Precios de us-east-1 sin capa gratuita; no incluye el coste de SQS, API Gateway ni transferencia.")
+
+        ############################
+        # 8. Versiones de Python
+        ############################
+        st.markdown("### 🐍 Comparar Versiones de Python")
+        interpreters = find_interpreters()
+        st.caption(
+            "Ejecuta el mismo benchmark en caliente con cada intérprete de Python instalado en tu máquina: "
+            + ", ".join(f"{version} (`{python}`)" for version, python in interpreters.items())
+        )
+        if st.button("🐍 Comparar Intérpretes", disabled=len(interpreters) < 2,
+                     help="Necesitas al menos dos versiones de Python en el PATH (python3.X)"):
+            with st.spinner("Ejecutando el handler con cada versión de Python..."):
+                st.session_state["generator_interpreters"] = compare_interpreters(
+                    extract_python_code(generated["code"]),
+                    generated["trigger"],
+                    generated["config"],
+                    iterations=bench_iterations,
+                    records=bench_records,
+                    interpreters=interpreters
+                )
+        if st.session_state.get("generator_interpreters"):
+            show_interpreter_comparison(st.session_state["generator_interpreters"])
+
+elif tool_selection == "🧩 Proyecto Multi-función":
+    st.markdown("""
+    ## Generador de Proyectos Serverless
+    #### 🎯 ¿Qué es esto?
+    Genera varias funciones Lambda en un único template SAM: la configuración común va a `Globals`
+    y las dependencias de todas las funciones se empaquetan en una capa (layer) compartida.
+    """)
+
+    ############################
+    # 1. Configuración común
+    ############################
+    st.markdown("## Paso 1: Configuración común ⚙️")
+    project_name = st.text_input("Nombre del proyecto", value="mi-proyecto",
+                                 help="Se usa como prefijo de la capa de dependencias")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        project_memory = st.select_slider("💾 Memoria (MB)", options=MEMORY_TIERS, value=256, key="project_memory")
+        project_runtime = st.selectbox("🐍 Versión de Python", RUNTIMES, index=RUNTIMES.index(DEFAULT_RUNTIME),
+                                       key="project_runtime")
+    with col2:
+        project_timeout = st.select_slider("⏱️ Tiempo máximo (segundos)", options=TIMEOUT_OPTIONS, value=30,
+                                           key="project_timeout")
+        project_architecture = st.selectbox("🖥️ Arquitectura", ARCHITECTURES,
+                                            index=ARCHITECTURES.index(DEFAULT_ARCHITECTURE),
+                                            key="project_architecture")
+
+    project_globals = {
+        "memory": project_memory,
+        "timeout": project_timeout,
+        "runtime": project_runtime,
+        "architecture": project_architecture,
+        "env_vars": {
+            "ENVIRONMENT": st.selectbox("Ambiente", ["development", "production"], key="project_environment"),
+            "LOG_LEVEL": "INFO"
+        },
+        "observability": {"xray": st.checkbox("Activar AWS X-Ray", key="project_xray")}
+    }
+
+    budget_mb = st.number_input(
+        "📦 Presupuesto de tamaño por función (MB, descomprimido)",
+        min_value=1,
+        max_value=LAMBDA_UNZIPPED_LIMIT_MB,
+        value=DEFAULT_BUDGET_MB,
+        help="Tamaño máximo aceptable de código + capa por función. Más tamaño = cold starts más lentos"
+    )
+
+    ############################
+    # 2. Funciones
+    ############################
+    st.markdown("## Paso 2: Funciones del proyecto 🧩")
+    function_count = st.number_input("Número de funciones", min_value=1, max_value=10, value=2)
+
+    project_functions = []
+    descriptions = {}
+    for index in range(function_count):
+        with st.expander(f"Función {index + 1}", expanded=index == 0):
+            name = st.text_input("Nombre", value=f"funcion-{index + 1}", key=f"project_name_{index}")
+            name = "-".join(re.findall(r"[a-z0-9]+", name.lower())) or f"funcion-{index + 1}"
+            trigger = st.selectbox("Trigger", list(SAMPLE_EVENT_BUILDERS), key=f"project_trigger_{index}")
+            function = {"name": name, "trigger_type": trigger}
+            if trigger == "S3 Upload":
+                function["bucket_name"] = st.text_input("Bucket", value=f"{project_name}-{name}",
+                                                        key=f"project_bucket_{index}")
+                function["prefix"] = st.text_input("Prefijo (opcional)", key=f"project_prefix_{index}")
+            elif trigger == "API Gateway":
+                function["route"] = st.text_input("Ruta", value=f"/{name}", key=f"project_route_{index}")
+                function["http_method"] = st.selectbox("Método", ["GET", "POST", "PUT", "DELETE"],
+                                                       key=f"project_method_{index}")
+            elif trigger == "Scheduled Event":
+                function["schedule"] = st.text_input("Expresión de programación", value="rate(1 hour)",
+                                                     key=f"project_schedule_{index}")
+            elif trigger == "SNS":
+                function["topic_arn"] = st.text_input("ARN del Topic SNS (opcional)", key=f"project_topic_{index}")
+            elif trigger == "SQS":
+                function["queue_arn"] = st.text_input("ARN de la cola SQS (opcional)", key=f"project_queue_{index}")
+                function["sqs"] = dict(SQS_DEFAULTS, batch_size=st.number_input(
+                    "Tamaño del lote", 1, 10000, SQS_DEFAULTS["batch_size"], key=f"project_batch_{index}"
+                ))
+            descriptions[name] = st.text_area("¿Qué debe hacer?", key=f"project_description_{index}", height=80)
+            project_functions.append(function)
+
+    names = [function["name"] for function in project_functions]
+    project_errors = validate_config(project_globals, trigger=False)
+    project_errors += [f"{function['name']}: {error}" for function in project_functions
+                       for error in trigger_errors(function)]
+    if len(set(names)) != len(names):
+        project_errors.append("Cada función debe tener un nombre distinto.")
+    for error in project_errors:
+        st.error(f"❌ {error}")
+
+    ############################
+    # 3. Generación
+    ############################
+    if st.button("🚀 Generar Proyecto", disabled=bool(project_errors)):
+        llm = get_llm()
+        progress = st.empty()
+        placeholders = {}
+        with progress.container():
+            for tab, name in zip(st.tabs(names), names):
+                with tab:
+                    placeholders[name] = st.empty()
+                    placeholders[name].info("⏳ Generando código...")
+
+        # Todas las funciones se generan a la vez: el tiempo total es el de la más lenta
+        with st.spinner(f"Generando {len(names)} funciones en paralelo..."):
+            responses = invoke_concurrently(
+                llm,
+                {function["name"]: build_code_prompt(descriptions[function["name"]], dict(project_globals, **function),
+                                                     explain=False)
+                 for function in project_functions},
+                on_result=lambda name, text: placeholders[name].code(extract_python_code(text), language="python")
+            )
+
+        handlers = {name: extract_python_code(responses[name]) for name in names}
+        report = package_report(handlers, budget_mb)
+        project = {
+            "name": project_name,
+            "globals": project_globals,
+            "functions": project_functions,
+            "layer_requirements": report["layer"]["requirements"]
+        }
+        template = generate_project_template(project)
+        st.session_state["project"] = {
+            "template": template,
+            "handlers": handlers,
+            "report": report,
+            "archive": build_project_archive(template, handlers, report["layer"]["requirements"])
+        }
+        progress.empty()
+
+    if st.session_state.get("project"):
+        show_project_result(st.session_state["project"])
+
 elif tool_selection == "🔍 Debugger de Lambdas":
     st.markdown("""
     ## AWS Lambda Debugger
@@ -700,8 +1655,9 @@ elif tool_selection == "🔍 Debugger de Lambdas":
     # Selector de método de entrada
     input_method = st.radio(
         "¿Cómo quieres proporcionar tu código?",
-        ["📋 Pegar Código", "📁 Subir Archivos"],
-        help="Escoge cómo quieres proporcionar el código para analizar"
+        ["📋 Pegar Código", "📁 Subir Archivos", "📦 Lote de Funciones"],
+        help="Escoge cómo quieres proporcionar el código para analizar. "
+             "El modo lote analiza todos los handlers de un zip o una carpeta"
     )
 
     handler_content = None
@@ -722,7 +1678,7 @@ elif tool_selection == "🔍 Debugger de Lambdas":
             help="Pega el contenido de tu archivo template.yaml si lo tienes"
         )
 
-    else:  # Subir Archivos
+    elif input_method == "📁 Subir Archivos":
         uploaded_handler = st.file_uploader("Sube tu archivo handler.py", type=["py"])
         uploaded_template = st.file_uploader("Sube tu template.yaml (opcional)", type=["yaml", "yml"])
 
@@ -731,98 +1687,237 @@ elif tool_selection == "🔍 Debugger de Lambdas":
         if uploaded_template is not None:
             template_content = uploaded_template.getvalue().decode("utf-8")
 
-    if handler_content:
-        st.markdown("### 📄 Código a Analizar")
-        st.code(handler_content, language="python")
+    else:  # Lote de Funciones
+        with st.expander("ℹ️ ¿Cómo funciona el modo lote?"):
+            st.markdown("""
+            📦 **Análisis de muchas Lambdas a la vez:**
 
-        # Obtener instancia de LLM una sola vez
-        llm = get_llm()
+            - Sube un zip de tu repositorio o indica la ruta de una carpeta local
+            - Se analiza cada fichero `.py` que define un handler, junto al `template.yaml` más cercano
+            - Las peticiones se reparten con concurrencia limitada y se reintentan si el proveedor responde 429
+            - Desde la terminal: `python -m lambda_tools.batch ruta/al/repo --format csv`
+            """)
+
+        uploaded_zip = st.file_uploader("Sube un zip con tus handlers y templates", type=["zip"])
+        directory_path = st.text_input(
+            "...o la ruta de una carpeta local",
+            help="Ruta accesible desde el servidor donde se ejecuta la aplicación"
+        )
 
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("🔍 Analizar Código"):
-                with st.spinner("Analizando tu código..."):
-                    analysis_prompt = """Analiza el siguiente código de AWS Lambda y proporciona un informe detallado:
-
-                    CÓDIGO PYTHON:
-                    {handler_code}
-
-                    {template_section}
+            batch_concurrency = st.slider("Análisis simultáneos", 1, 16, 4)
+        with col2:
+            batch_rpm = st.number_input("Peticiones por minuto", min_value=1, max_value=10000, value=60)
+
+        batch_functions = []
+        try:
+            if uploaded_zip is not None:
+                batch_functions = discover_functions(uploaded_zip.getvalue())
+            elif directory_path:
+                batch_functions = discover_functions(directory_path)
+        except (ValueError, OSError, zipfile.BadZipFile) as exc:
+            st.error(f"No se pudieron leer los handlers: {exc}")
+
+        if batch_functions:
+            st.success(f"Se encontraron {len(batch_functions)} handlers")
+
+            if st.button("🚀 Analizar Lote"):
+                llm = get_llm()
+                progress = st.progress(0.0, text="Analizando handlers...")
+
+                def update_progress(row, done, total):
+                    progress.progress(done / total, text=f"[{done}/{total}] {row['path']}")
+
+                st.session_state["batch_results"] = analyze_batch(
+                    llm,
+                    batch_functions,
+                    max_concurrency=batch_concurrency,
+                    requests_per_minute=batch_rpm,
+                    on_result=update_progress
+                )
 
-                    Por favor, proporciona un análisis detallado que incluya:
+        if st.session_state.get("batch_results"):
+            batch_results = st.session_state["batch_results"]
+            st.markdown("### 📊 Informe del Lote")
+            st.caption("Pulsa en la cabecera de una columna para ordenar el informe.")
+            st.dataframe(
+                [{field: row[field] for field in REPORT_FIELDS if field != "analysis"} for row in batch_results],
+                use_container_width=True
+            )
 
-                    1. 📝 Análisis de Código
-                       - Estructura y organización
-                       - Manejo de errores
-                       - Logging y monitoreo
-                       - Seguridad
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    "⬇️ Descargar informe (CSV)",
+                    report_to_csv(sort_report(batch_results)),
+                    file_name="lambda_batch_report.csv",
+                    mime="text/csv"
+                )
+            with col2:
+                st.download_button(
+                    "⬇️ Descargar informe (Markdown)",
+                    report_to_markdown(sort_report(batch_results)),
+                    file_name="lambda_batch_report.md",
+                    mime="text/markdown"
+                )
 
-                    2. ⚠️ Problemas Potenciales
-                       - Problemas de rendimiento
-                       - Fugas de memoria
-                       - Problemas de seguridad
-                       - Malas prácticas
+            for row in sort_report(batch_results):
+                with st.expander(f"{'✅' if row['status'] == 'ok' else '❌'} {row['path']}"):
+                    st.markdown(row["analysis"])
 
-                    3. ✅ Recomendaciones
-                       - Mejoras específicas de código
-                       - Optimizaciones
-                       - Mejores prácticas
-                       - Patrones recomendados
+    if handler_content:
+        st.markdown("### 📄 Código a Analizar")
+        st.code(handler_content, language="python")
 
-                    4. 📊 Recursos y Costos
-                       - Uso de memoria
-                       - Tiempo de ejecución
-                       - Costos estimados
-                       - Optimización de recursos
+        # Análisis estático instantáneo, antes de cualquier llamada al LLM
+        static_findings = analyze_handler(handler_content)
+        st.markdown("### ⚡ Análisis Estático de Rendimiento")
+        if static_findings:
+            st.warning(format_findings(static_findings))
+        else:
+            st.success("No se han detectado anti-patrones de rendimiento conocidos.")
+
+        st.markdown("### ⏱️ Perfil de Cold Start")
+        if st.button(
+            "⏱️ Medir Cold Start",
+            help="Importa el handler en un proceso aislado y mide el tiempo de init, los imports y la memoria"
+        ):
+            with st.spinner("Midiendo la inicialización del handler..."):
+                profile = profile_cold_start(handler_content)
+            show_cold_start_profile(profile)
+
+        st.markdown("### 📈 Benchmark Local")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            debugger_trigger = st.selectbox("Trigger del evento de prueba", list(SAMPLE_EVENT_BUILDERS))
+        with col2:
+            debugger_iterations = st.number_input("Invocaciones en caliente", 1, 1000, 50)
+        with col3:
+            debugger_cold_runs = st.number_input("Arranques en frío", 1, 20, 3)
+        with col4:
+            debugger_records = st.number_input("Registros por evento", 1, 10000, 1)
+
+        if st.button(
+            "📈 Ejecutar Benchmark",
+            help="Invoca el handler con un evento sintético, sin conectarse a AWS, y mide latencia y memoria"
+        ):
+            with st.spinner("Ejecutando el handler con eventos sintéticos..."):
+                show_benchmark(run_benchmark(
+                    handler_content,
+                    debugger_trigger,
+                    iterations=debugger_iterations,
+                    cold_runs=debugger_cold_runs,
+                    records=debugger_records
+                ))
+
+        st.markdown("### 📊 Logs de Producción (opcional)")
+        st.caption("Logs exportados de CloudWatch (líneas REPORT, texto, JSON o .gz) o trazas de X-Ray "
+                   "(`aws xray batch-get-traces`). Se procesan en streaming, así que admiten ficheros de varios GB.")
+        col1, col2 = st.columns(2)
+        with col1:
+            uploaded_logs = st.file_uploader(
+                "Sube los logs o trazas", type=["log", "txt", "json", "jsonl", "gz"], accept_multiple_files=True
+            )
+        with col2:
+            logs_path = st.text_input(
+                "...o la ruta de un fichero local",
+                help="Ruta accesible desde el servidor; útil para exportaciones mayores que el límite de subida"
+            )
 
-                    Usa un lenguaje claro y proporciona ejemplos específicos cuando sea necesario."""
+        log_sources = [(uploaded.name, uploaded) for uploaded in uploaded_logs or []]
+        if logs_path:
+            log_sources.append((logs_path, logs_path))
+        if log_sources and st.button("📊 Analizar Logs"):
+            log_stats = {}
+            with st.spinner("Procesando los logs..."):
+                for name, source in log_sources:
+                    try:
+                        log_stats[name] = analyze_log_file(source)
+                    except (OSError, ValueError, EOFError) as exc:
+                        st.error(f"No se pudo leer {name}: {exc}")
+            st.session_state["debugger_log_stats"] = log_stats
+
+        # Solo se usan las estadísticas de los ficheros seleccionados ahora mismo
+        log_stats = {name: stats for name, stats in st.session_state.get("debugger_log_stats", {}).items()
+                     if name in dict(log_sources)}
+        for name, stats in log_stats.items():
+            st.markdown(f"**{name}**")
+            show_log_stats(stats)
+        production_stats = "\n\n".join(f"{name}:\n{format_log_stats(stats)}" for name, stats in log_stats.items())
 
-                    template_section = f"\nTEMPLATE SAM:\n{template_content}" if template_content else ""
-                    
-                    analysis = llm.invoke(analysis_prompt.format(
-                        handler_code=handler_content,
-                        template_section=template_section
-                    ))
+        # Obtener instancia de LLM una sola vez
+        llm = get_llm()
 
-                    st.markdown("### 📋 Análisis Detallado")
-                    st.info(analysis.content)
+        analysis_prompts, analysis_merge = plan_analysis(
+            handler_content, template_content, static_findings, production_stats
+        )
+        improvement_prompt = build_improvement_prompt(handler_content, static_findings)
+        analysis_tokens = sum(count_tokens(prompt) for prompt in analysis_prompts.values())
+        if analysis_merge is None:
+            st.caption(f"Prompt de análisis: {analysis_tokens} tokens (presupuesto: {DEFAULT_PROMPT_BUDGET})")
+        else:
+            st.caption(f"El handler supera el presupuesto de {DEFAULT_PROMPT_BUDGET} tokens: se analizará en "
+                       f"{len(analysis_prompts)} fragmentos en paralelo ({analysis_tokens} tokens) y se combinarán")
 
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            analyze_clicked = st.button("🔍 Analizar Código")
         with col2:
-            if st.button("🔧 Generar Código Mejorado"):
-                with st.spinner("Generando versión mejorada..."):
-                    improvement_prompt = """Basándote en el código proporcionado, genera una versión mejorada que solucione los problemas identificados:
-
-                    CÓDIGO ORIGINAL:
-                    {code}
-
-                    Genera una versión mejorada que:
-                    1. Solucione los problemas identificados
-                    2. Implemente las mejores prácticas
-                    3. Optimice el rendimiento
-                    4. Mejore la seguridad
-                    
-                    Proporciona el código completo y mejorado, junto con comentarios explicativos.
-                    El código debe ser una única implementación coherente, sin alternativas ni código comentado."""
-
-                    improved_code = llm.invoke(improvement_prompt.format(code=handler_content))
-                    
-                    st.markdown("### 📝 Código Mejorado Sugerido")
-                    st.code(improved_code.content, language="python")
-                    
-                    # Botones para descargar y copiar
-                    st.download_button(
-                        "⬇️ Descargar Código Mejorado",
-                        improved_code.content,
-                        file_name="handler_improved.py",
-                        mime="text/plain"
+            improve_clicked = st.button("🔧 Generar Código Mejorado")
+        with col3:
+            full_report_clicked = st.button(
+                "📑 Informe Completo",
+                help="Lanza el análisis y la mejora a la vez y muestra cada resultado en cuanto termina"
+            )
+
+        if analyze_clicked:
+            with st.spinner("Analizando tu código..."):
+                analysis = run_plan(llm, analysis_prompts, analysis_merge)
+
+            st.markdown("### 📋 Análisis Detallado")
+            st.info(analysis)
+
+        if improve_clicked:
+            with st.spinner("Generando versión mejorada..."):
+                improved_code = cached_invoke(llm, improvement_prompt)
+
+            show_improved_code(improved_code)
+
+        if full_report_clicked:
+            st.markdown("### 📋 Análisis Detallado")
+            analysis_placeholder = st.empty()
+            analysis_placeholder.info("⏳ Analizando tu código...")
+            improvement_container = st.container()
+            with improvement_container:
+                improvement_placeholder = st.empty()
+                improvement_placeholder.info("⏳ Generando versión mejorada...")
+
+            completed_chunks = []
+
+            def render_report_part(name, content):
+                if name == "improvement":
+                    improvement_placeholder.empty()
+                    with improvement_container:
+                        show_improved_code(content)
+                elif analysis_merge is None:
+                    analysis_placeholder.info(content)
+                else:
+                    completed_chunks.append(name)
+                    analysis_placeholder.info(
+                        f"⏳ Fragmentos analizados: {len(completed_chunks)}/{len(analysis_prompts)}..."
                     )
-                    
-                    if st.button("📋 Copiar al Portapapeles"):
-                        st.write(
-                            f'<script>navigator.clipboard.writeText(`{improved_code.content}`)</script>', 
-                            unsafe_allow_html=True
-                        )
-                        st.success("¡Código copiado al portapapeles!")
+
+            report_parts = invoke_concurrently(
+                llm,
+                {**analysis_prompts, "improvement": improvement_prompt},
+                on_result=render_report_part
+            )
+            if analysis_merge is not None:
+                analysis_placeholder.info("⏳ Combinando los análisis de los fragmentos...")
+                analysis_placeholder.info(cached_invoke(
+                    llm, analysis_merge({name: report_parts[name] for name in analysis_prompts})
+                ))
 
 if __name__ == "__main__":
     with st.sidebar:
@@ -873,6 +1968,7 @@ if __name__ == "__main__":
                 3. Recibe sugerencias de mejora
                 
                 #### Qué analiza
+                - Anti-patrones de rendimiento (análisis estático instantáneo)
                 - Estructura del código
                 - Problemas potenciales
                 - Oportunidades de mejora
@@ -927,6 +2023,41 @@ if __name__ == "__main__":
             - Usa el tier gratuito cuando sea posible
             """)
             
+        with st.expander("⚡ Caché de Respuestas"):
+            cache_stats = get_response_cache().stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Aciertos", cache_stats["hits"])
+            col2.metric("Fallos", cache_stats["misses"])
+            col3.metric("Entradas", cache_stats["entries"])
+            st.caption("Las respuestas idénticas se sirven desde la caché local sin consumir tokens.")
+            if st.button("🗑️ Vaciar caché"):
+                get_response_cache().clear()
+                st.success("Caché vaciada")
+
+        with st.expander("🧠 Caché Semántica"):
+            semantic_stats = get_semantic_cache().stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Aciertos", semantic_stats["hits"])
+            col2.metric("Fallos", semantic_stats["misses"])
+            col3.metric("Entradas", semantic_stats["entries"])
+            st.caption(f"Descripciones parecidas (similitud ≥ {semantic_stats['threshold']:.0%}) con la misma "
+                       f"configuración reutilizan la generación anterior. Embeddings: {semantic_stats['embedder']}.")
+            if st.button("🗑️ Vaciar índice semántico"):
+                get_semantic_cache().clear()
+                st.success("Índice vaciado")
+
+        with st.expander("🔌 Conexiones al LLM"):
+            connection_stats = pool_stats()
+            col1, col2 = st.columns(2)
+            col1.metric("Peticiones", connection_stats["requests"])
+            col2.metric("En curso", connection_stats["in_flight"])
+            col1.metric("Conexiones abiertas", f"{connection_stats['open_connections']}/{connection_stats['max_connections']}")
+            col2.metric("Latencia media", f"{connection_stats['avg_latency_ms']} ms")
+            st.caption(
+                f"Clientes creados en este proceso: {connection_stats['clients_created']} · "
+                f"Errores: {connection_stats['errors']}"
+            )
+
         with st.expander("🔗 Enlaces Útiles"):
             st.markdown("""
             ### Documentación Oficial
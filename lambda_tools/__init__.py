@@ -0,0 +1,43 @@
+"""Utilidades compartidas de AWS Lambda Tools (sin dependencia de Streamlit).
+
+Las funciones principales se pueden importar desde el paquete
+(`from lambda_tools import generate_sam_template`); cada módulo se carga la
+primera vez que se usa uno de sus nombres, de modo que generar un template no
+paga la importación de LangChain ni del resto del paquete. El estimador de costes
+(`lambda_tools.costs`) no se reexporta porque necesita NumPy, que no está en las
+dependencias del núcleo.
+"""
+import importlib
+
+# Nombre público -> módulo que lo define
+_EXPORTS = {
+    "generate_sam_template": "sam",
+    "generate_project_template": "sam",
+    "validate_config": "sam",
+    "analyze_handler": "static_analysis",
+    "format_findings": "static_analysis",
+    "analyze_log_file": "logs",
+    "format_log_stats": "logs",
+    "run_benchmark": "bench",
+    "build_sample_event": "bench",
+    "recommend": "power_tuning",
+    "validate_handler": "validation",
+    "fill_skeleton": "skeletons",
+    "build_generation_prompt": "prompts",
+    "plan_analysis": "prompts",
+    "get_shared_llm": "llm"
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
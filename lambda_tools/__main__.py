@@ -0,0 +1,6 @@
+"""Permite ejecutar la CLI con `python -m lambda_tools`."""
+import sys
+
+from lambda_tools.cli import main
+
+sys.exit(main())
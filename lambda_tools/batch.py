@@ -0,0 +1,277 @@
+"""Análisis por lotes de handlers Lambda.
+
+Recorre un zip o un directorio, localiza los handlers y su template SAM más
+cercano y lanza los prompts de análisis con concurrencia acotada. Las peticiones
+pasan por un token bucket y los errores 429 se reintentan con backoff exponencial.
+
+Uso sin interfaz:
+
+    lambda-tools batch ruta/al/repo --concurrency 4 --rpm 60 --format csv
+"""
+import asyncio
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+
+from lambda_tools.llm import arun_plan, submit
+from lambda_tools.prompts import plan_analysis
+from lambda_tools.static_analysis import analyze_handler
+
+HANDLER_PATTERN = re.compile(r"^\s*(?:async\s+)?def\s+\w*handler\w*\s*\(", re.MULTILINE)
+TEMPLATE_NAMES = ("template.yaml", "template.yml")
+SKIPPED_DIRS = {".git", ".aws-sam", ".venv", "venv", "node_modules", "__pycache__", "site-packages", "tests"}
+REPORT_FIELDS = ["path", "template", "lines", "findings", "status", "attempts", "seconds", "analysis"]
+
+############################
+# Descubrimiento de handlers
+############################
+def _is_skipped(path):
+    return any(part in SKIPPED_DIRS for part in path.split("/")[:-1])
+
+
+def _find_template(directory, templates):
+    """Busca el template SAM en el directorio del handler o en sus padres."""
+    while True:
+        if directory in templates:
+            return templates[directory]
+        if not directory:
+            return None
+        directory = os.path.dirname(directory)
+
+
+def collect_functions(files):
+    """Agrupa un diccionario ruta -> contenido en handlers con su template asociado."""
+    templates = {}
+    for path, content in files.items():
+        if os.path.basename(path) in TEMPLATE_NAMES:
+            templates[os.path.dirname(path)] = (path, content)
+
+    functions = []
+    for path in sorted(files):
+        source = files[path]
+        if not path.endswith(".py") or not HANDLER_PATTERN.search(source):
+            continue
+        template = _find_template(os.path.dirname(path), templates)
+        functions.append({
+            "path": path,
+            "source": source,
+            "template_path": template[0] if template else None,
+            "template": template[1] if template else None
+        })
+    return functions
+
+
+def _read_text(data):
+    return data.decode("utf-8", errors="replace")
+
+
+def load_zip(data):
+    """Lee los handlers y templates de un zip (ruta o bytes)."""
+    if isinstance(data, bytes):
+        data = io.BytesIO(data)
+
+    files = {}
+    with zipfile.ZipFile(data) as archive:
+        for name in archive.namelist():
+            if name.endswith("/") or _is_skipped(name):
+                continue
+            if name.endswith(".py") or os.path.basename(name) in TEMPLATE_NAMES:
+                files[name] = _read_text(archive.read(name))
+    return collect_functions(files)
+
+
+def load_directory(root):
+    """Lee los handlers y templates de un directorio local."""
+    files = {}
+    for current, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+        for name in names:
+            if name.endswith(".py") or name in TEMPLATE_NAMES:
+                full_path = os.path.join(current, name)
+                relative = os.path.relpath(full_path, root).replace(os.sep, "/")
+                with open(full_path, "rb") as handle:
+                    files[relative] = _read_text(handle.read())
+    return collect_functions(files)
+
+
+def discover_functions(source):
+    """Carga los handlers desde un directorio, un fichero zip o los bytes de un zip."""
+    if isinstance(source, bytes) or zipfile.is_zipfile(source):
+        return load_zip(source)
+    if os.path.isdir(source):
+        return load_directory(source)
+    raise ValueError(f"No se reconoce '{source}' como directorio ni como fichero zip.")
+
+############################
+# Planificación de peticiones
+############################
+class TokenBucket:
+    """Limitador de peticiones por token bucket para corrutinas de asyncio."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds):
+        """Detiene la emisión de tokens (por ejemplo, tras recibir un 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_rate_limit_error(exc):
+    """Indica si la excepción corresponde a un 429 del proveedor."""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def _retry_after(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _analyze_function(llm, function, bucket, semaphore, max_retries, base_delay):
+    findings = analyze_handler(function["source"])
+    prompts, merge = plan_analysis(function["source"], function["template"], findings)
+    # Los handlers grandes se analizan por fragmentos: cada petición consume del token bucket
+    requests = len(prompts) + (merge is not None)
+    started = time.monotonic()
+    attempts = 0
+
+    async with semaphore:
+        while True:
+            attempts += 1
+            for _ in range(requests):
+                await bucket.acquire()
+            try:
+                analysis = await arun_plan(llm, prompts, merge)
+                status = "ok"
+                break
+            except Exception as exc:
+                if is_rate_limit_error(exc) and attempts <= max_retries:
+                    delay = _retry_after(exc) or base_delay * 2 ** (attempts - 1)
+                    delay *= 1 + random.random() * 0.25
+                    bucket.pause(delay)
+                    continue
+                analysis = f"{type(exc).__name__}: {exc}"
+                status = "rate_limited" if is_rate_limit_error(exc) else "error"
+                break
+
+    return {
+        "path": function["path"],
+        "template": function["template_path"] or "",
+        "lines": len(function["source"].splitlines()),
+        "findings": len(findings),
+        "status": status,
+        "attempts": attempts,
+        "seconds": round(time.monotonic() - started, 2),
+        "analysis": analysis
+    }
+
+
+async def _create_limits(max_concurrency, requests_per_minute):
+    # Se crean dentro del bucle compartido, que es donde se van a usar
+    return TokenBucket(requests_per_minute / 60.0), asyncio.Semaphore(max_concurrency)
+
+
+def analyze_batch(llm, functions, max_concurrency=4, requests_per_minute=60, max_retries=5,
+                  base_delay=2.0, on_result=None):
+    """Analiza todos los handlers y devuelve una fila de informe por cada uno.
+
+    `on_result(fila, completados, total)` se llama desde el hilo que invoca al
+    terminar cada análisis.
+    """
+    bucket, semaphore = submit(_create_limits(max_concurrency, requests_per_minute)).result()
+    futures = [
+        submit(_analyze_function(llm, function, bucket, semaphore, max_retries, base_delay))
+        for function in functions
+    ]
+
+    results = []
+    for future in concurrent.futures.as_completed(futures):
+        results.append(future.result())
+        if on_result is not None:
+            on_result(results[-1], len(results), len(futures))
+    return results
+
+############################
+# Informe
+############################
+def sort_report(results, sort_by="path", descending=False):
+    """Ordena las filas del informe por cualquiera de sus columnas."""
+    return sorted(results, key=lambda row: row[sort_by], reverse=descending)
+
+
+def report_to_json(results):
+    return json.dumps(results, ensure_ascii=False, indent=2)
+
+
+def report_to_csv(results):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+    return output.getvalue()
+
+
+def report_to_markdown(results):
+    lines = [
+        "| Handler | Template | Líneas | Hallazgos | Estado | Intentos | Segundos |",
+        "|---|---|---|---|---|---|---|"
+    ]
+    for row in results:
+        lines.append(
+            f"| {row['path']} | {row['template']} | {row['lines']} | {row['findings']} | {row['status']} "
+            f"| {row['attempts']} | {row['seconds']} |"
+        )
+    for row in results:
+        lines.extend(["", f"## {row['path']}", "", row["analysis"]])
+    return "\n".join(lines) + "\n"
+
+
+REPORT_FORMATS = {
+    "json": report_to_json,
+    "csv": report_to_csv,
+    "markdown": report_to_markdown
+}
+
+############################
+# Línea de comandos
+############################
+def main(argv=None):
+    """Equivale a `lambda-tools batch`: los argumentos están definidos en `lambda_tools.cli`."""
+    from lambda_tools.cli import main as cli_main
+
+    return cli_main(["batch", *(sys.argv[1:] if argv is None else argv)])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Benchmark local de handlers con eventos sintéticos.
+
+Construye eventos de ejemplo realistas para cada trigger soportado por el
+generador e invoca `lambda_handler` N veces dentro de un subproceso aislado
+(`bench_runner.py`), con las llamadas a AWS redirigidas a stubs locales. Mide
+el cold start (init + primera invocación) en varios procesos nuevos y las
+invocaciones en caliente, y devuelve percentiles de latencia y el pico de RSS.
+"""
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from lambda_tools.profiling import sandbox_env
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_runner.py")
+# Versiones de CPython que se buscan en el PATH para comparar intérpretes
+INTERPRETER_VERSIONS = ("3.8", "3.9", "3.10", "3.11", "3.12", "3.13")
+ACCOUNT_ID = "123456789012"
+REGION = "us-east-1"
+
+############################
+# Eventos de ejemplo
+############################
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _s3_event(config, records):
+    bucket = config.get("bucket_name") or "mi-empresa-archivos"
+    prefix = config.get("prefix") or ""
+    return {"Records": [{
+        "eventVersion": "2.1",
+        "eventSource": "aws:s3",
+        "awsRegion": REGION,
+        "eventTime": _now().isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "eventName": "ObjectCreated:Put",
+        "userIdentity": {"principalId": "AWS:EXAMPLE"},
+        "requestParameters": {"sourceIPAddress": "203.0.113.10"},
+        "responseElements": {"x-amz-request-id": uuid.uuid4().hex[:16].upper(), "x-amz-id-2": uuid.uuid4().hex},
+        "s3": {
+            "s3SchemaVersion": "1.0",
+            "configurationId": "lambda-tools-trigger",
+            "bucket": {
+                "name": bucket,
+                "ownerIdentity": {"principalId": "EXAMPLE"},
+                "arn": f"arn:aws:s3:::{bucket}"
+            },
+            "object": {
+                "key": f"{prefix}archivo-{index}.csv",
+                "size": 1024 * (index + 1),
+                "eTag": uuid.uuid4().hex,
+                "sequencer": f"{index:016X}"
+            }
+        }
+    } for index in range(records)]}
+
+
+def _api_gateway_event(config, records):
+    method = config.get("http_method") or "GET"
+    path = config.get("route") or "/api/v1/datos"
+    body = json.dumps({"id": str(uuid.uuid4()), "nombre": "Ejemplo", "cantidad": 3}) if method in ("POST", "PUT") else None
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Host": "abc123.execute-api.us-east-1.amazonaws.com",
+            "User-Agent": "lambda-tools-bench",
+            "X-Forwarded-For": "203.0.113.10"
+        },
+        "multiValueHeaders": {},
+        "queryStringParameters": {"limit": "10"} if method == "GET" else None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": None,
+        "stageVariables": None,
+        "requestContext": {
+            "accountId": ACCOUNT_ID,
+            "apiId": "abc123",
+            "httpMethod": method,
+            "path": f"/prod{path}",
+            "stage": "prod",
+            "requestId": str(uuid.uuid4()),
+            "requestTimeEpoch": int(_now().timestamp() * 1000),
+            "identity": {"sourceIp": "203.0.113.10", "userAgent": "lambda-tools-bench"}
+        },
+        "body": body,
+        "isBase64Encoded": False
+    }
+
+
+def _scheduled_event(config, records):
+    return {
+        "version": "0",
+        "id": str(uuid.uuid4()),
+        "detail-type": "Scheduled Event",
+        "source": "aws.events",
+        "account": ACCOUNT_ID,
+        "time": _now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "region": REGION,
+        "resources": [f"arn:aws:events:{REGION}:{ACCOUNT_ID}:rule/lambda-tools-schedule"],
+        "detail": {}
+    }
+
+
+def _sns_event(config, records):
+    topic_arn = config.get("topic_arn") or f"arn:aws:sns:{REGION}:{ACCOUNT_ID}:mi-topic"
+    return {"Records": [{
+        "EventSource": "aws:sns",
+        "EventVersion": "1.0",
+        "EventSubscriptionArn": f"{topic_arn}:{uuid.uuid4()}",
+        "Sns": {
+            "Type": "Notification",
+            "MessageId": str(uuid.uuid4()),
+            "TopicArn": topic_arn,
+            "Subject": "Notificación de ejemplo",
+            "Message": json.dumps({"id": index, "estado": "CREADO"}),
+            "Timestamp": _now().isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "SignatureVersion": "1",
+            "Signature": "EXAMPLE",
+            "SigningCertUrl": "https://sns.us-east-1.amazonaws.com/cert.pem",
+            "UnsubscribeUrl": "https://sns.us-east-1.amazonaws.com/unsubscribe",
+            "MessageAttributes": {"tipo": {"Type": "String", "Value": "pedido"}}
+        }
+    } for index in range(records)]}
+
+
+def _sqs_event(config, records):
+    queue_arn = config.get("queue_arn") or f"arn:aws:sqs:{REGION}:{ACCOUNT_ID}:mi-cola"
+    sent = str(int(_now().timestamp() * 1000))
+    return {"Records": [{
+        "messageId": str(uuid.uuid4()),
+        "receiptHandle": uuid.uuid4().hex,
+        "body": json.dumps({"pedido_id": index, "importe": 10.5 * (index + 1)}),
+        "attributes": {
+            "ApproximateReceiveCount": "1",
+            "SentTimestamp": sent,
+            "SenderId": "AIDAEXAMPLE",
+            "ApproximateFirstReceiveTimestamp": sent
+        },
+        "messageAttributes": {},
+        "md5OfBody": uuid.uuid4().hex,
+        "eventSource": "aws:sqs",
+        "eventSourceARN": queue_arn,
+        "awsRegion": REGION
+    } for index in range(records)]}
+
+
+SAMPLE_EVENT_BUILDERS = {
+    "S3 Upload": _s3_event,
+    "API Gateway": _api_gateway_event,
+    "Scheduled Event": _scheduled_event,
+    "SNS": _sns_event,
+    "SQS": _sqs_event
+}
+
+
+def build_sample_event(trigger, config=None, records=1):
+    """Construye un evento de ejemplo para el trigger indicado.
+
+    `config` son los `config_values` del generador (bucket, ruta, método...).
+    `records` es el número de registros para los triggers que agrupan eventos.
+    """
+    if trigger not in SAMPLE_EVENT_BUILDERS:
+        raise ValueError(f"Trigger no soportado: {trigger}")
+    return SAMPLE_EVENT_BUILDERS[trigger](config or {}, records)
+
+############################
+# Ejecución
+############################
+def percentile(values, q):
+    """Percentil por el método del rango más cercano."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(values):
+    """Resume una serie de tiempos en ms (p50/p95/p99, media y máximo)."""
+    if not values:
+        return None
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "mean": round(sum(values) / len(values), 2),
+        "max": round(max(values), 2),
+        "count": len(values)
+    }
+
+
+def run_handler(source, event, iterations=0, memory_mb=128, timeout_s=30, aws="auto",
+                handler_name="lambda_handler", python=sys.executable, max_seconds=None):
+    """Ejecuta el runner en un proceso nuevo y devuelve sus mediciones en bruto.
+
+    `max_seconds` limita la duración total del proceso; por defecto se calcula
+    a partir del timeout de la función y del número de invocaciones.
+    """
+    with tempfile.TemporaryDirectory(prefix="lambda-tools-bench-") as workdir:
+        handler_path = os.path.join(workdir, "handler.py")
+        config_path = os.path.join(workdir, "config.json")
+        result_path = os.path.join(workdir, "result.json")
+        with open(handler_path, "w", encoding="utf-8") as handle:
+            handle.write(source)
+        with open(config_path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "handler_path": handler_path,
+                "handler_name": handler_name,
+                "event": event,
+                "iterations": iterations,
+                "memory_mb": memory_mb,
+                "timeout_s": timeout_s,
+                "aws": aws
+            }, handle)
+
+        env = sandbox_env(home=workdir)
+        env["AWS_LAMBDA_FUNCTION_MEMORY_SIZE"] = str(memory_mb)
+        # El timeout de la función se aplica a cada invocación; se deja margen para el init
+        budget = max_seconds or timeout_s * (iterations + 1) + 60
+        try:
+            process = subprocess.run(
+                [python, RUNNER_PATH, config_path, result_path],
+                cwd=workdir, env=env, capture_output=True, text=True, timeout=budget
+            )
+        except subprocess.TimeoutExpired:
+            return {"error": f"El benchmark superó {budget} s", "errors": 1, "warm_ms": [], "warm_cpu_ms": [],
+                    "timed_out": True}
+
+        if not os.path.exists(result_path):
+            detail = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "el runner falló"
+            return {"error": detail, "errors": 1, "warm_ms": [], "warm_cpu_ms": []}
+        with open(result_path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+
+def run_benchmark(source, trigger, config=None, iterations=50, cold_runs=3, records=1, aws="auto",
+                  handler_name="lambda_handler", python=sys.executable):
+    """Mide el handler con un evento sintético del trigger en frío y en caliente.
+
+    Lanza `cold_runs` procesos nuevos (cada uno mide init + primera invocación);
+    el primero de ellos ejecuta además `iterations` invocaciones en caliente.
+    """
+    config = config or {}
+    event = build_sample_event(trigger, config, records)
+    memory_mb = config.get("memory", 128)
+    timeout_s = config.get("timeout", 30)
+
+    runs = [
+        run_handler(source, event, iterations if index == 0 else 0, memory_mb, timeout_s, aws, handler_name, python)
+        for index in range(max(1, cold_runs))
+    ]
+    completed = [run for run in runs if run.get("init_ms") is not None and run.get("cold_ms") is not None]
+    first = runs[0]
+    errors = [run["error"] for run in runs if run.get("error")]
+
+    return {
+        "trigger": trigger,
+        "records": records,
+        "iterations": len(first.get("warm_ms", [])),
+        "cold_runs": len(completed),
+        "aws_mode": first.get("aws_mode"),
+        "init": summarize([run["init_ms"] for run in completed]),
+        "cold": summarize([run["init_ms"] + run["cold_ms"] for run in completed]),
+        "warm": summarize(first.get("warm_ms", [])),
+        "warm_cpu": summarize(first.get("warm_cpu_ms", [])),
+        "peak_rss_mb": max((run["peak_rss_mb"] for run in completed if run.get("peak_rss_mb")), default=None),
+        "errors": sum(run.get("errors", 0) for run in runs),
+        "error": errors[0] if errors else None,
+        "python": python
+    }
+
+############################
+# Comparación de intérpretes
+############################
+def _interpreter_version(python):
+    try:
+        process = subprocess.run(
+            [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+            capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return process.stdout.strip() if process.returncode == 0 else None
+
+
+def find_interpreters(versions=INTERPRETER_VERSIONS):
+    """Busca en el PATH los intérpretes de CPython disponibles y devuelve {versión: ruta}.
+
+    Lanzar un proceso por intérprete cuesta más de un segundo, así que el
+    resultado se guarda durante toda la vida del proceso.
+    """
+    return dict(_find_interpreters(tuple(versions)))
+
+
+@lru_cache(maxsize=8)
+def _find_interpreters(versions):
+    found = {}
+    seen = set()
+    candidates = [sys.executable] + [shutil.which(f"python{version}") for version in versions]
+    for python in filter(None, candidates):
+        real_path = os.path.realpath(python)
+        if real_path in seen:
+            continue
+        seen.add(real_path)
+        version = _interpreter_version(python)
+        if version and version not in found:
+            found[version] = python
+    return dict(sorted(found.items(), key=lambda item: tuple(int(part) for part in item[0].split("."))))
+
+
+def compare_interpreters(source, trigger, config=None, iterations=50, records=1, interpreters=None):
+    """Ejecuta el benchmark en caliente con cada intérprete disponible.
+
+    Se fuerzan los stubs simulados de AWS en todos para que la comparación mida
+    solo el código Python del handler y no la presencia de moto o botocore en
+    cada intérprete. Devuelve una fila por versión con la aceleración relativa a
+    la versión más antigua.
+    """
+    interpreters = interpreters or find_interpreters()
+    rows = []
+    for version, python in interpreters.items():
+        report = run_benchmark(source, trigger, config, iterations=iterations, cold_runs=1, records=records,
+                               aws="stub", python=python)
+        rows.append({
+            "version": version,
+            "python": python,
+            "warm_p50": report["warm"]["p50"] if report["warm"] else None,
+            "warm_p99": report["warm"]["p99"] if report["warm"] else None,
+            "cpu_p50": report["warm_cpu"]["p50"] if report["warm_cpu"] else None,
+            "init_ms": report["init"]["p50"] if report["init"] else None,
+            "error": report["error"]
+        })
+
+    baseline = next((row["warm_p50"] for row in rows if row["warm_p50"]), None)
+    for row in rows:
+        row["speedup"] = round(baseline / row["warm_p50"], 2) if baseline and row["warm_p50"] else None
+    return rows
@@ -0,0 +1,222 @@
+"""Invoca un handler dentro de este proceso y escribe las mediciones en JSON.
+
+Se lanza como subproceso desde `lambda_tools.bench` (no depende del paquete):
+
+    python bench_runner.py config.json resultado.json
+
+Las llamadas a AWS se redirigen a stubs locales: moto si está instalado, si no
+se parchea botocore para devolver respuestas vacías, y si boto3 no está
+disponible se sustituye por un módulo simulado. Si Lambda Powertools no está
+instalado, su instrumentación se sustituye por decoradores sin efecto.
+"""
+import importlib.abc
+import importlib.util
+import json
+import os
+import sys
+import time
+import types
+import uuid
+from unittest import mock
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class LambdaContext:
+    """Objeto context equivalente al que pasa el runtime de Lambda."""
+
+    def __init__(self, memory_mb, timeout_s):
+        self.function_name = "lambda-tools-bench"
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = f"arn:aws:lambda:us-east-1:123456789012:function:{self.function_name}"
+        self.memory_limit_in_mb = memory_mb
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = f"/aws/lambda/{self.function_name}"
+        self.log_stream_name = f"2024/01/01/[$LATEST]{uuid.uuid4().hex}"
+        self._deadline = time.monotonic() + timeout_s
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class _StubResponse(dict):
+    """Respuesta de botocore que devuelve un mock para cualquier clave ausente."""
+
+    def __missing__(self, key):
+        return mock.MagicMock(name=key)
+
+
+def _install_boto3_stub():
+    botocore = types.ModuleType("botocore")
+    exceptions = types.ModuleType("botocore.exceptions")
+    for name in ("BotoCoreError", "ClientError", "NoCredentialsError", "ParamValidationError", "EndpointConnectionError"):
+        setattr(exceptions, name, type(name, (Exception,), {}))
+    botocore.exceptions = exceptions
+    boto3 = mock.MagicMock(name="boto3")
+    sys.modules.update({
+        "boto3": boto3,
+        "boto3.dynamodb": boto3.dynamodb,
+        "boto3.dynamodb.conditions": boto3.dynamodb.conditions,
+        "boto3.session": boto3.session,
+        "botocore": botocore,
+        "botocore.exceptions": exceptions,
+        "botocore.config": mock.MagicMock(name="botocore.config")
+    })
+
+
+class _PowertoolsStub:
+    """Logger/Tracer/Metrics de Powertools sin efecto: los decoradores devuelven la función tal cual."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _passthrough
+
+
+def _passthrough(*args, **kwargs):
+    # @tracer.capture_method se aplica directamente; @metrics.log_metrics(...) recibe argumentos
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda func=None, *rest, **options: func
+
+
+def _powertools_attribute(name):
+    if name in ("Logger", "Tracer", "Metrics"):
+        return _PowertoolsStub
+    return mock.MagicMock(name=name)
+
+
+class _PowertoolsFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Resuelve `aws_lambda_powertools` y sus submódulos con módulos simulados."""
+
+    root = "aws_lambda_powertools"
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname == self.root or fullname.startswith(self.root + "."):
+            return importlib.util.spec_from_loader(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        module = types.ModuleType(spec.name)
+        module.__getattr__ = _powertools_attribute
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+def install_powertools_stub():
+    """Sustituye Lambda Powertools por un stub si no está instalado; devuelve si se instaló."""
+    if importlib.util.find_spec("aws_lambda_powertools") is not None:
+        return False
+    sys.meta_path.append(_PowertoolsFinder())
+    return True
+
+
+def install_aws_stubs(mode):
+    """Activa los stubs de AWS y devuelve el modo realmente usado."""
+    if mode in ("auto", "moto"):
+        try:
+            import moto
+            mock_aws = getattr(moto, "mock_aws", None)
+            if mock_aws is not None:
+                mock_aws().start()
+                return "moto"
+        except ImportError:
+            pass
+        if mode == "moto":
+            raise RuntimeError("moto no está instalado")
+
+    if mode in ("auto", "botocore"):
+        try:
+            import botocore.client
+
+            def fake_api_call(self, operation_name, api_params):
+                return _StubResponse(ResponseMetadata={"HTTPStatusCode": 200})
+
+            botocore.client.BaseClient._make_api_call = fake_api_call
+            return "botocore"
+        except ImportError:
+            pass
+
+    _install_boto3_stub()
+    return "stub"
+
+
+def _load_handler(path, handler_name):
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location("handler", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["handler"] = module
+    spec.loader.exec_module(module)
+    return getattr(module, handler_name)
+
+
+def _invoke(handler, event, memory_mb, timeout_s):
+    # Cada invocación recibe su propia copia del evento, fuera de la medición
+    event = json.loads(json.dumps(event))
+    context = LambdaContext(memory_mb, timeout_s)
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    error = None
+    try:
+        handler(event, context)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    return (time.perf_counter() - wall_started) * 1000, (time.process_time() - cpu_started) * 1000, error
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main(config_path, result_path):
+    with open(config_path, encoding="utf-8") as handle:
+        config = json.load(handle)
+
+    result = {"aws_mode": None, "init_ms": None, "errors": 0, "error": None, "warm_ms": [], "warm_cpu_ms": []}
+    # La salida del handler no debe mezclarse con la medición
+    devnull = open(os.devnull, "w")
+    sys.stdout = sys.stderr = devnull
+    try:
+        result["aws_mode"] = install_aws_stubs(config.get("aws", "auto"))
+        install_powertools_stub()
+        started = time.perf_counter()
+        handler = _load_handler(config["handler_path"], config.get("handler_name", "lambda_handler"))
+        result["init_ms"] = (time.perf_counter() - started) * 1000
+
+        memory_mb, timeout_s = config.get("memory_mb", 128), config.get("timeout_s", 30)
+        cold_ms, cold_cpu_ms, error = _invoke(handler, config["event"], memory_mb, timeout_s)
+        result.update({"cold_ms": cold_ms, "cold_cpu_ms": cold_cpu_ms})
+        if error:
+            result["errors"] += 1
+            result["error"] = error
+
+        for _ in range(config.get("iterations", 0)):
+            wall_ms, cpu_ms, error = _invoke(handler, config["event"], memory_mb, timeout_s)
+            result["warm_ms"].append(wall_ms)
+            result["warm_cpu_ms"].append(cpu_ms)
+            if error:
+                result["errors"] += 1
+                result["error"] = result["error"] or error
+    except BaseException as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        devnull.close()
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    with open(result_path, "w", encoding="utf-8") as handle:
+        json.dump(result, handle)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
@@ -0,0 +1,187 @@
+"""Caché persistente de respuestas del LLM.
+
+Las respuestas se guardan en SQLite indexadas por un hash del prompt renderizado,
+el modelo y la temperatura. La caché es compartida por todas las sesiones de
+Streamlit del proceso (y por otros procesos que usen el mismo fichero), con
+expiración por TTL y desalojo LRU cuando se supera el número máximo de entradas.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "LAMBDA_TOOLS_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-lambda-tools", "llm_cache.sqlite3")
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("LAMBDA_TOOLS_CACHE_MAX_ENTRIES", "500"))
+DEFAULT_TTL_SECONDS = int(os.getenv("LAMBDA_TOOLS_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def make_cache_key(prompt, model, temperature):
+    """Calcula la clave de caché a partir del prompt, el modelo y la temperatura."""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Caché LRU con TTL respaldada por SQLite."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+            )
+
+    def get(self, key):
+        """Devuelve la respuesta cacheada o None si no existe o ha expirado."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, content):
+        """Guarda una respuesta y aplica el desalojo por TTL y tamaño."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            """DELETE FROM responses WHERE key NOT IN (
+                   SELECT key FROM responses ORDER BY last_access DESC LIMIT ?
+               )""",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Devuelve aciertos, fallos y número de entradas almacenadas."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Devuelve la caché compartida del proceso, creándola la primera vez."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def _prompt_text(prompt):
+    """Obtiene el texto renderizado de un prompt (str o PromptValue de LangChain)."""
+    if isinstance(prompt, str):
+        return prompt
+    return prompt.to_string()
+
+
+def cached_invoke(llm, prompt, cache=None, refresh=False):
+    """Invoca el LLM reutilizando la respuesta cacheada si existe.
+
+    Devuelve directamente el texto de la respuesta. Con `refresh` se ignora la
+    respuesta cacheada y se sustituye por la nueva.
+    """
+    if cache is None:
+        cache = get_response_cache()
+    key = make_cache_key(_prompt_text(prompt), llm.model_name, llm.temperature)
+
+    content = None if refresh else cache.get(key)
+    if content is None:
+        content = llm.invoke(prompt).content
+        cache.set(key, content)
+    return content
+
+
+def cached_stream(llm, prompt, cache=None, refresh=False):
+    """Emite la respuesta del LLM por fragmentos, guardándola al terminar.
+
+    Si la respuesta ya está cacheada (y no se pide `refresh`) se emite completa
+    en un único fragmento.
+    """
+    if cache is None:
+        cache = get_response_cache()
+    key = make_cache_key(_prompt_text(prompt), llm.model_name, llm.temperature)
+
+    content = None if refresh else cache.get(key)
+    if content is not None:
+        yield content
+        return
+
+    parts = []
+    for chunk in llm.stream(prompt):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+    cache.set(key, "".join(parts))
+
+
+async def acached_invoke(llm, prompt, cache=None):
+    """Versión asíncrona de cached_invoke basada en llm.ainvoke.
+
+    Las lecturas y escrituras de SQLite van a un hilo para no bloquear el bucle
+    de eventos compartido mientras esperan al disco o al lock.
+    """
+    import asyncio
+
+    if cache is None:
+        cache = get_response_cache()
+    key = make_cache_key(_prompt_text(prompt), llm.model_name, llm.temperature)
+
+    content = await asyncio.to_thread(cache.get, key)
+    if content is None:
+        content = (await llm.ainvoke(prompt)).content
+        await asyncio.to_thread(cache.set, key, content)
+    return content
@@ -0,0 +1,269 @@
+"""Línea de comandos `lambda-tools`: generar, analizar y medir Lambdas sin la interfaz.
+
+    lambda-tools generate config.yaml -o template.yaml [--describe "..." --handler handler.py]
+    lambda-tools analyze handler.py [--template template.yaml] [--logs logs.gz] [--llm]
+    lambda-tools bench handler.py --trigger SQS [--config config.yaml] [--tune]
+    lambda-tools batch ruta/al/repo [--concurrency 4] [--rpm 60] [--format markdown|json|csv]
+
+La configuración es un fichero YAML o JSON con las mismas claves que el
+generador de la interfaz (trigger_type, memory, timeout, sqs, concurrency...).
+Cada subcomando importa solo lo que usa, y LangChain únicamente cuando se pide
+algo al modelo, para que el arranque sin LLM sea inmediato en CI.
+"""
+import argparse
+import json
+import sys
+
+# Lo que la interfaz siempre rellena y un fichero de configuración puede omitir
+CONFIG_DEFAULTS = {"handler_name": "lambda_handler", "memory": 128, "timeout": 30}
+TRIGGERS = ("S3 Upload", "API Gateway", "Scheduled Event", "SNS", "SQS")
+# Columnas del informe por lotes por las que se puede ordenar (todas menos el análisis)
+BATCH_SORT_FIELDS = ("path", "template", "lines", "findings", "status", "attempts", "seconds")
+BATCH_FORMATS = ("csv", "json", "markdown")
+
+
+def load_config(path):
+    """Lee la configuración del generador de un fichero YAML o JSON (o de la entrada estándar con "-")."""
+    import yaml
+
+    if path == "-":
+        data = yaml.safe_load(sys.stdin)
+    else:
+        with open(path, encoding="utf-8") as handle:
+            data = yaml.safe_load(handle)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: la configuración debe ser un diccionario")
+    return dict(CONFIG_DEFAULTS, **data)
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def write_output(text, path=None):
+    """Escribe en `path` o, si no se indica, en la salida estándar."""
+    if path:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def get_llm():
+    from dotenv import load_dotenv
+    from lambda_tools.llm import get_shared_llm
+
+    load_dotenv()
+    return get_shared_llm()
+
+############################
+# Subcomandos
+############################
+def command_generate(args):
+    from lambda_tools.sam import generate_sam_template, validate_config
+
+    config = load_config(args.config)
+    errors = validate_config(config)
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    if errors:
+        return 2
+    write_output(generate_sam_template(config), args.output)
+
+    if not args.describe:
+        return 0
+    from lambda_tools.cache import cached_invoke
+    from lambda_tools.prompts import build_generation_prompt, extract_python_code, split_generation
+    from lambda_tools.skeletons import fill_skeleton, skeleton_settings
+    from lambda_tools.validation import DEFAULT_MAX_REPAIRS, STATUS_ICONS, validate_and_repair
+
+    max_repairs = DEFAULT_MAX_REPAIRS if args.max_repairs is None else args.max_repairs
+    llm = get_llm()
+    code_part, _ = split_generation(cached_invoke(llm, build_generation_prompt(args.describe, config, explain=False)))
+    code = extract_python_code(code_part)
+    if skeleton_settings(config):
+        code = fill_skeleton(config, code)
+    code, report, repairs = validate_and_repair(llm, code, config["trigger_type"], config, max_repairs=max_repairs)
+    for stage in report["stages"]:
+        print(f"{STATUS_ICONS[stage['status']]} {stage['label']} {stage['detail']}".rstrip(), file=sys.stderr)
+    if repairs:
+        print(f"🔁 Correcciones del modelo: {repairs}", file=sys.stderr)
+    write_output(code, args.handler)
+    return 0 if report["passed"] else 1
+
+
+def command_analyze(args):
+    from lambda_tools.static_analysis import analyze_handler, format_findings
+
+    source = read_text(args.handler)
+    findings = analyze_handler(source)
+    production_stats = None
+    if args.logs:
+        from lambda_tools.logs import analyze_log_file, format_log_stats
+
+        production_stats = "\n\n".join(format_log_stats(analyze_log_file(path)) for path in args.logs)
+
+    if args.format == "json":
+        report = {"handler": args.handler, "findings": [vars(finding) for finding in findings]}
+        if production_stats:
+            report["production_stats"] = production_stats
+    else:
+        lines = [f"# Análisis de {args.handler}", "", "## Análisis estático", "",
+                 format_findings(findings) if findings else "Sin hallazgos."]
+        if production_stats:
+            lines += ["", "## Métricas de producción", "", production_stats]
+
+    if args.llm:
+        from lambda_tools.llm import run_plan
+        from lambda_tools.prompts import plan_analysis
+        from lambda_tools.tokens import DEFAULT_PROMPT_BUDGET
+
+        template = read_text(args.template) if args.template else None
+        prompts, merge = plan_analysis(source, template, findings, production_stats,
+                                       args.budget or DEFAULT_PROMPT_BUDGET)
+        analysis = run_plan(get_llm(), prompts, merge)
+        if args.format == "json":
+            report["analysis"] = analysis
+        else:
+            lines += ["", "## Análisis del modelo", "", analysis]
+
+    if args.format == "json":
+        write_output(json.dumps(report, indent=2, ensure_ascii=False) + "\n", args.output)
+    else:
+        write_output("\n".join(lines) + "\n", args.output)
+    return 1 if args.fail_on_findings and findings else 0
+
+
+def command_bench(args):
+    from lambda_tools.bench import run_benchmark
+
+    config = load_config(args.config) if args.config else dict(CONFIG_DEFAULTS, trigger_type=args.trigger)
+    trigger = args.trigger or config.get("trigger_type")
+    if trigger not in TRIGGERS:
+        print(f"error: indica el trigger con --trigger ({', '.join(TRIGGERS)})", file=sys.stderr)
+        return 2
+    report = run_benchmark(read_text(args.handler), trigger, config, iterations=args.iterations,
+                           cold_runs=args.cold_runs, records=args.records, aws=args.aws,
+                           handler_name=config["handler_name"])
+    if args.tune and report["warm"] and report["warm_cpu"]:
+        from lambda_tools.power_tuning import ARCHITECTURE_PRICES, recommend
+        from lambda_tools.sam import DEFAULT_ARCHITECTURE
+
+        architecture = config.get("architecture", DEFAULT_ARCHITECTURE)
+        report["tuning"] = recommend(report, args.strategy, price_per_gb_second=ARCHITECTURE_PRICES[architecture])
+
+    if args.format == "json":
+        write_output(json.dumps(report, indent=2) + "\n", args.output)
+    else:
+        lines = [f"Trigger: {trigger} · Registros por evento: {report['records']} · "
+                 f"Stubs de AWS: {report['aws_mode']}",
+                 "", f"{'Fase':<10} {'p50':>10} {'p95':>10} {'p99':>10} {'máx':>10} {'n':>6}"]
+        for label, key in (("Init", "init"), ("Cold", "cold"), ("Warm", "warm"), ("Warm CPU", "warm_cpu")):
+            if report[key]:
+                summary = report[key]
+                lines.append(f"{label:<10} {summary['p50']:>10} {summary['p95']:>10} {summary['p99']:>10} "
+                             f"{summary['max']:>10} {summary['count']:>6}")
+        if report["peak_rss_mb"]:
+            lines.append(f"\nPico de RSS: {report['peak_rss_mb']:.1f} MB")
+        if report["error"]:
+            lines.append(f"\n{report['errors']} invocaciones con error. Primer error: {report['error']}")
+        if report.get("tuning"):
+            recommended = report["tuning"]["recommended"]
+            lines.append(f"\nRecomendación ({args.strategy}): {recommended['memory']} MB, "
+                         f"timeout {recommended['timeout']} s")
+        write_output("\n".join(lines) + "\n", args.output)
+    return 0 if report["cold"] and not report["errors"] else 1
+
+def command_batch(args):
+    from lambda_tools.batch import REPORT_FORMATS, analyze_batch, discover_functions, sort_report
+
+    try:
+        functions = discover_functions(args.source)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if not functions:
+        print(f"No se encontraron handlers en {args.source}", file=sys.stderr)
+        return 1
+
+    def progress(row, done, total):
+        print(f"[{done}/{total}] {row['path']}: {row['status']} ({row['seconds']} s)", file=sys.stderr)
+
+    results = analyze_batch(get_llm(), functions, max_concurrency=args.concurrency,
+                            requests_per_minute=args.rpm, max_retries=args.retries, on_result=progress)
+    write_output(REPORT_FORMATS[args.format](sort_report(results, args.sort_by, args.desc)), args.output)
+    return 0 if all(row["status"] == "ok" for row in results) else 2
+
+############################
+# Argumentos
+############################
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="lambda-tools",
+        description="Genera templates SAM, analiza handlers y mide su rendimiento en local."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Genera el template SAM (y opcionalmente el handler)")
+    generate.add_argument("config", help="Configuración en YAML o JSON (\"-\" para la entrada estándar)")
+    generate.add_argument("-o", "--output", help="Fichero del template (por defecto, la salida estándar)")
+    generate.add_argument("--describe", help="Descripción de la lógica: genera el handler con el modelo")
+    generate.add_argument("--handler", default="handler.py", help="Fichero del handler generado (handler.py)")
+    generate.add_argument("--max-repairs", type=int,
+                          help="Correcciones del modelo si el handler no supera la validación "
+                               "(por defecto, LAMBDA_TOOLS_MAX_REPAIRS o 2)")
+    generate.set_defaults(run=command_generate)
+
+    analyze = subparsers.add_parser("analyze", help="Analiza un handler (estático, logs y, con --llm, el modelo)")
+    analyze.add_argument("handler", help="Fichero .py del handler")
+    analyze.add_argument("--template", help="Template SAM de la función (para el análisis del modelo)")
+    analyze.add_argument("--logs", nargs="+", help="Logs de CloudWatch o trazas de X-Ray (admite .gz)")
+    analyze.add_argument("--llm", action="store_true", help="Añade el análisis del modelo")
+    analyze.add_argument("--budget", type=int,
+                         help="Presupuesto de tokens del prompt (por defecto, LAMBDA_TOOLS_PROMPT_BUDGET u 8000)")
+    analyze.add_argument("--format", choices=("text", "json"), default="text", help="Formato de la salida")
+    analyze.add_argument("--fail-on-findings", action="store_true",
+                         help="Termina con código 1 si hay hallazgos (para CI)")
+    analyze.add_argument("-o", "--output", help="Fichero de salida (por defecto, la salida estándar)")
+    analyze.set_defaults(run=command_analyze)
+
+    bench = subparsers.add_parser("bench", help="Mide el handler en local con un evento sintético del trigger")
+    bench.add_argument("handler", help="Fichero .py del handler")
+    bench.add_argument("--trigger", choices=TRIGGERS, help="Trigger (por defecto, el de --config)")
+    bench.add_argument("--config", help="Configuración en YAML o JSON (memoria, timeout, trigger...)")
+    bench.add_argument("--iterations", type=int, default=50, help="Invocaciones en caliente (por defecto 50)")
+    bench.add_argument("--cold-runs", type=int, default=3, help="Arranques en frío (por defecto 3)")
+    bench.add_argument("--records", type=int, default=1, help="Registros por evento (por defecto 1)")
+    bench.add_argument("--aws", choices=("auto", "moto", "stub"), default="auto", help="Simulación de AWS")
+    bench.add_argument("--tune", action="store_true", help="Recomienda memoria y timeout (power tuning)")
+    bench.add_argument("--strategy", choices=("cost", "speed", "balanced"), default="balanced",
+                       help="Criterio de la recomendación")
+    bench.add_argument("--format", choices=("text", "json"), default="text", help="Formato de la salida")
+    bench.add_argument("-o", "--output", help="Fichero de salida (por defecto, la salida estándar)")
+    bench.set_defaults(run=command_bench)
+
+    batch = subparsers.add_parser("batch", help="Analiza con el modelo todos los handlers de un zip o un directorio")
+    batch.add_argument("source", help="Directorio o fichero .zip con los handlers y templates SAM")
+    batch.add_argument("--concurrency", type=int, default=4, help="Análisis simultáneos (por defecto 4)")
+    batch.add_argument("--rpm", type=float, default=60, help="Peticiones por minuto al LLM (por defecto 60)")
+    batch.add_argument("--retries", type=int, default=5, help="Reintentos ante errores 429 (por defecto 5)")
+    batch.add_argument("--sort-by", choices=BATCH_SORT_FIELDS, default="path", help="Columna de ordenación")
+    batch.add_argument("--desc", action="store_true", help="Orden descendente")
+    batch.add_argument("--format", choices=BATCH_FORMATS, default="markdown", help="Formato del informe")
+    batch.add_argument("-o", "--output", help="Fichero de salida (por defecto, la salida estándar)")
+    batch.set_defaults(run=command_batch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Modelo por defecto, compartido por el cliente LLM y el recuento de tokens.
+
+Vive aparte de `llm.py` para que las utilidades de tokens, los prompts y la
+línea de comandos no importen el cliente ni la caché de respuestas.
+"""
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.2
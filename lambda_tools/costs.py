@@ -0,0 +1,155 @@
+"""Estimación determinista de coste y throughput de la configuración elegida.
+
+El perfil de carga separa el tiempo de espera (E/S) del de CPU de cada registro,
+igual que el power tuning: la parte de CPU se escala con la fracción de vCPU
+que da cada nivel de memoria. A partir del perfil y del ritmo de peticiones se
+calculan, para toda una rejilla memoria × tamaño de lote × concurrencia a la vez
+(arrays de NumPy con broadcasting), el coste mensual, el throughput máximo que
+permite la concurrencia, la concurrencia necesaria (ley de Little) y, con SQS,
+el tiempo en vaciar la cola. El frente de Pareto son las combinaciones que no
+se pueden abaratar sin empeorar el tiempo.
+"""
+import numpy as np
+
+from lambda_tools.power_tuning import ARCHITECTURE_PRICES, FULL_VCPU_MEMORY_MB, PRICE_PER_REQUEST
+from lambda_tools.sam import ACCOUNT_CONCURRENCY_LIMIT, DEFAULT_ARCHITECTURE, sqs_settings
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+# Provisioned concurrency (us-east-1): precio por GB-segundo reservado y por GB-segundo ejecutado
+PROVISIONED_PRICES = {
+    "x86_64": {"reserved": 0.0000041667, "duration": 0.0000097222},
+    "arm64": {"reserved": 0.0000033334, "duration": 0.0000077778}
+}
+SWEEP_MEMORIES = [128, 256, 512, 1024, 1769, 2048, 3008, 4096]
+SWEEP_BATCH_SIZES = [1, 10, 50, 100, 500, 1000]
+SWEEP_CONCURRENCIES = [5, 10, 25, 50, 100, 250, 500]
+DEFAULT_FIXED_MS = 10.0
+
+############################
+# Perfil de carga
+############################
+def profile_from_benchmark(report):
+    """Perfil {io_ms, cpu_ms} por registro a partir de las invocaciones en caliente de un benchmark.
+
+    En local el handler tiene una vCPU completa, así que el tiempo de CPU medido
+    es el de 1769 MB o más.
+    """
+    if not report.get("warm") or not report.get("warm_cpu"):
+        raise ValueError("El benchmark no tiene invocaciones en caliente con las que estimar la duración.")
+    wall = report["warm"]["p50"]
+    cpu = min(wall, report["warm_cpu"]["p50"])
+    records = max(report.get("records") or 1, 1)
+    return {"io_ms": (wall - cpu) / records, "cpu_ms": cpu / records}
+
+
+def profile_from_duration(duration_ms, memory_mb, cpu_fraction, records=1):
+    """Perfil por registro a partir de una duración observada con `memory_mb` y `records` registros.
+
+    `cpu_fraction` es la parte de la duración que es CPU (el resto, espera).
+    """
+    records = max(records, 1)
+    cpu_ms = duration_ms * cpu_fraction * min(1.0, memory_mb / FULL_VCPU_MEMORY_MB)
+    return {"io_ms": duration_ms * (1 - cpu_fraction) / records, "cpu_ms": cpu_ms / records}
+
+############################
+# Rejilla
+############################
+def pareto_front(cost, time, mask=None):
+    """Máscara de los puntos no dominados al minimizar a la vez `cost` y `time`."""
+    cost = np.asarray(cost, dtype=float)
+    time = np.asarray(time, dtype=float)
+    mask = np.ones(cost.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    candidates = np.flatnonzero(mask)
+    front = np.zeros(cost.shape, dtype=bool)
+    if not len(candidates):
+        return front
+    # Ordenados por coste (y por tiempo en empate), un punto es del frente si mejora
+    # el mejor tiempo de todos los más baratos
+    order = candidates[np.lexsort((time[candidates], cost[candidates]))]
+    best_before = np.concatenate([[np.inf], np.minimum.accumulate(time[order])[:-1]])
+    front[order[time[order] < best_before]] = True
+    return front
+
+
+def sweep(profile, rate, memories, batch_sizes=(1,), concurrencies=(ACCOUNT_CONCURRENCY_LIMIT,), timeout_s=30,
+          architecture=DEFAULT_ARCHITECTURE, provisioned=0, fixed_ms=DEFAULT_FIXED_MS, backlog=0):
+    """Evalúa todas las combinaciones memoria × tamaño de lote × concurrencia.
+
+    `rate` son registros por segundo (peticiones, o mensajes con SQS) y
+    `backlog` los mensajes acumulados en la cola. Devuelve un diccionario de
+    arrays planos, uno por combinación: memory, batch_size, concurrency,
+    duration_ms, monthly_cost, max_throughput (registros/s), needed_concurrency,
+    drain_s (inf si la cola no se vacía), feasible (cabe en el timeout y en la
+    concurrencia) y pareto (frente coste/tiempo de las factibles; el tiempo es
+    el de vaciado con `backlog` y la duración si no).
+    """
+    memory, batch, concurrency = np.meshgrid(
+        np.asarray(memories, dtype=float), np.asarray(batch_sizes, dtype=float),
+        np.asarray(concurrencies, dtype=float), indexing="ij"
+    )
+    share = np.minimum(1.0, memory / FULL_VCPU_MEMORY_MB)
+    duration_ms = fixed_ms + batch * (profile["io_ms"] + profile["cpu_ms"] / share)
+    duration_s = duration_ms / 1000
+
+    invocations_per_s = rate / batch
+    gb_seconds_per_month = invocations_per_s * SECONDS_PER_MONTH * memory / 1024 * np.ceil(duration_ms) / 1000
+    monthly_cost = invocations_per_s * SECONDS_PER_MONTH * PRICE_PER_REQUEST \
+        + gb_seconds_per_month * ARCHITECTURE_PRICES[architecture]
+    if provisioned:
+        # Las instancias pre-calentadas se pagan todo el mes y abaratan la duración que absorben
+        prices = PROVISIONED_PRICES[architecture]
+        covered = np.minimum(1.0, provisioned / np.maximum(invocations_per_s * duration_s, 1e-9))
+        monthly_cost = monthly_cost + provisioned * memory / 1024 * SECONDS_PER_MONTH * prices["reserved"] \
+            + covered * gb_seconds_per_month * (prices["duration"] - ARCHITECTURE_PRICES[architecture])
+
+    max_throughput = concurrency * batch / duration_s
+    needed_concurrency = invocations_per_s * duration_s
+    spare = max_throughput - rate
+    with np.errstate(divide="ignore"):
+        drain_s = np.where(spare > 0, backlog / np.where(spare > 0, spare, 1), np.inf)
+    feasible = (duration_ms <= timeout_s * 1000) & (needed_concurrency <= concurrency)
+    objective = drain_s if backlog else duration_ms
+
+    return {
+        "memory": memory.ravel().astype(int),
+        "batch_size": batch.ravel().astype(int),
+        "concurrency": concurrency.ravel().astype(int),
+        "duration_ms": duration_ms.ravel(),
+        "monthly_cost": monthly_cost.ravel(),
+        "max_throughput": max_throughput.ravel(),
+        "needed_concurrency": needed_concurrency.ravel(),
+        "drain_s": drain_s.ravel(),
+        "feasible": feasible.ravel(),
+        "pareto": pareto_front(monthly_cost.ravel(), objective.ravel(), feasible.ravel())
+    }
+
+
+def config_concurrency(config):
+    """Concurrencia máxima de la configuración: la reservada, la de SQS o el límite de la cuenta."""
+    limits = [(config.get("concurrency") or {}).get("reserved", 0)]
+    if config.get("trigger_type") == "SQS":
+        limits.append(sqs_settings(config)["max_concurrency"])
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else ACCOUNT_CONCURRENCY_LIMIT
+
+
+def config_batch_size(config):
+    """Registros por invocación: el tamaño de lote con SQS y 1 con el resto de triggers."""
+    return sqs_settings(config)["batch_size"] if config.get("trigger_type") == "SQS" else 1
+
+
+def estimate(config, profile, rate, fixed_ms=DEFAULT_FIXED_MS, backlog=0):
+    """Coste y throughput de la configuración actual (una sola celda de `sweep`)."""
+    result = sweep(
+        profile, rate, [config["memory"]], [config_batch_size(config)], [config_concurrency(config)],
+        timeout_s=config["timeout"], architecture=config.get("architecture", DEFAULT_ARCHITECTURE),
+        provisioned=(config.get("concurrency") or {}).get("provisioned", 0), fixed_ms=fixed_ms, backlog=backlog
+    )
+    return {key: values[0].item() for key, values in result.items() if key != "pareto"}
+
+
+def sweep_rows(result, only_pareto=False):
+    """Filas de la rejilla (para tablas), ordenadas por coste."""
+    indices = np.flatnonzero(result["pareto"] if only_pareto else np.ones(len(result["memory"]), dtype=bool))
+    indices = indices[np.argsort(result["monthly_cost"][indices], kind="stable")]
+    return [{key: values[index].item() for key, values in result.items()} for index in indices]
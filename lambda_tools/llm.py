@@ -0,0 +1,230 @@
+"""Cliente LLM compartido por el proceso y utilidades para invocarlo de forma concurrente.
+
+El `ChatOpenAI` se construye una única vez por proceso (y por API key) sobre
+clientes HTTP con keep-alive, de modo que las reejecuciones de Streamlit y las
+distintas sesiones reutilizan las mismas conexiones TLS. Las llamadas asíncronas
+se ejecutan en un bucle de eventos persistente en segundo plano, ya que las
+conexiones del pool asíncrono quedan ligadas al bucle en el que se abrieron.
+"""
+import os
+import threading
+import time
+
+from lambda_tools.cache import acached_invoke
+from lambda_tools.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+
+MAX_CONNECTIONS = int(os.getenv("LAMBDA_TOOLS_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LAMBDA_TOOLS_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("LAMBDA_TOOLS_KEEPALIVE_EXPIRY", "90"))
+CONNECT_TIMEOUT = float(os.getenv("LAMBDA_TOOLS_CONNECT_TIMEOUT", "10"))
+REQUEST_TIMEOUT = float(os.getenv("LAMBDA_TOOLS_REQUEST_TIMEOUT", "120"))
+
+############################
+# Métricas del pool
+############################
+class PoolMetrics:
+    """Contadores de uso del pool HTTP compartido."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clients_created = 0
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_latency = 0.0
+        self._transports = []
+
+    def track(self, transport):
+        self._transports.append(transport)
+
+    def client_created(self):
+        with self._lock:
+            self.clients_created += 1
+
+    def started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+        return time.monotonic()
+
+    def finished(self, started, error=False):
+        with self._lock:
+            self.in_flight -= 1
+            self.total_latency += time.monotonic() - started
+            if error:
+                self.errors += 1
+
+    def open_connections(self):
+        total = 0
+        for transport in self._transports:
+            pool = getattr(transport, "_pool", None)
+            total += len(getattr(pool, "connections", ()))
+        return total
+
+    def snapshot(self):
+        with self._lock:
+            completed = self.requests - self.in_flight
+            return {
+                "clients_created": self.clients_created,
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "errors": self.errors,
+                "avg_latency_ms": round(1000 * self.total_latency / completed, 1) if completed else 0.0,
+                "open_connections": self.open_connections(),
+                "max_connections": MAX_CONNECTIONS
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _build_http_clients():
+    """Crea los clientes httpx (síncrono y asíncrono) con keep-alive y métricas."""
+    import httpx
+
+    class MeteredTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            started = pool_metrics.started()
+            try:
+                response = super().handle_request(request)
+            except Exception:
+                pool_metrics.finished(started, error=True)
+                raise
+            pool_metrics.finished(started, error=response.status_code >= 500)
+            return response
+
+    class MeteredAsyncTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            started = pool_metrics.started()
+            try:
+                response = await super().handle_async_request(request)
+            except Exception:
+                pool_metrics.finished(started, error=True)
+                raise
+            pool_metrics.finished(started, error=response.status_code >= 500)
+            return response
+
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+    transport = MeteredTransport(limits=limits)
+    async_transport = MeteredAsyncTransport(limits=limits)
+    pool_metrics.track(transport)
+    pool_metrics.track(async_transport)
+
+    return (
+        httpx.Client(transport=transport, timeout=timeout),
+        httpx.AsyncClient(transport=async_transport, timeout=timeout)
+    )
+
+############################
+# Cliente compartido
+############################
+def create_llm(api_key=None):
+    """Crea una instancia de LangChain sobre su propio pool de conexiones HTTP."""
+    # Importación diferida: el modo por lotes y la CLI no deben pagar el coste
+    # de importar LangChain hasta que realmente se necesita el modelo
+    import openai
+    from langchain_openai import ChatOpenAI
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("No se ha configurado la API key de OpenAI (OPENAI_API_KEY).")
+
+    http_client, http_async_client = _build_http_clients()
+    pool_metrics.client_created()
+
+    return ChatOpenAI(
+        model=DEFAULT_MODEL,
+        temperature=DEFAULT_TEMPERATURE,
+        api_key=api_key,
+        client=openai.OpenAI(api_key=api_key, http_client=http_client).chat.completions,
+        async_client=openai.AsyncOpenAI(api_key=api_key, http_client=http_async_client).chat.completions
+    )
+
+
+_shared_llms = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_llm(api_key=None):
+    """Devuelve el cliente LLM del proceso, creándolo la primera vez."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _shared_lock:
+        if api_key not in _shared_llms:
+            _shared_llms[api_key] = create_llm(api_key)
+        return _shared_llms[api_key]
+
+
+def pool_stats():
+    """Métricas del pool de conexiones compartido."""
+    return pool_metrics.snapshot()
+
+############################
+# Ejecución asíncrona
+############################
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    # asyncio se importa al usarlo, para que importar el cliente no lo cargue hasta la primera llamada
+    import asyncio
+
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="lambda-tools-llm", daemon=True).start()
+        return _loop
+
+
+def submit(coro):
+    """Programa una corrutina en el bucle compartido y devuelve un concurrent.futures.Future."""
+    import asyncio
+
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
+
+
+def invoke_concurrently(llm, prompts, on_result=None):
+    """Lanza varios prompts a la vez sobre el mismo cliente.
+
+    `prompts` es un diccionario nombre -> prompt. `on_result(nombre, texto)` se
+    llama desde el hilo que invoca en cuanto termina cada respuesta, de modo que
+    el tiempo total es el de la llamada más lenta y no la suma de todas.
+    Devuelve nombre -> texto.
+    """
+    import concurrent.futures
+
+    futures = {submit(acached_invoke(llm, prompt)): name for name, prompt in prompts.items()}
+    results = {}
+    for future in concurrent.futures.as_completed(futures):
+        name = futures[future]
+        results[name] = future.result()
+        if on_result is not None:
+            on_result(name, results[name])
+    return results
+
+
+async def arun_plan(llm, prompts, merge=None):
+    """Ejecuta un plan de `plan_analysis`: los prompts en paralelo y, si hay `merge`, el prompt final."""
+    import asyncio
+
+    names = list(prompts)
+    texts = await asyncio.gather(*(acached_invoke(llm, prompts[name]) for name in names))
+    results = dict(zip(names, texts))
+    if merge is None:
+        return "\n\n".join(results.values())
+    return await acached_invoke(llm, merge(results))
+
+
+def run_plan(llm, prompts, merge=None, on_result=None):
+    """Versión síncrona de arun_plan; `on_result` se llama al terminar cada prompt parcial."""
+    results = invoke_concurrently(llm, prompts, on_result)
+    if merge is None:
+        return "\n\n".join(results[name] for name in prompts)
+    return submit(acached_invoke(llm, merge(results))).result()
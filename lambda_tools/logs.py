@@ -0,0 +1,329 @@
+"""Análisis offline de logs de CloudWatch y trazas de X-Ray exportados.
+
+Los ficheros se recorren en streaming (línea a línea o elemento a elemento) y
+las distribuciones se acumulan en histogramas de buckets logarítmicos, así que
+la memoria usada no depende del tamaño del fichero: sirven exportaciones de
+varios GB. Las estadísticas resultantes (duración, duración facturada, memoria
+máxima usada, init y frecuencia de cold starts) alimentan el prompt de análisis.
+"""
+import gzip
+import io
+import json
+import math
+import re
+from collections import Counter
+
+# Cada bucket cubre un 2 % más que el anterior: los percentiles tienen un error relativo < 1 %
+HISTOGRAM_GROWTH = 1.02
+READ_CHUNK_SIZE = 1024 * 1024
+# Memoria recomendada: máximo usado + margen, redondeado al múltiplo de 64 MB
+MEMORY_HEADROOM = 1.3
+MEMORY_STEP_MB = 64
+MIN_MEMORY_MB = 128
+OVERPROVISIONED_RATIO = 0.5
+TOP_SUBSEGMENTS = 10
+
+REPORT_FIELDS = {
+    "duration": re.compile(r"(?<!Billed )(?<!Init )Duration: ([\d.]+) ms"),
+    "billed_duration": re.compile(r"Billed Duration: ([\d.]+) ms"),
+    "memory_size": re.compile(r"Memory Size: (\d+) MB"),
+    "max_memory_used": re.compile(r"Max Memory Used: (\d+) MB"),
+    "init_duration": re.compile(r"Init Duration: ([\d.]+) ms")
+}
+# Métricas del evento platform.report cuando la función usa el formato de logs JSON
+PLATFORM_REPORT_FIELDS = {
+    "duration": "durationMs",
+    "billed_duration": "billedDurationMs",
+    "memory_size": "memorySizeMB",
+    "max_memory_used": "maxMemoryUsedMB",
+    "init_duration": "initDurationMs"
+}
+TIMEOUT_PATTERN = re.compile(r"Task timed out after ([\d.]+) seconds")
+ERROR_PATTERN = re.compile(r"\[ERROR\]|Traceback \(most recent call last\)|\"level\":\s*\"ERROR\"")
+
+
+class LogHistogram:
+    """Histograma con buckets de crecimiento geométrico para percentiles en memoria constante."""
+
+    def __init__(self, growth=HISTOGRAM_GROWTH):
+        self.log_growth = math.log(growth)
+        self.growth = growth
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        # Los valores <= 0 comparten el bucket None
+        self.buckets[math.floor(math.log(value) / self.log_growth) if value > 0 else None] += 1
+
+    def percentile(self, q):
+        """Percentil aproximado (punto medio geométrico del bucket), acotado por min y max."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return 0.0
+        for index in sorted(key for key in self.buckets if key is not None):
+            seen += self.buckets[index]
+            if seen >= rank:
+                value = self.growth ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Resumen con el mismo formato que los benchmarks (p50/p95/p99, media y máximo)."""
+        if not self.count:
+            return None
+        return {
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "p99": round(self.percentile(99), 2),
+            "mean": round(self.total / self.count, 2),
+            "max": round(self.max, 2),
+            "count": self.count
+        }
+
+############################
+# Lectura
+############################
+def open_text(source):
+    """Abre una ruta o un fichero binario como texto, descomprimiendo gzip si hace falta."""
+    handle = open(source, "rb") if isinstance(source, str) else source
+    magic = handle.read(2)
+    handle.seek(0)
+    if magic == b"\x1f\x8b":
+        handle = gzip.GzipFile(fileobj=handle)
+    return io.TextIOWrapper(handle, encoding="utf-8", errors="replace")
+
+
+def _iter_array_items(text, key):
+    """Recorre los elementos del array `"key": [...]` de un JSON sin cargarlo entero."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = -1
+    while position < 0:
+        chunk = text.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+        match = re.search(rf'"{key}"\s*:\s*\[', buffer)
+        if match:
+            position = match.end()
+        else:
+            # Se conserva el final por si la clave queda partida entre dos bloques
+            buffer = buffer[-len(key) - 16:]
+
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                return
+            chunk = text.read(READ_CHUNK_SIZE)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        # El buffer solo se recorta al leer el siguiente bloque: recortarlo aquí copiaría
+        # el resto del bloque por cada elemento
+        position = end
+
+############################
+# CloudWatch Logs
+############################
+def _parse_report(line):
+    """Extrae las métricas de una línea REPORT (texto o JSON) o None si no lo es."""
+    if "platform.report" in line:
+        try:
+            record = json.loads(line).get("record", {})
+        except (ValueError, AttributeError):
+            record = None
+        if isinstance(record, dict):
+            metrics = record.get("metrics", {})
+            return {field: float(metrics[key]) for field, key in PLATFORM_REPORT_FIELDS.items() if key in metrics}
+    if "REPORT RequestId" not in line:
+        return None
+    report = {}
+    for field, pattern in REPORT_FIELDS.items():
+        match = pattern.search(line)
+        if match:
+            report[field] = float(match.group(1))
+    return report if "duration" in report else None
+
+
+def analyze_cloudwatch_logs(text):
+    """Calcula las distribuciones de las líneas REPORT de un log exportado de CloudWatch."""
+    histograms = {field: LogHistogram() for field in ("duration", "billed_duration", "max_memory_used", "init_duration")}
+    memory_sizes = Counter()
+    timeouts = errors = lines = 0
+
+    for line in text:
+        lines += 1
+        report = _parse_report(line)
+        if report is None:
+            # Comprobación barata antes de las expresiones regulares (la mayoría de líneas no son de error)
+            if "Task timed out" in line and TIMEOUT_PATTERN.search(line):
+                timeouts += 1
+            elif ("ERROR" in line or "Traceback" in line) and ERROR_PATTERN.search(line):
+                errors += 1
+            continue
+        for field, histogram in histograms.items():
+            if field in report:
+                histogram.add(report[field])
+        if "memory_size" in report:
+            memory_sizes[int(report["memory_size"])] += 1
+
+    invocations = histograms["duration"].count
+    cold_starts = histograms["init_duration"].count
+    stats = {
+        "kind": "cloudwatch",
+        "lines": lines,
+        "invocations": invocations,
+        "cold_starts": cold_starts,
+        "cold_start_rate": round(cold_starts / invocations, 4) if invocations else None,
+        "timeouts": timeouts,
+        "errors": errors,
+        "memory_size_mb": memory_sizes.most_common(1)[0][0] if memory_sizes else None,
+        **{field: histogram.summary() for field, histogram in histograms.items()}
+    }
+    stats["memory"] = memory_recommendation(stats)
+    return stats
+
+
+def memory_recommendation(stats):
+    """Detecta memoria sobredimensionada comparando el máximo usado con la configurada."""
+    configured = stats.get("memory_size_mb")
+    used = stats.get("max_memory_used")
+    if not configured or not used:
+        return None
+    suggested = max(MIN_MEMORY_MB, math.ceil(used["max"] * MEMORY_HEADROOM / MEMORY_STEP_MB) * MEMORY_STEP_MB)
+    return {
+        "configured_mb": configured,
+        "max_used_mb": used["max"],
+        "usage_ratio": round(used["max"] / configured, 2),
+        "overprovisioned": used["max"] < configured * OVERPROVISIONED_RATIO and suggested < configured,
+        "suggested_mb": min(suggested, configured)
+    }
+
+############################
+# X-Ray
+############################
+def _segment_documents(trace):
+    """Documentos de segmento de una traza de `batch-get-traces` (o el propio segmento)."""
+    if "Segments" in trace:
+        for segment in trace["Segments"]:
+            document = segment.get("Document")
+            yield json.loads(document) if isinstance(document, str) else document
+    elif "start_time" in trace:
+        yield trace
+
+
+def _walk_subsegments(segment, histograms):
+    for subsegment in segment.get("subsegments", []):
+        if "end_time" in subsegment and "start_time" in subsegment:
+            histograms.setdefault(subsegment.get("name", "?"), LogHistogram()).add(
+                (subsegment["end_time"] - subsegment["start_time"]) * 1000
+            )
+        _walk_subsegments(subsegment, histograms)
+
+
+def analyze_xray_traces(items):
+    """Calcula la duración de las trazas y el tiempo por subsegmento (init, invocación, llamadas a AWS)."""
+    traces = LogHistogram()
+    subsegments = {}
+    faults = 0
+    for item in items:
+        if "Duration" in item:
+            traces.add(item["Duration"] * 1000)
+        for document in _segment_documents(item):
+            if document.get("fault") or document.get("error"):
+                faults += 1
+            if "Duration" not in item and "end_time" in document and not document.get("parent_id"):
+                traces.add((document["end_time"] - document["start_time"]) * 1000)
+            _walk_subsegments(document, subsegments)
+
+    ranked = sorted(subsegments.items(), key=lambda entry: -entry[1].total)[:TOP_SUBSEGMENTS]
+    init = subsegments.get("Initialization")
+    invocations = subsegments.get("Invocation")
+    return {
+        "kind": "xray",
+        "traces": traces.count,
+        "faults": faults,
+        "duration": traces.summary(),
+        "init_duration": init.summary() if init else None,
+        "cold_start_rate": round(init.count / invocations.count, 4) if init and invocations else None,
+        "subsegments": [{"name": name, **histogram.summary()} for name, histogram in ranked]
+    }
+
+############################
+# Entrada
+############################
+def analyze_log_file(source):
+    """Detecta si el fichero es un log de CloudWatch o trazas de X-Ray y lo analiza.
+
+    `source` es una ruta o un fichero binario abierto (por ejemplo, uno subido
+    desde la interfaz); en ese caso no se cierra al terminar.
+    """
+    text = open_text(source)
+    try:
+        head = text.read(READ_CHUNK_SIZE)
+        text.seek(0)
+        stripped = head.lstrip()
+        if stripped.startswith("{") and '"Traces"' in head:
+            return analyze_xray_traces(_iter_array_items(text, "Traces"))
+        if stripped.startswith("{") and '"trace_id"' in head and "REPORT RequestId" not in head:
+            # Un documento de segmento por línea
+            return analyze_xray_traces(json.loads(line) for line in text if line.strip())
+        return analyze_cloudwatch_logs(text)
+    finally:
+        if isinstance(source, str):
+            text.close()
+        else:
+            source.seek(0)
+            text.detach()
+
+
+def format_log_stats(stats):
+    """Resume las estadísticas de producción en texto (para la interfaz y los prompts)."""
+    def distribution(label, summary, unit="ms"):
+        if not summary:
+            return None
+        return (f"- {label}: p50 {summary['p50']} {unit}, p95 {summary['p95']} {unit}, "
+                f"p99 {summary['p99']} {unit}, máx {summary['max']} {unit} ({summary['count']} muestras)")
+
+    if stats["kind"] == "xray":
+        lines = [f"- Trazas analizadas: {stats['traces']} (con fallos: {stats['faults']})"]
+        lines.append(distribution("Duración de la traza", stats["duration"]))
+        lines.append(distribution("Initialization (cold start)", stats["init_duration"]))
+        if stats["cold_start_rate"] is not None:
+            lines.append(f"- Frecuencia de cold starts: {stats['cold_start_rate']:.1%}")
+        lines.extend(distribution(f"Subsegmento `{entry['name']}`", entry) for entry in stats["subsegments"])
+        return "\n".join(line for line in lines if line)
+
+    lines = [f"- Invocaciones analizadas: {stats['invocations']} (timeouts: {stats['timeouts']}, errores: {stats['errors']})"]
+    lines.append(distribution("Duración", stats["duration"]))
+    lines.append(distribution("Duración facturada", stats["billed_duration"]))
+    lines.append(distribution("Init (cold start)", stats["init_duration"]))
+    lines.append(distribution("Memoria máxima usada", stats["max_memory_used"], "MB"))
+    if stats["cold_start_rate"] is not None:
+        lines.append(f"- Frecuencia de cold starts: {stats['cold_start_rate']:.1%}")
+    memory = stats["memory"]
+    if memory:
+        lines.append(f"- Memoria configurada: {memory['configured_mb']} MB, uso máximo {memory['usage_ratio']:.0%}")
+        if memory["overprovisioned"]:
+            lines.append(f"- Memoria sobredimensionada: bastaría con {memory['suggested_mb']} MB "
+                         "(comprueba que la duración no empeora, ya que la CPU escala con la memoria)")
+    return "\n".join(line for line in lines if line)
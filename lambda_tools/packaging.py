@@ -0,0 +1,295 @@
+"""Dependencias y tamaño del paquete de despliegue de los handlers.
+
+Recorre los imports de cada handler, los traduce a distribuciones de PyPI,
+descarta las que ya incluye el runtime de Lambda (boto3 y sus dependencias),
+genera un requirements.txt fijado a las versiones instaladas en local y estima
+con ellas el tamaño descomprimido (incluidas las dependencias transitivas) y el
+tiempo de import. El tamaño del paquete influye directamente en el cold start.
+"""
+import ast
+import io
+import re
+import subprocess
+import sys
+import zipfile
+from functools import lru_cache
+from importlib import metadata
+
+from lambda_tools.profiling import INIT_MARKER, parse_importtime, sandbox_env
+
+# Distribuciones que el runtime de Python de Lambda ya incluye
+RUNTIME_PROVIDED = {"boto3", "botocore", "s3transfer", "jmespath", "python-dateutil", "urllib3", "six"}
+# Módulos cuyo nombre no coincide con el de su distribución (si no están instalados en local)
+MODULE_ALIASES = {
+    "PIL": "Pillow",
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python-headless",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "jwt": "PyJWT",
+    "psycopg2": "psycopg2-binary",
+    "sklearn": "scikit-learn",
+    "yaml": "PyYAML",
+    "attr": "attrs",
+    "snapshot_restore_py": "snapshot-restore-py",
+    "aws_lambda_powertools": "aws-lambda-powertools",
+    "aws_xray_sdk": "aws-xray-sdk"
+}
+# Extras que hay que instalar siempre: el Tracer de Powertools (el de las plantillas del
+# generador) importa aws_xray_sdk, que ni el paquete base ni el runtime de Lambda incluyen
+REQUIRED_EXTRAS = {"aws-lambda-powertools": ("tracer",)}
+# Límite de AWS para el paquete descomprimido (función + capas)
+LAMBDA_UNZIPPED_LIMIT_MB = 250
+DEFAULT_BUDGET_MB = 50
+IMPORT_FAILED_MARKER = "__LAMBDA_TOOLS_IMPORT_FAILED__ "
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+REQUIREMENT_EXTRA = re.compile(r"extra\s*==\s*[\"']([^\"']+)[\"']")
+
+
+def normalize_name(name):
+    """Normaliza el nombre de una distribución (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def third_party_modules(source):
+    """Módulos de nivel superior importados por el handler que no son de la librería estándar."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split(".")[0])
+    return {module for module in modules if module not in sys.stdlib_module_names and module != "__future__"}
+
+
+@lru_cache(maxsize=1)
+def _packages_distributions():
+    return metadata.packages_distributions()
+
+
+def module_distribution(module):
+    """Distribución que proporciona un módulo: la instalada en local o, si no, la conocida."""
+    installed = _packages_distributions().get(module)
+    if installed:
+        return installed[0]
+    return MODULE_ALIASES.get(module, module)
+
+
+def resolve_distributions(source):
+    """Devuelve {módulo: distribución} de los imports del handler que hay que empaquetar."""
+    resolved = {}
+    for module in sorted(third_party_modules(source)):
+        distribution = module_distribution(module)
+        if normalize_name(distribution) not in RUNTIME_PROVIDED:
+            resolved[module] = distribution
+    return resolved
+
+
+@lru_cache(maxsize=None)
+def _installed(name):
+    try:
+        return metadata.distribution(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _requirements(distribution, extras=()):
+    """Dependencias obligatorias de una distribución instalada, más las de los `extras` indicados."""
+    names = []
+    for requirement in distribution.requires or []:
+        marker = requirement.partition(";")[2]
+        if "extra" in marker and not set(REQUIREMENT_EXTRA.findall(marker)) & set(extras):
+            continue
+        match = REQUIREMENT_NAME.match(requirement)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def dependency_closure(distributions):
+    """Distribuciones a empaquetar, con sus dependencias transitivas instaladas en local.
+
+    Devuelve (instaladas, no_instaladas) con los nombres normalizados. Las
+    dependencias transitivas se incluyen aunque el runtime ya las tenga (urllib3
+    de requests, por ejemplo), porque pip las instala igualmente en el paquete.
+    """
+    installed, missing = set(), set()
+    pending = list(distributions)
+    while pending:
+        name = normalize_name(pending.pop())
+        if name in installed or name in missing:
+            continue
+        distribution = _installed(name)
+        if distribution is None:
+            missing.add(name)
+            continue
+        installed.add(name)
+        pending.extend(_requirements(distribution, REQUIRED_EXTRAS.get(name, ())))
+    return installed, missing
+
+
+@lru_cache(maxsize=None)
+def installed_size(name):
+    """Tamaño en bytes de los ficheros instalados de una distribución (sin bytecode)."""
+    distribution = _installed(name)
+    if distribution is None:
+        return 0
+    total = 0
+    for file in distribution.files or []:
+        if file.suffix == ".pyc":
+            continue
+        try:
+            total += file.locate().stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def pin_requirements(distributions):
+    """Fija cada distribución a la versión instalada en local (las no instaladas quedan sin fijar)."""
+    pinned = []
+    for name in distributions:
+        distribution = _installed(name)
+        extras = REQUIRED_EXTRAS.get(normalize_name(name))
+        suffix = f"[{','.join(extras)}]" if extras else ""
+        pinned.append(f"{distribution.metadata['Name']}{suffix}=={distribution.version}" if distribution
+                      else name + suffix)
+    return pinned
+
+
+def requirements_txt(distributions):
+    """Contenido del requirements.txt con las dependencias fijadas."""
+    lines = ["# Generado por AWS Lambda Tools. boto3 y botocore ya los incluye el runtime de Lambda."]
+    for requirement in pin_requirements(distributions):
+        suffix = "" if "==" in requirement else "  # no instalada en local: fija la versión antes de desplegar"
+        lines.append(requirement + suffix)
+    return "\n".join(lines) + "\n"
+
+
+def estimate_import_times(modules, python=sys.executable, timeout=60):
+    """Mide con `-X importtime` el tiempo de import (ms) de cada módulo con las versiones locales.
+
+    Los módulos se importan en un único proceso, así que las dependencias
+    comunes se cuentan solo en el primero que las importa. Los que no se pueden
+    importar devuelven None.
+    """
+    times = {module: None for module in modules}
+    if not modules:
+        return times
+    script = "\n".join(
+        f"try:\n    import {module}\nexcept Exception:\n    sys.stderr.write({IMPORT_FAILED_MARKER + module!r} + '\\n')"
+        for module in modules
+    )
+    env = sandbox_env()
+    try:
+        process = subprocess.run(
+            [python, "-X", "importtime", "-c", f"import sys\nsys.stderr.write({INIT_MARKER!r} + '\\n')\n{script}"],
+            capture_output=True, text=True, timeout=timeout, env=env
+        )
+    except subprocess.TimeoutExpired:
+        return times
+    failed = {line[len(IMPORT_FAILED_MARKER):] for line in process.stderr.splitlines()
+              if line.startswith(IMPORT_FAILED_MARKER)}
+    for entry in parse_importtime(process.stderr):
+        if entry["depth"] == 0 and entry["module"] in times and entry["module"] not in failed:
+            times[entry["module"]] = round(entry["cumulative_ms"], 1)
+    return times
+
+
+def dependency_report(source, python=sys.executable):
+    """Resuelve las dependencias del handler y estima su tamaño y su coste de import.
+
+    Devuelve las distribuciones directas con su versión, tamaño propio y tiempo
+    de import, el tamaño total descomprimido (con dependencias transitivas), los
+    módulos que se excluyen por venir en el runtime y el requirements.txt fijado.
+    """
+    modules = third_party_modules(source)
+    resolved = resolve_distributions(source)
+    excluded = sorted(module for module in modules if module not in resolved)
+    installed, missing = dependency_closure(resolved.values())
+    import_times = estimate_import_times(sorted(resolved), python)
+
+    packages = []
+    for module, distribution in sorted(resolved.items()):
+        local = _installed(distribution)
+        packages.append({
+            "module": module,
+            "distribution": local.metadata["Name"] if local else distribution,
+            "version": local.version if local else None,
+            "size_mb": _mb(installed_size(distribution)),
+            "import_ms": import_times.get(module)
+        })
+
+    distributions = sorted({package["distribution"] for package in packages}, key=str.lower)
+    return {
+        "packages": packages,
+        "excluded": excluded,
+        "transitive": sorted(installed - {normalize_name(name) for name in distributions}),
+        "not_installed": sorted(missing),
+        "total_size_mb": _mb(sum(installed_size(name) for name in installed)),
+        "total_import_ms": round(sum(ms for ms in import_times.values() if ms), 1),
+        "requirements": pin_requirements(distributions),
+        "requirements_txt": requirements_txt(distributions)
+    }
+
+
+def _mb(size):
+    return round(size / (1024 * 1024), 2)
+
+
+def package_report(sources, budget_mb=DEFAULT_BUDGET_MB):
+    """Calcula la capa compartida y el tamaño del paquete de cada función.
+
+    `sources` es {nombre: código del handler}. La capa compartida contiene la
+    unión de las dependencias de todas las funciones y se adjunta a todas, así
+    que el tamaño efectivo de cada función es su código más la capa completa;
+    también se informa de lo que ocuparían solo sus propias dependencias.
+    """
+    functions = {name: resolve_distributions(source) for name, source in sources.items()}
+    layer_distributions = sorted({dist for resolved in functions.values() for dist in resolved.values()},
+                                 key=str.lower)
+    layer_installed, layer_missing = dependency_closure(layer_distributions)
+    layer_size = sum(installed_size(name) for name in layer_installed)
+
+    rows = []
+    for name, resolved in functions.items():
+        own_installed, own_missing = dependency_closure(resolved.values())
+        code_size = len(sources[name].encode("utf-8"))
+        total = code_size + layer_size
+        rows.append({
+            "function": name,
+            "dependencies": sorted(set(resolved.values()), key=str.lower),
+            "code_kb": round(code_size / 1024, 1),
+            "own_dependencies_mb": _mb(sum(installed_size(dist) for dist in own_installed)),
+            "total_mb": _mb(total),
+            "over_budget": total > budget_mb * 1024 * 1024,
+            "not_installed": sorted(own_missing)
+        })
+
+    return {
+        "budget_mb": budget_mb,
+        "layer": {
+            "requirements": layer_distributions,
+            "size_mb": _mb(layer_size),
+            "not_installed": sorted(layer_missing),
+            "over_limit": layer_size > LAMBDA_UNZIPPED_LIMIT_MB * 1024 * 1024
+        },
+        "functions": rows
+    }
+
+
+def build_project_archive(template, handlers, layer_requirements):
+    """Empaqueta el proyecto en un zip con la estructura que espera `sam build`."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("template.yaml", template)
+        for name, code in handlers.items():
+            archive.writestr(f"functions/{name}/handler.py", code)
+        if layer_requirements:
+            archive.writestr("layers/shared/requirements.txt", requirements_txt(layer_requirements))
+    return buffer.getvalue()
@@ -0,0 +1,103 @@
+"""Recomendación de memoria y timeout a partir de un benchmark local.
+
+Lambda asigna CPU en proporción a la memoria (1 vCPU completa a 1769 MB). A
+partir del benchmark se separa el tiempo de CPU del tiempo de espera (E/S),
+se proyecta la duración en cada nivel de memoria escalando solo la parte de CPU
+por la fracción de vCPU disponible y se elige el nivel más barato, el más rápido
+o el equilibrado según el precio por GB-segundo de Lambda. Es una proyección
+analítica de una única medición local, no una medición en cada nivel.
+"""
+import math
+
+MEMORY_TIERS = [128, 256, 512, 1024, 2048]
+TIMEOUT_OPTIONS = [5, 10, 30, 60, 300]
+FULL_VCPU_MEMORY_MB = 1769
+PRICE_PER_GB_SECOND = 0.0000166667
+# Precio por GB-segundo según la arquitectura (us-east-1)
+ARCHITECTURE_PRICES = {
+    "x86_64": PRICE_PER_GB_SECOND,
+    "arm64": 0.0000133334
+}
+PRICE_PER_REQUEST = 0.20 / 1_000_000
+MEMORY_HEADROOM = 1.2
+TIMEOUT_SAFETY_FACTOR = 3
+
+STRATEGIES = {
+    "cost": "💰 Más barato",
+    "speed": "⚡ Más rápido",
+    "balanced": "⚖️ Equilibrado"
+}
+
+
+def cpu_share(memory_mb):
+    """Fracción de vCPU disponible para un handler de un solo hilo."""
+    return min(1.0, memory_mb / FULL_VCPU_MEMORY_MB)
+
+
+def simulate_durations(bench_report, tiers=MEMORY_TIERS, percentile="p50"):
+    """Estima la duración (ms) de cada nivel de memoria a partir del benchmark."""
+    wall = bench_report["warm"][percentile]
+    cpu = min(wall, bench_report["warm_cpu"][percentile])
+    io_wait = wall - cpu
+    return {tier: io_wait + cpu / cpu_share(tier) for tier in tiers}
+
+
+def invocation_cost(memory_mb, duration_ms, price_per_gb_second=PRICE_PER_GB_SECOND):
+    """Coste en USD de una invocación (facturación por milisegundo)."""
+    return memory_mb / 1024 * math.ceil(duration_ms) / 1000 * price_per_gb_second + PRICE_PER_REQUEST
+
+
+def recommend_timeout(duration_ms, options=TIMEOUT_OPTIONS):
+    """Primer timeout disponible que deja margen sobre la duración en el peor caso."""
+    needed_s = duration_ms * TIMEOUT_SAFETY_FACTOR / 1000
+    return next((option for option in options if option >= needed_s), options[-1])
+
+
+def recommend(bench_report, strategy="balanced", tiers=MEMORY_TIERS, price_per_gb_second=PRICE_PER_GB_SECOND):
+    """Calcula la tabla de niveles y la configuración recomendada.
+
+    Se descartan los niveles por debajo del pico de RSS medido (más un margen),
+    ya que la función se quedaría sin memoria.
+    """
+    if not bench_report.get("warm") or not bench_report.get("warm_cpu"):
+        raise ValueError("El benchmark no tiene invocaciones en caliente con las que estimar la duración.")
+
+    durations = simulate_durations(bench_report, tiers)
+    wall = bench_report["warm"]["p50"]
+    cpu = min(wall, bench_report["warm_cpu"]["p50"])
+    tail = simulate_durations(bench_report, tiers, "p99")
+    min_memory = (bench_report.get("peak_rss_mb") or 0) * MEMORY_HEADROOM
+
+    rows = []
+    for tier in tiers:
+        duration = durations[tier]
+        rows.append({
+            "memory": tier,
+            "duration_ms": round(duration, 2),
+            "p99_ms": round(tail[tier], 2),
+            "cost_per_million": round(invocation_cost(tier, duration, price_per_gb_second) * 1_000_000, 4),
+            "viable": tier >= min_memory
+        })
+
+    viable = [row for row in rows if row["viable"]] or rows[-1:]
+    if strategy == "cost":
+        best = min(viable, key=lambda row: (row["cost_per_million"], row["duration_ms"]))
+    elif strategy == "speed":
+        best = min(viable, key=lambda row: (row["duration_ms"], row["cost_per_million"]))
+    else:
+        # Equilibrado: coste y duración normalizados respecto al mejor de cada uno
+        min_cost = min(row["cost_per_million"] for row in viable)
+        min_duration = max(min(row["duration_ms"] for row in viable), 1e-9)
+        best = min(viable, key=lambda row: row["cost_per_million"] / min_cost + row["duration_ms"] / min_duration)
+
+    # El timeout se dimensiona para el peor caso: cold start + cola de latencia
+    cold_overhead = (bench_report["cold"]["p99"] - bench_report["warm"]["p50"]) if bench_report.get("cold") else 0
+    worst_case_ms = best["p99_ms"] + max(0.0, cold_overhead) / cpu_share(best["memory"])
+
+    return {
+        "strategy": strategy,
+        # Parámetros de la proyección: la espera se mantiene y la CPU se divide por la fracción de vCPU
+        "projection": {"io_ms": round(wall - cpu, 2), "cpu_ms": round(cpu, 2)},
+        "rows": rows,
+        "recommended": {"memory": best["memory"], "timeout": recommend_timeout(worst_case_ms)}
+    }
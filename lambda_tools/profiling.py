@@ -0,0 +1,212 @@
+"""Perfilado del cold start de un handler.
+
+Importa el handler en un subproceso aislado con `-X importtime` y tracemalloc
+para medir el tiempo de inicialización a nivel de módulo, el desglose por import
+y el pico de memoria durante el init, y señala qué imports podrían diferirse.
+"""
+import ast
+import json
+import os
+import site
+import subprocess
+import sys
+import tempfile
+
+INIT_MARKER = "__LAMBDA_TOOLS_INIT_START__"
+LAZY_IMPORT_THRESHOLD_MS = 10.0
+
+# Se ejecuta en el subproceso: activa tracemalloc, marca el inicio del init en
+# stderr (para separar los imports del intérprete de los del handler) e importa
+# el handler igual que lo haría el runtime de Lambda
+PROBE_SCRIPT = r"""
+import importlib.util, json, os, sys, time, tracemalloc
+
+handler_path, marker, result_path = sys.argv[1:4]
+sys.path.insert(0, os.path.dirname(handler_path))
+tracemalloc.start()
+sys.stderr.write(marker + "\n")
+sys.stderr.flush()
+
+error = None
+started = time.perf_counter()
+try:
+    spec = importlib.util.spec_from_file_location("handler", handler_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["handler"] = module
+    spec.loader.exec_module(module)
+except BaseException as exc:
+    error = f"{type(exc).__name__}: {exc}"
+elapsed = time.perf_counter() - started
+_, peak = tracemalloc.get_traced_memory()
+
+with open(result_path, "w") as handle:
+    json.dump({"init_ms": elapsed * 1000, "peak_memory_kb": peak / 1024, "error": error}, handle)
+"""
+
+# Credenciales y región ficticias para que los clientes de AWS creados a nivel de
+# módulo no busquen credenciales reales ni hagan llamadas de red durante el init
+SANDBOX_ENV = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    "AWS_LAMBDA_FUNCTION_NAME": "lambda-tools-profile",
+    "AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "128"
+}
+# Únicas variables que se heredan del proceso: las que deciden qué intérprete y qué
+# paquetes ve el subproceso (SYSTEMROOT solo existe en Windows)
+INHERITED_ENV = ("PATH", "LANG", "LC_ALL", "SYSTEMROOT", "PYTHONPATH", "VIRTUAL_ENV", "CONDA_PREFIX",
+                 "PYENV_VERSION")
+
+
+def sandbox_env(home=None):
+    """Entorno mínimo para ejecutar código no confiable en un subproceso.
+
+    Se construye desde cero y no desde `os.environ`, para que el handler no vea
+    la API key del modelo, las credenciales reales de AWS ni ningún otro secreto
+    del servidor. HOME apunta a un directorio temporal, así que las rutas que
+    dependen de él (los paquetes instalados con `pip --user` y los shims de
+    pyenv) se fijan a las del proceso actual.
+    """
+    env = {name: os.environ[name] for name in INHERITED_ENV if name in os.environ}
+    env["HOME"] = home or tempfile.gettempdir()
+    env["PYTHONUSERBASE"] = os.environ.get("PYTHONUSERBASE") or site.getuserbase()
+    env["PYENV_ROOT"] = os.environ.get("PYENV_ROOT") or os.path.join(os.path.expanduser("~"), ".pyenv")
+    env.update(SANDBOX_ENV)
+    return env
+
+
+def parse_importtime(stderr, marker=INIT_MARKER):
+    """Extrae las líneas de `-X importtime` emitidas después del marcador de inicio.
+
+    Devuelve una lista de diccionarios con el módulo, su tiempo propio y
+    acumulado (en ms) y la profundidad relativa (0 = importado por el handler).
+    """
+    lines = stderr.splitlines()
+    if marker in lines:
+        lines = lines[lines.index(marker) + 1:]
+
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            indent = len(name) - len(name.lstrip()) - 1
+            entries.append({
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "indent": indent
+            })
+        except ValueError:
+            continue
+
+    if entries:
+        base = min(entry["indent"] for entry in entries)
+        for entry in entries:
+            entry["depth"] = (entry.pop("indent") - base) // 2
+    return entries
+
+
+def _module_level_imports(tree):
+    """Devuelve (módulo, nombres ligados, línea) de cada import a nivel de módulo."""
+    imports = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                bound = alias.asname or alias.name.split(".")[0]
+                imports.append((alias.name, {bound}, node.lineno))
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            bound = {alias.asname or alias.name for alias in node.names}
+            imports.append((node.module, bound, node.lineno))
+    return imports
+
+
+def _names_used_at_module_level(tree):
+    """Nombres que se usan fuera de cuerpos de funciones (y por tanto durante el init)."""
+    used = set()
+
+    def walk(node):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                # Los decoradores y valores por defecto sí se evalúan en el init
+                for expr in getattr(child, "decorator_list", []) + child.args.defaults:
+                    walk(expr)
+                    if isinstance(expr, ast.Name):
+                        used.add(expr.id)
+                continue
+            if isinstance(child, ast.Name):
+                used.add(child.id)
+            walk(child)
+
+    walk(tree)
+    return used
+
+
+def find_lazy_candidates(source, entries, threshold_ms=LAZY_IMPORT_THRESHOLD_MS):
+    """Señala imports costosos que solo se usan dentro de funciones.
+
+    Esos módulos pueden importarse dentro de la función que los necesita para
+    sacar su coste del cold start (o de las invocaciones que no los usan).
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+
+    timings = {entry["module"]: entry["cumulative_ms"] for entry in entries}
+    used_in_init = _names_used_at_module_level(tree)
+    candidates = []
+    for module, bound, line in _module_level_imports(tree):
+        cost = timings.get(module, timings.get(module.split(".")[0], 0.0))
+        if cost >= threshold_ms and not bound & used_in_init:
+            candidates.append({"module": module, "cumulative_ms": round(cost, 1), "line": line})
+    return sorted(candidates, key=lambda candidate: -candidate["cumulative_ms"])
+
+
+def profile_cold_start(source, timeout=60, python=sys.executable, top=10):
+    """Mide el init del handler en un subproceso aislado y devuelve el informe."""
+    with tempfile.TemporaryDirectory(prefix="lambda-tools-profile-") as workdir:
+        handler_path = os.path.join(workdir, "handler.py")
+        result_path = os.path.join(workdir, "result.json")
+        with open(handler_path, "w", encoding="utf-8") as handle:
+            handle.write(source)
+
+        env = sandbox_env(home=workdir)
+        try:
+            process = subprocess.run(
+                [python, "-X", "importtime", "-c", PROBE_SCRIPT, handler_path, INIT_MARKER, result_path],
+                cwd=workdir,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return {"error": f"El init no terminó en {timeout} s", "imports": [], "top_imports": [], "lazy_candidates": []}
+
+        if not os.path.exists(result_path):
+            return {
+                "error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "El subproceso falló",
+                "imports": [], "top_imports": [], "lazy_candidates": []
+            }
+        with open(result_path, encoding="utf-8") as handle:
+            result = json.load(handle)
+
+    entries = parse_importtime(process.stderr)
+    direct_imports = sorted(
+        (entry for entry in entries if entry["depth"] == 0),
+        key=lambda entry: -entry["cumulative_ms"]
+    )
+    result.update({
+        "init_ms": round(result["init_ms"], 1),
+        "peak_memory_kb": round(result["peak_memory_kb"], 1),
+        "import_ms": round(sum(entry["cumulative_ms"] for entry in direct_imports), 1),
+        "imports": direct_imports,
+        "top_imports": sorted(entries, key=lambda entry: -entry["self_ms"])[:top],
+        "lazy_candidates": find_lazy_candidates(source, direct_imports)
+    })
+    return result
@@ -0,0 +1,416 @@
+"""Prompts compartidos por el generador y el debugger (interfaz Streamlit y modo por lotes)."""
+import re
+
+from lambda_tools.sam import snapstart_enabled, sqs_settings
+from lambda_tools.skeletons import skeleton_contract, skeleton_settings
+from lambda_tools.static_analysis import format_findings
+from lambda_tools.tokens import (
+    DEFAULT_PROMPT_BUDGET, chunk_handler, count_tokens, split_handler, strip_boilerplate, strip_template,
+    truncate_to_budget
+)
+
+# Un bloque sin cerrar (respuesta en streaming) llega hasta el final del texto
+CODE_FENCE = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)(?:```|\Z)", re.DOTALL)
+EXPLANATION_MARKER = "### EXPLICACIÓN"
+
+ANALYSIS_INSTRUCTIONS = """Por favor, proporciona un análisis detallado que incluya:
+
+1. 📝 Análisis de Código
+   - Estructura y organización
+   - Manejo de errores
+   - Logging y monitoreo
+   - Seguridad
+
+2. ⚠️ Problemas Potenciales
+   - Problemas de rendimiento
+   - Fugas de memoria
+   - Problemas de seguridad
+   - Malas prácticas
+
+3. ✅ Recomendaciones
+   - Mejoras específicas de código
+   - Optimizaciones
+   - Mejores prácticas
+   - Patrones recomendados
+
+4. 📊 Recursos y Costos
+   - Uso de memoria
+   - Tiempo de ejecución
+   - Costos estimados
+   - Optimización de recursos
+
+Usa un lenguaje claro y proporciona ejemplos específicos cuando sea necesario."""
+
+ANALYSIS_PROMPT = """Analiza el siguiente código de AWS Lambda y proporciona un informe detallado:
+
+CÓDIGO PYTHON:
+{handler_code}
+
+{template_section}
+{static_section}{production_section}
+""" + ANALYSIS_INSTRUCTIONS
+
+CHUNK_ANALYSIS_PROMPT = """Analiza el siguiente fragmento ({index}/{total}) de un handler de AWS Lambda.
+Incluye el contexto de módulo (imports y variables globales) y algunas de sus funciones; cada
+una va precedida de su rango de líneas en el fichero original.
+
+CÓDIGO PYTHON:
+{code}
+{static_section}
+Enumera solo los problemas de rendimiento, manejo de errores, seguridad y malas prácticas
+de las funciones de este fragmento, con la línea y una recomendación concreta para cada uno.
+El resto del handler se analiza por separado: no lo describas."""
+
+MERGE_PROMPT = """Estos son los análisis parciales de los fragmentos de un mismo handler de AWS Lambda,
+que era demasiado grande para analizarlo de una vez:
+
+{partials}
+{template_section}
+{static_section}{production_section}
+Combínalos en un único informe, sin repetir problemas ni contradecirte.
+""" + ANALYSIS_INSTRUCTIONS
+
+CODE_PROMPT = """Genera el código Python para una función AWS Lambda que haga lo siguiente:
+
+Descripción: {description}
+Tipo de trigger: {trigger}
+{trigger_notes}
+{cold_start_notes}
+{observability_notes}
+La función debe:
+1. Seguir las mejores prácticas de AWS Lambda
+2. Incluir manejo de errores y logging apropiado
+3. Ser eficiente y clara
+4. Incluir las importaciones necesarias
+5. Incluir comentarios explicativos
+6. NO incluir código de ejemplo o plantillas
+7. Implementar SOLO la funcionalidad solicitada
+
+Importante:
+- El código debe ser una única implementación coherente
+- NO incluir múltiples versiones o ejemplos
+- NO incluir código comentado o alternativas
+- Asegurarse de que todas las funciones estén correctamente definidas
+- Incluir solo las dependencias estrictamente necesarias
+
+Estructura el código en este orden:
+1. Imports
+2. Configuración de logging
+3. Configuración de clientes AWS necesarios
+4. Función principal lambda_handler
+5. Funciones auxiliares necesarias
+"""
+
+SKELETON_PROMPT = """Genera la lógica de negocio de una función AWS Lambda que haga lo siguiente:
+
+Descripción: {description}
+Tipo de trigger: {trigger}
+
+El handler se monta sobre una plantilla revisada que ya se encarga de {responsibilities}.
+Escribe SOLO:
+
+{signature}
+
+{contract}
+
+Reglas:
+- Incluye todos los imports que necesites (se combinan con los de la plantilla); `logger` ya existe
+- Crea a nivel de módulo, fuera de la función, los clientes de AWS y las conexiones que necesites
+- Puedes añadir constantes y funciones auxiliares
+- NO definas {handler_name} ni repitas lo que ya hace la plantilla
+- NO incluyas código de ejemplo, alternativas ni código comentado
+{cold_start_notes}
+{observability_notes}"""
+
+IMPROVEMENT_PROMPT = """Basándote en el código proporcionado, genera una versión mejorada que solucione los problemas identificados:
+
+CÓDIGO ORIGINAL:
+{code}
+{findings_section}
+Genera una versión mejorada que:
+1. Solucione los problemas identificados
+2. Implemente las mejores prácticas
+3. Optimice el rendimiento
+4. Mejore la seguridad
+
+Proporciona el código completo y mejorado, junto con comentarios explicativos.
+El código debe ser una única implementación coherente, sin alternativas ni código comentado."""
+
+REPAIR_PROMPT = """El siguiente handler de AWS Lambda ha fallado la validación local:
+
+CÓDIGO PYTHON:
+{code}
+
+ERRORES:
+{errors}
+
+Corrige el código para que supere la validación, manteniendo la misma funcionalidad y estructura.
+Devuelve solo el código completo corregido en un único bloque ```python, sin explicaciones."""
+
+
+STATIC_FINDINGS_SECTION = """
+HALLAZGOS DEL ANÁLISIS ESTÁTICO (ya verificados de forma determinista):
+{findings}
+
+No repitas estos hallazgos: dalos por conocidos y dedica el análisis de rendimiento
+a lo que el análisis estático no puede decidir (lógica de negocio, algoritmos,
+patrones de acceso a datos y configuración).
+"""
+
+# Parte del presupuesto de tokens que puede ocupar el template SAM
+TEMPLATE_SHARE = 0.25
+
+PRODUCTION_STATS_SECTION = """
+MÉTRICAS DE PRODUCCIÓN (extraídas de los logs de CloudWatch / trazas de X-Ray):
+{stats}
+
+Basa las recomendaciones de memoria, timeout y cold start en estas métricas reales
+en lugar de en estimaciones.
+"""
+
+BATCH_FAILURES_NOTE = """El evento llega en lotes de hasta {batch_size} mensajes y la función usa ReportBatchItemFailures:
+procesa cada registro de forma independiente y devuelve {{"batchItemFailures": [{{"itemIdentifier": messageId}}]}}
+solo con los mensajes que fallen, sin lanzar excepciones que hagan reintentar el lote completo."""
+
+BATCH_NOTE = """El evento llega en lotes de hasta {batch_size} mensajes: agrupa las escrituras y llamadas
+externas del lote en lugar de hacer una por registro."""
+
+
+COLD_START_NOTE = """Optimiza la fase de init (cold start):
+- Crea los clientes de AWS, sesiones HTTP y conexiones a nivel de módulo, una sola vez por contenedor
+- Importa dentro de la función que los usa los módulos pesados que no se necesitan en todas las invocaciones
+- Abre en el init las conexiones que se usan en todas las invocaciones para que lleguen ya establecidas"""
+
+SNAPSTART_NOTE = """
+La función usa SnapStart: el init se ejecuta una vez y se restaura desde un snapshot.
+- Restablece las conexiones a bases de datos en una función decorada con @register_after_restore
+  (from snapshot_restore_py import register_after_restore)
+- No calcules en el init valores únicos o dependientes del tiempo (uuid, random, timestamps)"""
+
+
+POWERTOOLS_NOTE = """Instrumenta la función con AWS Lambda Powertools (aws_lambda_powertools):
+- Crea Logger(), Tracer() y Metrics() a nivel de módulo (el servicio y el namespace vienen de las
+  variables POWERTOOLS_SERVICE_NAME y POWERTOOLS_METRICS_NAMESPACE)
+- Decora lambda_handler con @logger.inject_lambda_context, @tracer.capture_lambda_handler y
+  @metrics.log_metrics(capture_cold_start_metric=True)
+- Publica con metrics.add_metric las métricas de negocio relevantes (elementos procesados, fallos)
+- Usa @tracer.capture_method en las funciones auxiliares que hacen llamadas externas"""
+
+SKELETON_POWERTOOLS_NOTE = """La plantilla ya crea `logger`, `tracer` y `metrics` de AWS Lambda Powertools:
+- Usa @tracer.capture_method en las funciones que hacen llamadas externas
+- Publica con metrics.add_metric las métricas de negocio relevantes"""
+
+
+def build_observability_notes(config):
+    """Instrucciones de instrumentación con Powertools si están activadas."""
+    return POWERTOOLS_NOTE if (config.get("observability") or {}).get("powertools") else ""
+
+
+def build_cold_start_notes(config):
+    """Instrucciones de estructura del init cuando el modo de optimización del cold start está activo."""
+    if not (config.get("cold_start") or {}).get("enabled"):
+        return ""
+    return COLD_START_NOTE + (SNAPSTART_NOTE if snapstart_enabled(config) else "")
+
+
+EXPLANATION_FORMAT = """
+Formato de la respuesta (se procesa automáticamente):
+1. El código completo en un único bloque ```python
+2. Una línea que contenga solo `{marker}`
+3. Una explicación clara y estructurada del código, para desarrolladores con conocimientos básicos:
+   - 📝 Explicación general del código y su funcionamiento
+   - 🔍 Desglose de cada parte importante
+   - 🎯 Cómo cumple con los requisitos solicitados
+   - ⚠️ Consideraciones importantes a tener en cuenta (permisos IAM, límites, configuración)
+"""
+
+
+def build_trigger_notes(config):
+    """Instrucciones específicas del trigger para el prompt de generación de código."""
+    if config.get("trigger_type") != "SQS":
+        return ""
+    settings = sqs_settings(config)
+    note = BATCH_FAILURES_NOTE if settings["report_failures"] else BATCH_NOTE
+    return note.format(batch_size=settings["batch_size"])
+
+
+def build_code_prompt(description, config, explain=True):
+    """Construye el prompt de generación del handler a partir de la configuración del generador.
+
+    Con `explain` el modelo devuelve en la misma respuesta el código y su
+    explicación, separados por EXPLANATION_MARKER (ver `split_generation`), en
+    lugar de necesitar una segunda llamada que vuelva a enviar todo el código.
+    """
+    prompt = CODE_PROMPT.format(
+        description=description,
+        trigger=config.get("trigger_type"),
+        trigger_notes=build_trigger_notes(config),
+        cold_start_notes=build_cold_start_notes(config),
+        observability_notes=build_observability_notes(config)
+    )
+    return prompt + EXPLANATION_FORMAT.format(marker=EXPLANATION_MARKER) if explain else prompt
+
+
+def build_skeleton_prompt(description, config, explain=True):
+    """Construye el prompt que pide solo la lógica de negocio de la plantilla elegida (ver `fill_skeleton`)."""
+    powertools = (config.get("observability") or {}).get("powertools")
+    prompt = SKELETON_PROMPT.format(
+        description=description,
+        trigger=config.get("trigger_type"),
+        handler_name=config.get("handler_name", "lambda_handler"),
+        cold_start_notes=build_cold_start_notes(config),
+        observability_notes=SKELETON_POWERTOOLS_NOTE if powertools else "",
+        **skeleton_contract(config)
+    )
+    return prompt + EXPLANATION_FORMAT.format(marker=EXPLANATION_MARKER) if explain else prompt
+
+
+def build_generation_prompt(description, config, explain=True):
+    """Prompt de la plantilla elegida en la configuración o, sin plantilla, el del handler completo."""
+    if skeleton_settings(config):
+        return build_skeleton_prompt(description, config, explain)
+    return build_code_prompt(description, config, explain)
+
+
+def _template_section(template_content, budget):
+    if not template_content:
+        return ""
+    return f"\nTEMPLATE SAM:\n{truncate_to_budget(strip_template(template_content), int(budget * TEMPLATE_SHARE))}"
+
+
+def _static_section(static_findings):
+    return STATIC_FINDINGS_SECTION.format(findings=format_findings(static_findings)) if static_findings else ""
+
+
+def _production_section(production_stats):
+    return PRODUCTION_STATS_SECTION.format(stats=production_stats) if production_stats else ""
+
+
+def build_analysis_prompt(handler_code, template_content=None, static_findings=None, production_stats=None,
+                          budget=DEFAULT_PROMPT_BUDGET):
+    """Construye el prompt de análisis de un handler y su template SAM opcional.
+
+    `static_findings` es la lista de hallazgos de `analyze_handler`; si se indica,
+    se incluyen para que el modelo no gaste tokens en volver a detectarlos.
+    `production_stats` es el resumen de `format_log_stats` de los logs de la función.
+    El código se envía sin comentarios ni docstrings y el template se recorta a
+    una parte del presupuesto; el código no se recorta (ver `plan_analysis`).
+    """
+    return ANALYSIS_PROMPT.format(
+        handler_code=strip_boilerplate(handler_code),
+        template_section=_template_section(template_content, budget),
+        static_section=_static_section(static_findings),
+        production_section=_production_section(production_stats)
+    )
+
+
+def build_chunk_prompts(handler_code, static_findings=None, budget=DEFAULT_PROMPT_BUDGET):
+    """Un prompt por fragmento del handler, cada uno con los hallazgos estáticos de sus líneas.
+
+    Los hallazgos de código de módulo (fuera de cualquier función) van en el primero.
+    """
+    findings = static_findings or []
+
+    def piece_findings(start, end):
+        return [finding for finding in findings if start <= finding.line <= end]
+
+    def finding_tokens(piece):
+        found = piece_findings(piece["start"], piece["end"])
+        return count_tokens(format_findings(found)) if found else 0
+
+    code = strip_boilerplate(handler_code)
+    pieces = split_handler(code)[1]
+    module_findings = [finding for finding in findings
+                       if not any(piece["start"] <= finding.line <= piece["end"] for piece in pieces)]
+    overhead = count_tokens(CHUNK_ANALYSIS_PROMPT + (STATIC_FINDINGS_SECTION if findings else "")
+                            + format_findings(module_findings))
+    chunks = chunk_handler(code, max(budget - overhead, budget // 2), extra_tokens=finding_tokens)
+
+    prompts = {}
+    for index, chunk in enumerate(chunks, 1):
+        chunk_findings = [finding for start, end in chunk["ranges"] for finding in piece_findings(start, end)]
+        prompts[f"chunk_{index}"] = CHUNK_ANALYSIS_PROMPT.format(
+            index=index,
+            total=len(chunks),
+            code=chunk["code"],
+            static_section=_static_section((module_findings if index == 1 else []) + chunk_findings)
+        )
+    return prompts
+
+
+def build_merge_prompt(partials, template_content=None, static_findings=None, production_stats=None,
+                       budget=DEFAULT_PROMPT_BUDGET):
+    """Construye el prompt que combina los análisis parciales en el informe final."""
+    template_section = _template_section(template_content, budget)
+    static_section = _static_section(static_findings)
+    production_section = _production_section(production_stats)
+    overhead = count_tokens(MERGE_PROMPT + template_section + static_section + production_section)
+    share = max(budget - overhead, budget // 2) // max(len(partials), 1)
+    return MERGE_PROMPT.format(
+        partials="\n".join(f"### Fragmento {index}\n{truncate_to_budget(text, share)}"
+                           for index, text in enumerate(partials.values(), 1)),
+        template_section=template_section,
+        static_section=static_section,
+        production_section=production_section
+    )
+
+
+def plan_analysis(handler_code, template_content=None, static_findings=None, production_stats=None,
+                  budget=DEFAULT_PROMPT_BUDGET):
+    """Decide cómo analizar el handler dentro del presupuesto de tokens.
+
+    Devuelve (prompts, merge). Si el prompt completo cabe, `prompts` tiene solo
+    "analysis" y `merge` es None. Si no, hay un prompt por fragmento, que se
+    pueden lanzar en paralelo, y `merge(respuestas)` construye el prompt final
+    a partir del diccionario nombre -> respuesta.
+    """
+    prompt = build_analysis_prompt(handler_code, template_content, static_findings, production_stats, budget)
+    if count_tokens(prompt) <= budget:
+        return {"analysis": prompt}, None
+
+    def merge(partials):
+        return build_merge_prompt(partials, template_content, static_findings, production_stats, budget)
+
+    return build_chunk_prompts(handler_code, static_findings, budget), merge
+
+
+def build_improvement_prompt(code, static_findings=None, budget=DEFAULT_PROMPT_BUDGET):
+    """Construye el prompt para generar una versión mejorada del handler.
+
+    El código va completo si cabe en `budget`; si no, sin comentarios ni
+    docstrings y, como último recurso, recortado por líneas.
+    """
+    findings_section = ""
+    if static_findings:
+        findings_section = f"\nPROBLEMAS DETECTADOS POR EL ANÁLISIS ESTÁTICO:\n{format_findings(static_findings)}\n"
+    code_budget = max(budget - count_tokens(IMPROVEMENT_PROMPT.format(code="", findings_section=findings_section)), 0)
+    if count_tokens(code) > code_budget:
+        code = truncate_to_budget(strip_boilerplate(code), code_budget)
+    return IMPROVEMENT_PROMPT.format(code=code, findings_section=findings_section)
+
+
+def build_repair_prompt(code, failed_stages):
+    """Construye el prompt de corrección con los errores de las etapas de validación fallidas."""
+    errors = "\n".join(f"- {stage['label']}: {stage['detail']}" for stage in failed_stages)
+    return REPAIR_PROMPT.format(code=code, errors=errors)
+
+
+def extract_python_code(text):
+    """Extrae el código Python de una respuesta del LLM, sin los bloques ``` de markdown."""
+    blocks = CODE_FENCE.findall(text)
+    if blocks:
+        return max(blocks, key=len).strip() + "\n"
+    return text.strip() + "\n"
+
+
+def split_generation(text, partial=False):
+    """Separa una respuesta de `build_code_prompt` en (código, explicación).
+
+    Si el modelo no incluye el separador, la explicación es el texto fuera de
+    los bloques de código; con `partial` (respuesta aún en streaming) se
+    considera que la explicación todavía no ha empezado.
+    """
+    code, marker, explanation = text.partition(EXPLANATION_MARKER)
+    if marker:
+        return code, explanation.strip()
+    return text, "" if partial else CODE_FENCE.sub("", text).strip()
@@ -0,0 +1,774 @@
+"""Generación incremental del template SAM.
+
+Streamlit vuelve a ejecutar el script completo con cada cambio en un widget, así
+que el template se construye por secciones: cada sección depende solo de unas
+claves de la configuración y su YAML ya renderizado se memoriza con la parte de
+la configuración que usa como clave. Al mover el slider de memoria solo se
+vuelve a renderizar la sección de dimensionado; el resto sale de la caché.
+"""
+import json
+import re
+from functools import lru_cache
+
+import yaml
+
+# libyaml es bastante más rápido que el emisor en Python puro
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+TEMPLATE_HEADER = {
+    "AWSTemplateFormatVersion": "2010-09-09",
+    "Transform": "AWS::Serverless-2016-10-31",
+    "Description": "Lambda generada con AWS Lambda Generator Pro"
+}
+FUNCTION_ID = "MyFunction"
+
+# Runtimes de Python en Lambda: arquitecturas soportadas y si aún admiten funciones nuevas
+RUNTIME_MATRIX = {
+    "python3.7": {"architectures": ("x86_64",), "deprecated": True},
+    "python3.8": {"architectures": ("x86_64", "arm64"), "deprecated": True},
+    "python3.9": {"architectures": ("x86_64", "arm64"), "deprecated": False},
+    "python3.10": {"architectures": ("x86_64", "arm64"), "deprecated": False},
+    "python3.11": {"architectures": ("x86_64", "arm64"), "deprecated": False},
+    "python3.12": {"architectures": ("x86_64", "arm64"), "deprecated": False},
+    "python3.13": {"architectures": ("x86_64", "arm64"), "deprecated": False}
+}
+RUNTIMES = [runtime for runtime, spec in RUNTIME_MATRIX.items() if not spec["deprecated"]]
+ARCHITECTURES = ["arm64", "x86_64"]
+DEFAULT_RUNTIME = "python3.12"
+# Graviton (arm64) cuesta un 20 % menos por GB-segundo
+DEFAULT_ARCHITECTURE = "arm64"
+
+# SnapStart para Python está disponible a partir de python3.12
+SNAPSTART_MIN_RUNTIME = (3, 12)
+
+# Observabilidad: alarmas de rendimiento sobre ventanas de 5 minutos
+DEFAULT_SERVICE_NAME = "mi-servicio"
+ALARM_PERIOD_SECONDS = 300
+DURATION_ALARM_RATIO = 0.8
+CONCURRENCY_ALARM_RATIO = 0.8
+ACCOUNT_CONCURRENCY_LIMIT = 1000
+QUEUE_AGE_ALARM_SECONDS = 300
+
+# Triggers que invocan la función de forma asíncrona (admiten EventInvokeConfig)
+ASYNC_TRIGGERS = ("S3 Upload", "SNS", "Scheduled Event")
+
+# Valores por defecto pensados para throughput en consumidores de SQS: lotes
+# grandes con una ventana corta amortizan el coste por invocación
+SQS_DEFAULTS = {
+    "batch_size": 100,
+    "batching_window": 5,
+    "max_concurrency": 50,
+    "report_failures": True
+}
+SQS_MAX_BATCH_SIZE = 10000
+# SQS exige una ventana de al menos 1 s con lotes de más de 10 mensajes
+SQS_UNBATCHED_LIMIT = 10
+SQS_MIN_MAX_CONCURRENCY = 2
+# AWS recomienda un visibility timeout de al menos 6 veces el timeout de la función
+SQS_VISIBILITY_FACTOR = 6
+
+# La provisioned concurrency y el despliegue gradual se aplican sobre el alias autopublicado
+ALIAS_NAME = "live"
+# Lambda exige dejar al menos 100 ejecuciones de la cuenta sin reservar
+UNRESERVED_CONCURRENCY_MIN = 100
+# Target tracking sobre la utilización de la provisioned concurrency: escala antes de que
+# las invocaciones se desborden a instancias bajo demanda (con cold start)
+DEFAULT_TARGET_UTILIZATION = 0.7
+SCALING_SCHEDULE = re.compile(r"^(cron|at)\(.+\)$")
+EVENT_SCHEDULE = re.compile(r"^(rate|cron)\(.+\)$")
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS", "ANY")
+TRAFFIC_SHIFTING_TYPES = [
+    "Canary10Percent5Minutes", "Canary10Percent10Minutes", "Canary10Percent15Minutes", "Canary10Percent30Minutes",
+    "Linear10PercentEvery1Minute", "Linear10PercentEvery2Minutes", "Linear10PercentEvery3Minutes",
+    "Linear10PercentEvery10Minutes", "AllAtOnce"
+]
+
+
+def dump_yaml(data):
+    """Serializa a YAML conservando el orden de las claves."""
+    return yaml.dump(data, Dumper=YAML_DUMPER, sort_keys=False, allow_unicode=True)
+
+
+def freeze_config(config):
+    """Convierte la configuración (o parte de ella) en una clave inmutable y hashable."""
+    return json.dumps(config, separators=(",", ":"), default=str)
+
+
+def _indent(text, spaces):
+    prefix = " " * spaces
+    return "".join(prefix + line if line.strip() else line for line in text.splitlines(True))
+
+############################
+# Secciones de la función
+############################
+def validate_config(config, trigger=True):
+    """Devuelve la lista de errores de la configuración (vacía si es válida).
+
+    Con `trigger=False` no se comprueba el trigger (configuración compartida de un proyecto).
+    """
+    errors = trigger_errors(config) if trigger else []
+    runtime = config.get("runtime", DEFAULT_RUNTIME)
+    architecture = config.get("architecture", DEFAULT_ARCHITECTURE)
+    spec = RUNTIME_MATRIX.get(runtime)
+    if architecture not in ARCHITECTURES:
+        errors.append(f"Arquitectura no soportada: {architecture}. Opciones: {', '.join(ARCHITECTURES)}.")
+    if spec is None:
+        errors.append(f"Runtime no soportado: {runtime}. Opciones: {', '.join(RUNTIMES)}.")
+    elif spec["deprecated"]:
+        errors.append(f"{runtime} está obsoleto en Lambda y no admite funciones nuevas.")
+    elif architecture in ARCHITECTURES and architecture not in spec["architectures"]:
+        errors.append(f"{runtime} no está disponible en {architecture}.")
+    return errors + _concurrency_errors(config)
+
+
+def trigger_errors(config):
+    """Errores del trigger: tipo desconocido o claves que faltan o no tienen el formato de AWS.
+
+    El topic y la cola son opcionales (se crean en el template si no se indican),
+    igual que la ruta ("/") y la programación (cada 5 minutos).
+    """
+    trigger = config.get("trigger_type")
+    if trigger not in EVENT_BUILDERS:
+        return [f"Trigger no soportado: {trigger}. Opciones: {', '.join(EVENT_BUILDERS)}." if trigger
+                else f"Falta el trigger (trigger_type). Opciones: {', '.join(EVENT_BUILDERS)}."]
+    errors = []
+    if trigger == "S3 Upload" and not config.get("bucket_name"):
+        errors.append("El trigger S3 necesita el nombre del bucket (bucket_name).")
+    if trigger == "API Gateway":
+        if config.get("route") and not config["route"].startswith("/"):
+            errors.append(f"La ruta de API Gateway debe empezar por \"/\": {config['route']}.")
+        if config.get("http_method") and config["http_method"].upper() not in HTTP_METHODS:
+            errors.append(f"Método HTTP no soportado: {config['http_method']}. Opciones: {', '.join(HTTP_METHODS)}.")
+    if trigger == "Scheduled Event" and config.get("schedule") and not EVENT_SCHEDULE.match(config["schedule"]):
+        errors.append(f"Expresión de programación no válida: {config['schedule']}. Usa rate(...) o cron(...).")
+    for key, label in (("topic_arn", "del topic SNS"), ("queue_arn", "de la cola SQS")):
+        if trigger in ("SNS", "SQS") and config.get(key) and not config[key].startswith("arn:"):
+            errors.append(f"El ARN {label} no es válido: {config[key]}.")
+    return errors
+
+
+def _concurrency_errors(config):
+    """Combinaciones de concurrencia que AWS rechaza o que provocarían throttling."""
+    errors = []
+    concurrency = config.get("concurrency") or {}
+    reserved = concurrency.get("reserved", 0)
+    provisioned = concurrency.get("provisioned", 0)
+    autoscaling = autoscaling_settings(config)
+    reserved_limit = ACCOUNT_CONCURRENCY_LIMIT - UNRESERVED_CONCURRENCY_MIN
+    if reserved > reserved_limit:
+        errors.append(f"La reserved concurrency no puede superar {reserved_limit}: Lambda exige dejar "
+                      f"{UNRESERVED_CONCURRENCY_MIN} ejecuciones de la cuenta sin reservar.")
+    if reserved and provisioned > reserved:
+        errors.append(f"La provisioned concurrency ({provisioned}) no puede superar la reserved concurrency "
+                      f"({reserved}).")
+
+    if autoscaling:
+        if provisioned < 1:
+            errors.append("El autoescalado necesita una provisioned concurrency mínima de al menos 1.")
+        if autoscaling["max"] < provisioned:
+            errors.append(f"El máximo del autoescalado ({autoscaling['max']}) es menor que la provisioned "
+                          f"concurrency mínima ({provisioned}).")
+        if reserved and autoscaling["max"] > reserved:
+            errors.append(f"El máximo del autoescalado ({autoscaling['max']}) supera la reserved concurrency "
+                          f"({reserved}).")
+        if not 0.1 <= autoscaling["target_utilization"] <= 0.9:
+            errors.append("La utilización objetivo del autoescalado debe estar entre 0.1 y 0.9.")
+        for window in autoscaling["windows"]:
+            name = window.get("name") or "sin nombre"
+            if not all(SCALING_SCHEDULE.match(window.get(key) or "") for key in ("start", "end")):
+                errors.append(f"Ventana \"{name}\": el inicio y el fin deben ser expresiones cron() o at().")
+            if window["min"] > window["max"]:
+                errors.append(f"Ventana \"{name}\": el mínimo ({window['min']}) supera al máximo ({window['max']}).")
+            if reserved and window["max"] > reserved:
+                errors.append(f"Ventana \"{name}\": el máximo ({window['max']}) supera la reserved concurrency "
+                              f"({reserved}).")
+
+    if config.get("trigger_type") == "SQS":
+        max_concurrency = sqs_settings(config)["max_concurrency"]
+        if reserved and max_concurrency > reserved:
+            errors.append(f"La concurrencia máxima de SQS ({max_concurrency}) supera la reserved concurrency "
+                          f"({reserved}): los mensajes se limitarían y volverían a la cola.")
+    return errors
+
+
+def _code_section(config):
+    if config.get("deployment", {}).get("type") == "container":
+        # En imágenes de contenedor el runtime va en la imagen, pero la arquitectura sí se declara
+        return {"Architectures": [config.get("architecture", DEFAULT_ARCHITECTURE)]}
+    return {
+        "Handler": f"handler.{config['handler_name']}",
+        "Runtime": config.get("runtime", DEFAULT_RUNTIME),
+        "Architectures": [config.get("architecture", DEFAULT_ARCHITECTURE)]
+    }
+
+
+def _sizing_section(config):
+    return {"MemorySize": config["memory"], "Timeout": config["timeout"]}
+
+
+def _environment_section(config):
+    variables = dict(config.get("env_vars") or {})
+    observability = config.get("observability") or {}
+    if observability.get("log_level"):
+        variables["LOG_LEVEL"] = observability["log_level"]
+    if observability.get("powertools"):
+        service = observability.get("service_name") or DEFAULT_SERVICE_NAME
+        variables.update({
+            "POWERTOOLS_SERVICE_NAME": service,
+            "POWERTOOLS_METRICS_NAMESPACE": service,
+            "POWERTOOLS_LOG_LEVEL": observability.get("log_level", "INFO")
+        })
+    return {"Environment": {"Variables": variables}}
+
+
+def autoscaling_settings(config):
+    """Autoescalado de la provisioned concurrency con sus valores por defecto, o None si no está activo.
+
+    {max, target_utilization, timezone, windows}; el mínimo es la provisioned
+    concurrency y cada ventana es {name, start, end, min, max}.
+    """
+    autoscaling = (config.get("concurrency") or {}).get("autoscaling") or {}
+    if not autoscaling.get("enabled"):
+        return None
+    return {
+        "max": autoscaling.get("max", 0),
+        "target_utilization": autoscaling.get("target_utilization", DEFAULT_TARGET_UTILIZATION),
+        "timezone": autoscaling.get("timezone") or "UTC",
+        "windows": [{
+            "name": window.get("name") or "",
+            "start": (window.get("start") or "").strip(),
+            "end": (window.get("end") or "").strip(),
+            "min": _capacity(window.get("min")),
+            "max": _capacity(window.get("max"))
+        } for window in autoscaling.get("windows") or [] if window.get("start") or window.get("end")]
+    }
+
+
+def _capacity(value):
+    # Las celdas vacías de la tabla de ventanas llegan como None o NaN
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _concurrency_section(config):
+    concurrency = config.get("concurrency") or {}
+    section = {}
+    if concurrency.get("reserved", 0) > 0:
+        section["ReservedConcurrentExecutions"] = concurrency["reserved"]
+    if concurrency.get("provisioned", 0) > 0:
+        # Con autoescalado es el valor inicial; después lo ajusta Application Auto Scaling
+        section["ProvisionedConcurrencyConfig"] = {"ProvisionedConcurrentExecutions": concurrency["provisioned"]}
+    return section
+
+
+def _vpc_section(config):
+    vpc = config.get("vpc") or {}
+    if not vpc.get("enabled"):
+        return {}
+    return {"VpcConfig": {
+        "SubnetIds": vpc["subnet_ids"].split(","),
+        "SecurityGroupIds": vpc["security_group_ids"].split(",")
+    }}
+
+
+def _tracing_section(config):
+    # El Tracer de Powertools necesita el tracing activo para enviar las trazas a X-Ray
+    observability = config.get("observability") or {}
+    return {"Tracing": "Active"} if observability.get("xray") or observability.get("powertools") else {}
+
+
+def _dlq_section(config):
+    error_handling = config.get("error_handling") or {}
+    if not error_handling.get("use_dlq"):
+        return {}
+    return {"DeadLetterQueue": {"Type": error_handling["dlq_type"], "TargetArn": error_handling["dlq_arn"]}}
+
+
+def _deployment_section(config):
+    deployment = config.get("deployment") or {}
+    section = {}
+    if deployment.get("type") == "container":
+        section["ImageUri"] = deployment["ecr_uri"]
+    elif deployment.get("layers"):
+        section["Layers"] = deployment["layers"].split("\n")
+    return section
+
+
+def runtime_version(runtime):
+    """Convierte "python3.12" en (3, 12)."""
+    return tuple(int(part) for part in runtime.replace("python", "").split("."))
+
+
+def snapstart_blocker(config):
+    """Motivo por el que SnapStart no puede activarse con esta configuración (None si puede)."""
+    runtime = config.get("runtime", DEFAULT_RUNTIME)
+    if (config.get("deployment") or {}).get("type") == "container":
+        return "SnapStart no está disponible para imágenes de contenedor."
+    if runtime not in RUNTIME_MATRIX or runtime_version(runtime) < SNAPSTART_MIN_RUNTIME:
+        return f"SnapStart para Python requiere python3.12 o superior (seleccionado: {runtime})."
+    if (config.get("concurrency") or {}).get("provisioned", 0) > 0:
+        return "SnapStart no se puede combinar con Provisioned Concurrency en la misma versión."
+    return None
+
+
+def snapstart_enabled(config):
+    """Indica si el modo de optimización del cold start activa SnapStart."""
+    return bool((config.get("cold_start") or {}).get("enabled")) and snapstart_blocker(config) is None
+
+
+def _versioning_section(config):
+    # SnapStart, la provisioned concurrency y el despliegue gradual solo se aplican
+    # a versiones publicadas: necesitan el alias autopublicado
+    section = {}
+    if snapstart_enabled(config):
+        section["SnapStart"] = {"ApplyOn": "PublishedVersions"}
+    deployment = config.get("deployment") or {}
+    needs_alias = (config.get("concurrency") or {}).get("provisioned", 0) > 0 or deployment.get("traffic_shifting")
+    if deployment.get("auto_publish") or needs_alias or section:
+        section["AutoPublishAlias"] = ALIAS_NAME
+    return section
+
+
+def _deployment_preference_section(config):
+    # CodeDeploy desplaza el tráfico del alias y vuelve atrás si salta alguna alarma de la función
+    shifting = (config.get("deployment") or {}).get("traffic_shifting")
+    if not shifting:
+        return {}
+    preference = {"Type": shifting}
+    alarms = [alarm_id for alarm_id in _alarm_ids(config) if alarm_id in ROLLBACK_ALARMS]
+    if alarms:
+        preference["Alarms"] = [{"Ref": alarm_id} for alarm_id in alarms]
+    return {"DeploymentPreference": preference}
+
+
+def sqs_settings(config):
+    """Parámetros de batching de SQS normalizados a los límites de AWS."""
+    settings = dict(SQS_DEFAULTS, **(config.get("sqs") or {}))
+    settings["batch_size"] = min(max(1, settings["batch_size"]), SQS_MAX_BATCH_SIZE)
+    if settings["batch_size"] > SQS_UNBATCHED_LIMIT:
+        settings["batching_window"] = max(1, settings["batching_window"])
+    if settings["max_concurrency"]:
+        settings["max_concurrency"] = max(SQS_MIN_MAX_CONCURRENCY, settings["max_concurrency"])
+    return settings
+
+
+def _resource_id(config, kind):
+    """Id lógico del recurso del trigger; en los proyectos lleva el prefijo de la función."""
+    return config.get("resource_prefix", "Trigger") + kind
+
+
+def _s3_event(config):
+    properties = {"Bucket": {"Ref": _resource_id(config, "Bucket")}, "Events": "s3:ObjectCreated:*"}
+    if config.get("prefix"):
+        properties["Filter"] = {"S3Key": {"Rules": [{"Name": "prefix", "Value": config["prefix"]}]}}
+    return {"S3Upload": {"Type": "S3", "Properties": properties}}
+
+
+def _api_event(config):
+    return {"ApiRequest": {"Type": "Api", "Properties": {
+        "Path": config.get("route") or "/",
+        "Method": (config.get("http_method") or "GET").lower()
+    }}}
+
+
+def _schedule_event(config):
+    return {"ScheduledRun": {"Type": "Schedule", "Properties": {
+        "Schedule": config.get("schedule") or "rate(5 minutes)",
+        "Enabled": True
+    }}}
+
+
+def _sns_event(config):
+    topic = config.get("topic_arn") or {"Ref": _resource_id(config, "Topic")}
+    return {"SnsMessage": {"Type": "SNS", "Properties": {"Topic": topic}}}
+
+
+def _sqs_event(config):
+    settings = sqs_settings(config)
+    properties = {
+        "Queue": config.get("queue_arn") or {"Fn::GetAtt": [_resource_id(config, "Queue"), "Arn"]},
+        "BatchSize": settings["batch_size"],
+        "MaximumBatchingWindowInSeconds": settings["batching_window"]
+    }
+    if settings["max_concurrency"]:
+        properties["ScalingConfig"] = {"MaximumConcurrency": settings["max_concurrency"]}
+    if settings["report_failures"]:
+        properties["FunctionResponseTypes"] = ["ReportBatchItemFailures"]
+    return {"SqsBatch": {"Type": "SQS", "Properties": properties}}
+
+
+EVENT_BUILDERS = {
+    "S3 Upload": _s3_event,
+    "API Gateway": _api_event,
+    "Scheduled Event": _schedule_event,
+    "SNS": _sns_event,
+    "SQS": _sqs_event
+}
+
+
+def _events_section(config):
+    builder = EVENT_BUILDERS.get(config.get("trigger_type"))
+    return {"Events": builder(config)} if builder else {}
+
+
+def _event_invoke_section(config):
+    if config.get("trigger_type") not in ASYNC_TRIGGERS:
+        return {}
+    return {"EventInvokeConfig": {
+        "MaximumEventAgeInSeconds": config.get("max_event_age", 3600),
+        "MaximumRetryAttempts": config.get("max_retry", 2)
+    }}
+
+
+EVENT_KEYS = ("trigger_type", "resource_prefix", "bucket_name", "prefix", "route", "http_method",
+              "schedule", "topic_arn", "queue_arn", "sqs")
+
+# (constructor, claves de la configuración de las que depende), en el orden del template
+FUNCTION_SECTIONS = [
+    (_code_section, ("handler_name", "runtime", "architecture", "deployment")),
+    (_sizing_section, ("memory", "timeout")),
+    (_environment_section, ("env_vars", "observability")),
+    (_concurrency_section, ("concurrency",)),
+    (_vpc_section, ("vpc",)),
+    (_tracing_section, ("observability",)),
+    (_dlq_section, ("error_handling",)),
+    (_deployment_section, ("deployment",)),
+    (_versioning_section, ("cold_start", "deployment", "runtime", "concurrency")),
+    (_deployment_preference_section, ("deployment", "observability", "error_handling", "concurrency")),
+    (_event_invoke_section, ("trigger_type", "max_event_age", "max_retry")),
+    (_events_section, EVENT_KEYS)
+]
+
+############################
+# Recursos del trigger
+############################
+def _trigger_resources(config):
+    """Crea el bucket, topic o cola del trigger cuando no se indica uno existente."""
+    trigger = config.get("trigger_type")
+    if trigger == "S3 Upload":
+        # SAM solo admite eventos S3 de buckets declarados en el mismo template
+        return {_resource_id(config, "Bucket"): {
+            "Type": "AWS::S3::Bucket", "Properties": {"BucketName": config["bucket_name"]}
+        }}
+    if trigger == "SNS" and not config.get("topic_arn"):
+        return {_resource_id(config, "Topic"): {"Type": "AWS::SNS::Topic"}}
+    if trigger == "SQS" and not config.get("queue_arn"):
+        return {_resource_id(config, "Queue"): {"Type": "AWS::SQS::Queue", "Properties": {
+            "VisibilityTimeout": config["timeout"] * SQS_VISIBILITY_FACTOR
+        }}}
+    return {}
+
+
+def _scaling_resources(config):
+    """Autoescalado de la provisioned concurrency del alias: target tracking y ventanas programadas."""
+    autoscaling = autoscaling_settings(config)
+    provisioned = (config.get("concurrency") or {}).get("provisioned", 0)
+    if not autoscaling or provisioned < 1:
+        return {}
+    # Cada ventana sube la capacidad al empezar y la devuelve a los valores base al terminar
+    actions = []
+    for index, window in enumerate(autoscaling["windows"], 1):
+        name = re.sub(r"[^A-Za-z0-9-]+", "-", window.get("name") or f"ventana-{index}").strip("-")
+        for suffix, schedule, minimum, maximum in (
+                ("inicio", window["start"], window["min"], window["max"]),
+                ("fin", window["end"], provisioned, autoscaling["max"])):
+            actions.append({
+                "ScheduledActionName": f"{name}-{suffix}",
+                "Schedule": schedule,
+                "Timezone": autoscaling["timezone"],
+                "ScalableTargetAction": {"MinCapacity": minimum, "MaxCapacity": maximum}
+            })
+
+    target = {
+        "MinCapacity": provisioned,
+        "MaxCapacity": autoscaling["max"],
+        "ResourceId": {"Fn::Sub": f"function:${{{FUNCTION_ID}}}:{ALIAS_NAME}"},
+        "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+        "ServiceNamespace": "lambda"
+    }
+    if actions:
+        target["ScheduledActions"] = actions
+    return {
+        "ProvisionedConcurrencyScalableTarget": {
+            "Type": "AWS::ApplicationAutoScaling::ScalableTarget",
+            # El alias lo crea SAM a partir de AutoPublishAlias
+            "DependsOn": f"{FUNCTION_ID}Alias{ALIAS_NAME}",
+            "Properties": target
+        },
+        "ProvisionedConcurrencyScalingPolicy": {
+            "Type": "AWS::ApplicationAutoScaling::ScalingPolicy",
+            "Properties": {
+                "PolicyName": "provisioned-concurrency-utilization",
+                "PolicyType": "TargetTrackingScaling",
+                "ScalingTargetId": {"Ref": "ProvisionedConcurrencyScalableTarget"},
+                "TargetTrackingScalingPolicyConfiguration": {
+                    "TargetValue": autoscaling["target_utilization"],
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"
+                    }
+                }
+            }
+        }
+    }
+
+
+# Recursos adicionales que acompañan a la función, en el orden del template
+RESOURCE_SECTIONS = [
+    (_trigger_resources, ("trigger_type", "resource_prefix", "bucket_name", "topic_arn", "queue_arn", "timeout")),
+    (_scaling_resources, ("concurrency",))
+]
+
+############################
+# Observabilidad
+############################
+def _metric_alarm(description, metric, threshold, statistic="Sum", namespace="AWS/Lambda", dimensions=None,
+                  evaluation_periods=1, operator="GreaterThanThreshold"):
+    # Los percentiles van en ExtendedStatistic; Sum/Maximum/Average en Statistic
+    statistic_key = "ExtendedStatistic" if statistic.startswith("p") else "Statistic"
+    properties = {
+        "AlarmDescription": description,
+        "Namespace": namespace,
+        "MetricName": metric,
+        statistic_key: statistic,
+        "Dimensions": dimensions or [{"Name": "FunctionName", "Value": {"Ref": FUNCTION_ID}}],
+        "Period": ALARM_PERIOD_SECONDS,
+        "EvaluationPeriods": evaluation_periods,
+        "Threshold": threshold,
+        "ComparisonOperator": operator,
+        "TreatMissingData": "notBreaching",
+        "AlarmActions": [{"Ref": "AlarmTopic"}]
+    }
+    return {"Type": "AWS::CloudWatch::Alarm", "Properties": properties}
+
+
+def _queue_name(config):
+    if config.get("queue_arn"):
+        return config["queue_arn"].rsplit(":", 1)[-1]
+    return {"Fn::GetAtt": [_resource_id(config, "Queue"), "QueueName"]}
+
+
+# Alarmas que revierten un despliegue gradual: errores y latencia de la nueva versión
+ROLLBACK_ALARMS = ("ErrorsAlarm", "DurationP99Alarm")
+
+
+def _alarm_ids(config):
+    """Ids lógicos de las alarmas que genera `_observability_resources` con esta configuración."""
+    observability = config.get("observability") or {}
+    alarm_ids = []
+    if observability.get("performance_alarms"):
+        alarm_ids += ["DurationP99Alarm", "ThrottlesAlarm", "ConcurrentExecutionsAlarm"]
+        if (config.get("concurrency") or {}).get("provisioned", 0) > 0:
+            alarm_ids.append("SpilloverAlarm")
+        if config.get("trigger_type") == "SQS":
+            alarm_ids.append("QueueAgeAlarm")
+    if (config.get("error_handling") or {}).get("create_alarm"):
+        alarm_ids.append("ErrorsAlarm")
+    return alarm_ids
+
+
+def _observability_resources(config):
+    """Log group con retención y alarmas de rendimiento y errores de la función."""
+    observability = config.get("observability") or {}
+    error_handling = config.get("error_handling") or {}
+    resources = {}
+    if observability.get("log_retention"):
+        resources["FunctionLogGroup"] = {"Type": "AWS::Logs::LogGroup", "Properties": {
+            "LogGroupName": {"Fn::Sub": f"/aws/lambda/${{{FUNCTION_ID}}}"},
+            "RetentionInDays": observability["log_retention"]
+        }}
+
+    alarms = {}
+    if observability.get("performance_alarms"):
+        p99_threshold = observability.get("p99_threshold_ms") or config["timeout"] * 1000 * DURATION_ALARM_RATIO
+        reserved = (config.get("concurrency") or {}).get("reserved", 0)
+        concurrency_limit = reserved or ACCOUNT_CONCURRENCY_LIMIT
+        alarms["DurationP99Alarm"] = _metric_alarm(
+            f"Duración p99 por encima de {p99_threshold:.0f} ms", "Duration", round(p99_threshold),
+            statistic="p99", evaluation_periods=3
+        )
+        alarms["ThrottlesAlarm"] = _metric_alarm("La función está siendo limitada (throttling)", "Throttles", 0)
+        alarms["ConcurrentExecutionsAlarm"] = _metric_alarm(
+            f"Concurrencia por encima del {CONCURRENCY_ALARM_RATIO:.0%} del límite ({concurrency_limit})",
+            "ConcurrentExecutions", int(concurrency_limit * CONCURRENCY_ALARM_RATIO),
+            statistic="Maximum", operator="GreaterThanOrEqualToThreshold"
+        )
+        if (config.get("concurrency") or {}).get("provisioned", 0) > 0:
+            # Invocaciones que no caben en la provisioned concurrency y sufren cold start
+            alarms["SpilloverAlarm"] = _metric_alarm(
+                "Invocaciones desbordadas de la provisioned concurrency (con cold start)",
+                "ProvisionedConcurrencySpilloverInvocations", 0,
+                dimensions=[{"Name": "FunctionName", "Value": {"Ref": FUNCTION_ID}},
+                            {"Name": "Resource", "Value": {"Fn::Sub": f"${{{FUNCTION_ID}}}:{ALIAS_NAME}"}}],
+                evaluation_periods=3
+            )
+        if config.get("trigger_type") == "SQS":
+            alarms["QueueAgeAlarm"] = _metric_alarm(
+                f"Mensajes esperando más de {QUEUE_AGE_ALARM_SECONDS} s en la cola",
+                "ApproximateAgeOfOldestMessage", QUEUE_AGE_ALARM_SECONDS, statistic="Maximum",
+                namespace="AWS/SQS", dimensions=[{"Name": "QueueName", "Value": _queue_name(config)}],
+                evaluation_periods=3
+            )
+    if error_handling.get("create_alarm"):
+        alarms["ErrorsAlarm"] = _metric_alarm("La función está devolviendo errores", "Errors", 0)
+
+    if alarms:
+        resources["AlarmTopic"] = {"Type": "AWS::SNS::Topic"}
+        resources.update(alarms)
+    return resources
+
+
+OBSERVABILITY_SECTIONS = [
+    (_observability_resources, ("observability", "error_handling", "concurrency", "trigger_type", "queue_arn",
+                                "resource_prefix", "timeout"))
+]
+
+############################
+# Renderizado
+############################
+@lru_cache(maxsize=512)
+def _render_section(builder, frozen_inputs, indent):
+    """Construye y serializa una sección; solo se ejecuta cuando cambian sus entradas."""
+    section = builder(json.loads(frozen_inputs))
+    return _indent(dump_yaml(section), indent) if section else ""
+
+
+def _section_text(builder, keys, config, indent):
+    inputs = {key: config[key] for key in keys if key in config}
+    return _render_section(builder, freeze_config(inputs), indent)
+
+
+@lru_cache(maxsize=64)
+def _render_template(frozen_config):
+    config = json.loads(frozen_config)
+    properties = "".join(_section_text(builder, keys, config, 6) for builder, keys in FUNCTION_SECTIONS)
+    resources = "".join(_section_text(builder, keys, config, 2)
+                        for builder, keys in RESOURCE_SECTIONS + OBSERVABILITY_SECTIONS)
+    return (
+        dump_yaml(TEMPLATE_HEADER)
+        + "Resources:\n"
+        + f"  {FUNCTION_ID}:\n"
+        + "    Type: AWS::Serverless::Function\n"
+        + "    Properties:\n"
+        + properties
+        + resources
+    )
+
+
+############################
+# Proyectos multi-función
+############################
+SHARED_LAYER_ID = "SharedDependenciesLayer"
+
+
+def function_logical_id(name):
+    """Convierte "procesar-pedidos" en "ProcesarPedidosFunction"."""
+    words = re.findall(r"[A-Za-z0-9]+", name)
+    return "".join(word[:1].upper() + word[1:] for word in words) + "Function"
+
+
+def _globals_code_section(config):
+    return {
+        "Runtime": config.get("runtime", DEFAULT_RUNTIME),
+        "Architectures": [config.get("architecture", DEFAULT_ARCHITECTURE)]
+    }
+
+
+def _globals_layer_section(config):
+    return {"Layers": [{"Ref": SHARED_LAYER_ID}]} if config.get("layer_requirements") else {}
+
+
+# Lo que comparten todas las funciones del proyecto va a la sección Globals
+GLOBALS_SECTIONS = [
+    (_globals_code_section, ("runtime", "architecture")),
+    (_sizing_section, ("memory", "timeout")),
+    (_environment_section, ("env_vars", "observability")),
+    (_vpc_section, ("vpc",)),
+    (_tracing_section, ("observability",)),
+    (_globals_layer_section, ("layer_requirements",))
+]
+
+
+def _project_function_code_section(config):
+    return {"CodeUri": f"functions/{config['name']}/", "Handler": f"handler.{config['handler_name']}"}
+
+
+PROJECT_FUNCTION_SECTIONS = [
+    (_project_function_code_section, ("name", "handler_name")),
+    (_event_invoke_section, ("trigger_type", "max_event_age", "max_retry")),
+    (_events_section, EVENT_KEYS)
+]
+# Las funciones de un proyecto no publican alias ni tienen concurrencia propia, así que de
+# RESOURCE_SECTIONS solo llevan los recursos del trigger (el autoescalado apunta al alias de MyFunction)
+PROJECT_RESOURCE_SECTIONS = [section for section in RESOURCE_SECTIONS if section[0] is _trigger_resources]
+
+
+def _shared_layer(config):
+    if not config.get("layer_requirements"):
+        return {}
+    runtime = config.get("runtime", DEFAULT_RUNTIME)
+    architecture = config.get("architecture", DEFAULT_ARCHITECTURE)
+    return {SHARED_LAYER_ID: {
+        "Type": "AWS::Serverless::LayerVersion",
+        "Properties": {
+            "LayerName": f"{config['project_name']}-dependencias",
+            "Description": "Dependencias compartidas por las funciones del proyecto",
+            "ContentUri": "layers/shared/",
+            "CompatibleRuntimes": [runtime],
+            "CompatibleArchitectures": [architecture],
+            "RetentionPolicy": "Delete"
+        },
+        # sam build instala el requirements.txt de ContentUri para el runtime y la arquitectura
+        "Metadata": {"BuildMethod": runtime, "BuildArchitecture": architecture}
+    }}
+
+
+@lru_cache(maxsize=64)
+def _render_project(frozen_project):
+    project = json.loads(frozen_project)
+    shared = dict(project["globals"], project_name=project["name"], layer_requirements=project["layer_requirements"])
+    globals_text = "".join(_section_text(builder, keys, shared, 4) for builder, keys in GLOBALS_SECTIONS)
+
+    resources = []
+    for function in project["functions"]:
+        logical_id = function_logical_id(function["name"])
+        # Los recursos del trigger necesitan el timeout global (visibility timeout de SQS)
+        config = dict(function, handler_name="lambda_handler", timeout=shared["timeout"],
+                      resource_prefix=logical_id.removesuffix("Function"))
+        resources.append(
+            f"  {logical_id}:\n"
+            + "    Type: AWS::Serverless::Function\n"
+            + "    Properties:\n"
+            + "".join(_section_text(builder, keys, config, 6) for builder, keys in PROJECT_FUNCTION_SECTIONS)
+            + "".join(_section_text(builder, keys, config, 2) for builder, keys in PROJECT_RESOURCE_SECTIONS)
+        )
+    resources.append(_render_section(_shared_layer, freeze_config(shared), 2))
+
+    header = dict(TEMPLATE_HEADER, Description=f"Proyecto {project['name']} generado con AWS Lambda Generator Pro")
+    return dump_yaml(header) + "Globals:\n  Function:\n" + globals_text + "Resources:\n" + "".join(resources)
+
+
+def generate_project_template(project):
+    """Genera el template SAM de un proyecto con varias funciones.
+
+    `project` contiene `name`, `globals` (configuración compartida: memoria,
+    timeout, runtime, arquitectura, variables...), `functions` (nombre, trigger
+    y su configuración) y `layer_requirements` (dependencias de la capa compartida).
+    La concurrencia (reservada, provisionada y su autoescalado) solo se admite en
+    las funciones individuales.
+    """
+    with_concurrency = [function["name"] for function in project["functions"] if function.get("concurrency")]
+    if with_concurrency:
+        raise ValueError(f"La concurrencia no se admite en las funciones de un proyecto: {', '.join(with_concurrency)}")
+    return _render_project(freeze_config(project))
+
+
+def generate_sam_template(config):
+    """Genera el template SAM incluyendo la configuración avanzada."""
+    return _render_template(freeze_config(config))
+
+
+def cache_info():
+    """Aciertos y fallos de las cachés de template completo y de secciones."""
+    return {"templates": _render_template.cache_info(), "sections": _render_section.cache_info()}
@@ -0,0 +1,284 @@
+"""Caché semántica de generaciones: reutiliza el código generado para descripciones casi iguales.
+
+La caché exacta (`cache.py`) solo acierta si el prompt es idéntico; aquí se
+guardan los embeddings de las descripciones en un índice NumPy (.npz) y se
+devuelve la generación anterior cuya descripción supera un umbral de similitud
+coseno. Solo se comparan descripciones con el mismo "ámbito" (el resto del
+prompt: trigger, cold start, observabilidad...), de modo que nunca se sirve
+código generado para otra configuración. El contenido sigue guardado en la
+caché de respuestas: el índice solo almacena los vectores y la clave.
+
+Los embeddings se calculan con sentence-transformers si está instalado y el
+modelo está disponible en local; si no, con un vector de n-gramas de
+caracteres por hashing, que no necesita descargar nada. Ninguno de los dos
+distingue bien "CSV a JSON" de "JSON a CSV" o "200px" de "800px", así que
+además del umbral se exige que las dos descripciones tengan los mismos números
+y formatos de datos, en el mismo orden (el origen y el destino de una conversión).
+"""
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+from lambda_tools.cache import DEFAULT_MAX_ENTRIES as RESPONSE_CACHE_ENTRIES, get_response_cache
+
+DEFAULT_INDEX_PATH = os.getenv(
+    "LAMBDA_TOOLS_SEMANTIC_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws-lambda-tools", "semantic_index.npz")
+)
+# Más entradas que la caché de respuestas solo acumularía claves ya desalojadas
+DEFAULT_MAX_ENTRIES = int(os.getenv("LAMBDA_TOOLS_SEMANTIC_MAX_ENTRIES", str(RESPONSE_CACHE_ENTRIES)))
+EMBEDDING_MODEL = os.getenv("LAMBDA_TOOLS_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+HASHING_DIMENSIONS = 1024
+NGRAM_SIZE = 3
+# Palabras que no cambian lo que se pide ("CSV a JSON" / "csv en JSON")
+STOPWORDS = frozenset(
+    "a al con de del e el en la las lo los o para por que se su sus u un una unos unas y "
+    "an and for from in into of the to with".split()
+)
+# Formatos cuyo orden en la descripción decide el sentido de la conversión
+DATA_FORMATS = frozenset(
+    "avro bmp csv gif gz gzip html jpeg jpg json jsonl md orc parquet pdf png svg tar tsv txt webp xls xlsx "
+    "xml yaml yml zip".split()
+)
+
+############################
+# Embeddings
+############################
+def normalize_text(text):
+    """Minúsculas, sin tildes ni signos de puntuación y con los espacios colapsados."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def content_tokens(text):
+    """Palabras de la descripción normalizada, en orden y sin palabras vacías."""
+    return [token for token in normalize_text(text).split() if token not in STOPWORDS]
+
+
+def meaning_tokens(text):
+    """Números y formatos de datos de la descripción, en orden: lo que ningún embedder distingue bien."""
+    tokens = []
+    for token in normalize_text(text).split():
+        if token in DATA_FORMATS:
+            tokens.append(token)
+        tokens.extend(re.findall(r"\d+", token))
+    return tokens
+
+
+def compatible(first, second):
+    """Dos descripciones solo pueden compartir generación si piden los mismos números y formatos en el mismo orden."""
+    return meaning_tokens(first) == meaning_tokens(second)
+
+
+class HashingEmbedder:
+    """Bolsa de palabras y n-gramas de caracteres proyectada por hashing (sin modelo).
+
+    Se ignoran las palabras vacías y los n-gramas se toman palabra a palabra, de
+    modo que "archivos CSV a JSON" y "ficheros CSV en formato JSON" se parecen
+    más que dos descripciones con distinto verbo.
+    """
+
+    # Calibrado con reformulaciones ("Convierte archivos CSV a JSON" / "Convertir los ficheros CSV a JSON")
+    threshold = 0.75
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS, ngram=NGRAM_SIZE):
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.name = f"hashing-words-{ngram}gram-{dimensions}"
+
+    def _features(self, text):
+        tokens = content_tokens(text)
+        yield from tokens
+        for token in tokens:
+            padded = f" {token} "
+            for start in range(len(padded) - self.ngram + 1):
+                yield padded[start:start + self.ngram]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 es estable entre procesos (hash() no), así que el índice persistido sigue siendo válido
+                vectors[row, zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings de un modelo de sentence-transformers ya descargado."""
+
+    threshold = 0.9
+
+    def __init__(self, model_name=EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        # Solo el modelo ya descargado: sin él falla y se usa el embedder por hashing
+        self.model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def default_embedder():
+    """sentence-transformers si está disponible; si no, el embedder por hashing."""
+    try:
+        return SentenceTransformerEmbedder()
+    except Exception:
+        # Sin la librería o sin el modelo en local (no se descarga nada en segundo plano)
+        return HashingEmbedder()
+
+############################
+# Índice
+############################
+def generation_scope(context):
+    """Ámbito de una generación: hash de todo lo que no es la descripción."""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """Índice de embeddings de descripciones persistido en un .npz."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, embedder=None, threshold=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 response_cache=None):
+        self.path = path
+        self.embedder = embedder or default_embedder()
+        self.threshold = threshold if threshold is not None else self.embedder.threshold
+        self.max_entries = max_entries
+        self.response_cache = response_cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _empty(self):
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.scopes = np.array([], dtype=str)
+        self.keys = np.array([], dtype=str)
+        self.descriptions = np.array([], dtype=str)
+
+    def _load(self):
+        self._empty()
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                # Un índice creado con otro embedder no es comparable: se empieza de cero
+                if str(data["embedder"]) != self.embedder.name:
+                    return
+                self.vectors = data["vectors"].astype(np.float32)
+                self.scopes, self.keys, self.descriptions = data["scopes"], data["keys"], data["descriptions"]
+        except (OSError, ValueError, KeyError):
+            self._empty()
+
+    def _save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp.npz"
+        # Los vectores se guardan en float16: la mitad de espacio sin pérdida apreciable de similitud
+        np.savez(
+            temporary,
+            embedder=np.array(self.embedder.name),
+            vectors=self.vectors.astype(np.float16),
+            scopes=self.scopes,
+            keys=self.keys,
+            descriptions=self.descriptions
+        )
+        os.replace(temporary, self.path)
+
+    def _keep(self, mask):
+        self.vectors = self.vectors[mask]
+        self.scopes, self.keys, self.descriptions = self.scopes[mask], self.keys[mask], self.descriptions[mask]
+
+    def lookup(self, description, scope):
+        """Generación más parecida del mismo ámbito por encima del umbral, o None.
+
+        Devuelve {description, similarity, key, content}. Las entradas cuya
+        respuesta ya no está en la caché de respuestas se eliminan del índice.
+        """
+        response_cache = self.response_cache or get_response_cache()
+        query = self.embedder.embed([description])[0]
+        match = None
+        with self._lock:
+            stale = np.zeros(len(self.keys), dtype=bool)
+            candidates = np.flatnonzero(self.scopes == scope)
+            similarities = self.vectors[candidates] @ query if len(candidates) else np.array([])
+            for order in np.argsort(-similarities):
+                if similarities[order] < self.threshold:
+                    break
+                index = candidates[order]
+                if not compatible(description, str(self.descriptions[index])):
+                    continue
+                content = response_cache.get(str(self.keys[index]))
+                if content is None:
+                    stale[index] = True
+                    continue
+                match = {
+                    "description": str(self.descriptions[index]),
+                    "similarity": round(float(similarities[order]), 3),
+                    "key": str(self.keys[index]),
+                    "content": content
+                }
+                break
+            if stale.any():
+                self._keep(~stale)
+                self._save()
+            if match:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return match
+
+    def add(self, description, scope, key):
+        """Añade (o sustituye) la generación de una descripción y persiste el índice."""
+        vector = self.embedder.embed([description])
+        with self._lock:
+            self._keep((self.keys != key) & ~((self.scopes == scope) & (self.descriptions == description)))
+            self.vectors = np.vstack([self.vectors.reshape(-1, vector.shape[1]), vector])
+            self.scopes = np.append(self.scopes, scope)
+            self.keys = np.append(self.keys, key)
+            self.descriptions = np.append(self.descriptions, description)
+            if len(self.keys) > self.max_entries:
+                # Se descartan las más antiguas
+                self._keep(np.arange(len(self.keys)) >= len(self.keys) - self.max_entries)
+            self._save()
+
+    def clear(self):
+        """Vacía el índice y reinicia los contadores."""
+        with self._lock:
+            self._empty()
+            self.hits = 0
+            self.misses = 0
+            if self.path is not None and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self):
+        """Aciertos, fallos, entradas y embedder en uso."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.keys),
+                "embedder": self.embedder.name,
+                "threshold": self.threshold
+            }
+
+
+_semantic_cache = None
+_semantic_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Devuelve la caché semántica del proceso, creándola la primera vez."""
+    global _semantic_cache
+    with _semantic_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache()
+        return _semantic_cache
@@ -0,0 +1,463 @@
+"""Plantillas revisadas de handlers por trigger: el modelo solo escribe la lógica de negocio.
+
+Cada plantilla resuelve lo que se repite en todas las funciones de un trigger
+y es fácil hacer mal: informe de fallos parciales en los lotes de SQS, lectura
+en streaming de objetos de S3 con `iter_chunks`, reparto del trabajo de E/S
+por registro en un pool de hilos y respuestas de API Gateway con los clientes
+creados a nivel de módulo. Al modelo se le pide solo la función de negocio
+(ver `build_skeleton_prompt`) y `fill_skeleton` la monta en la plantilla,
+subiendo sus imports junto a los de la plantilla.
+"""
+import ast
+import string
+
+from lambda_tools.sam import sqs_settings
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Con `whole_object`, parte de la memoria de la función que pueden ocupar a la vez los objetos
+# leídos enteros (el resto queda para las copias que hace el procesamiento: imagen decodificada...)
+WHOLE_OBJECT_MEMORY_SHARE = 0.25
+BUSINESS_LOGIC_START = "# --- lógica de negocio ---"
+BUSINESS_LOGIC_END = "# --- fin de la lógica de negocio ---"
+
+############################
+# Plantillas
+############################
+SQS_BATCH = '''"""Handler de SQS generado por AWS Lambda Tools (plantilla `sqs_batch`)."""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+${observability_imports}
+${logic_imports}
+
+${observability_setup}
+
+# Los mensajes del lote se procesan en paralelo: el trabajo por mensaje suele esperar a E/S
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "${max_workers}"))
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS) if MAX_WORKERS > 1 else None
+
+${business_logic}
+
+
+def _process(record):
+    """Procesa un mensaje y devuelve su messageId si falla."""
+    try:
+        payload = json.loads(record["body"])
+    except ValueError:
+        payload = record["body"]
+    try:
+        process_record(payload, record)
+    except Exception:
+        logger.exception("Error procesando el mensaje %s", record["messageId"])
+        return record["messageId"]
+    return None
+
+
+${handler_decorators}def ${handler_name}(event, context):
+    records = event.get("Records", [])
+    if _executor is None or len(records) < 2:
+        results = [_process(record) for record in records]
+    else:
+        results = list(_executor.map(_process, records))
+    failed = [message_id for message_id in results if message_id]
+    logger.info("Lote procesado: %d mensajes, %d fallidos", len(records), len(failed))${metrics}
+${failure_return}
+'''
+
+# Con ReportBatchItemFailures solo se reintentan los mensajes fallidos;
+# sin él, cualquier fallo tiene que devolver el lote completo a la cola
+REPORT_FAILURES_RETURN = '''    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed]}'''
+
+RAISE_FAILURES_RETURN = '''    if failed:
+        raise RuntimeError(f"{len(failed)} mensajes fallidos: se reintentará el lote completo")
+    return {"processed": len(records)}'''
+
+S3_STREAM = '''"""Handler de S3 generado por AWS Lambda Tools (plantilla `s3_stream`)."""
+import codecs
+import os
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+${observability_imports}
+${logic_imports}
+
+${observability_setup}
+
+s3 = boto3.client("s3")
+
+# Bytes por bloque de `iter_chunks` / `iter_lines`: la memoria no depende del tamaño del fichero
+CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", "${chunk_size}"))
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "${max_workers}"))${object_limit}
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS) if MAX_WORKERS > 1 else None
+
+${business_logic}
+
+
+def iter_lines(body, chunk_size=CHUNK_SIZE):
+    """Líneas de texto de un StreamingBody, leídas con `iter_chunks` (sin el salto de línea)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    for chunk in body.iter_chunks(chunk_size):
+        pending += decoder.decode(chunk)
+        lines = pending.split("\\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\\r")
+
+
+def _process(record):
+    bucket = record["s3"]["bucket"]["name"]
+    key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
+${read_object}
+    return key
+
+
+${handler_decorators}def ${handler_name}(event, context):
+    records = event.get("Records", [])
+    if _executor is None or len(records) < 2:
+        keys = [_process(record) for record in records]
+    else:
+        keys = list(_executor.map(_process, records))
+    logger.info("Objetos procesados: %s", keys)${metrics}
+    return {"processed": len(keys)}
+'''
+
+STREAM_READ = '''    body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    try:
+        process_object(body, bucket, key)
+    finally:
+        body.close()'''
+
+# Lectura del objeto entero (opcional): acotada por la memoria, falla en vez de agotarla
+WHOLE_OBJECT_LIMIT = '''
+# Objetos leídos enteros: límite por objeto según la memoria de la función y los hilos
+MAX_OBJECT_BYTES = int(os.environ.get("MAX_OBJECT_MB", "{max_object_mb}")) * 1024 * 1024'''
+
+WHOLE_OBJECT_READ = '''    body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    try:
+        data = body.read(MAX_OBJECT_BYTES + 1)
+    finally:
+        body.close()
+    if len(data) > MAX_OBJECT_BYTES:
+        raise ValueError(f"{key} supera {MAX_OBJECT_BYTES} bytes: no se puede leer entero con esta memoria")
+    process_object(data, bucket, key)'''
+
+FANOUT = '''"""Handler generado por AWS Lambda Tools (plantilla `fanout`)."""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+${observability_imports}
+${logic_imports}
+
+${observability_setup}
+
+# Cada elemento se procesa en un hilo: el trabajo por elemento suele esperar a E/S
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "${max_workers}"))
+_executor = ThreadPoolExecutor(max_workers=max(MAX_WORKERS, 1))
+
+${business_logic}
+
+
+${payloads}
+
+
+def _process(item):
+    """Procesa un elemento y devuelve la excepción si falla."""
+    try:
+        process_item(item)
+    except Exception as exc:
+        logger.exception("Error procesando el elemento %r", item)
+        return exc
+    return None
+
+
+${handler_decorators}def ${handler_name}(event, context):
+    items = [item for payload in _payloads(event) for item in list_items(payload)]
+    failed = [error for error in _executor.map(_process, items) if error is not None]
+    logger.info("Elementos procesados: %d, %d fallidos", len(items), len(failed))${metrics}
+    if failed:
+        # La invocación es asíncrona: al fallar, Lambda la reintenta
+        raise RuntimeError(f"{len(failed)} de {len(items)} elementos fallidos")
+    return {"processed": len(items)}
+'''
+
+SNS_PAYLOADS = '''def _payloads(event):
+    """Mensaje de cada registro de SNS, decodificado si es JSON."""
+    for record in event.get("Records", []):
+        message = record["Sns"]["Message"]
+        try:
+            yield json.loads(message)
+        except ValueError:
+            yield message'''
+
+SCHEDULED_PAYLOADS = '''def _payloads(event):
+    """El evento programado de EventBridge (uno por invocación)."""
+    yield event'''
+
+API_GATEWAY = '''"""Handler de API Gateway generado por AWS Lambda Tools (plantilla `api_gateway`)."""
+import base64
+import json
+import os
+${observability_imports}
+${logic_imports}
+
+${observability_setup}
+
+CORS_ORIGIN = os.environ.get("CORS_ORIGIN", "*")
+
+
+class HttpError(Exception):
+    """Error con código HTTP: se devuelve al cliente con ese código y el mensaje."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+${business_logic}
+
+
+def _response(status, payload):
+    return {
+        "statusCode": status,
+        "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": CORS_ORIGIN},
+        "body": json.dumps(payload, default=str)
+    }
+
+
+def _parse_body(event):
+    body = event.get("body")
+    if not body:
+        return None
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    return json.loads(body)
+
+
+${handler_decorators}def ${handler_name}(event, context):
+    try:
+        request = {
+            "method": event.get("httpMethod"),
+            "path": event.get("path"),
+            "body": _parse_body(event),
+            "query": event.get("queryStringParameters") or {},
+            "path_params": event.get("pathParameters") or {},
+            "headers": event.get("headers") or {}
+        }
+    except ValueError:
+        return _response(400, {"error": "El cuerpo de la petición no es JSON válido"})
+    try:
+        status, payload = handle_request(request)
+    except HttpError as exc:
+        return _response(exc.status, {"error": str(exc)})
+    except Exception:
+        logger.exception("Error procesando %s %s", request["method"], request["path"])
+        return _response(500, {"error": "Error interno"})
+    return _response(status, payload)
+'''
+
+SKELETONS = {
+    "sqs_batch": {
+        "label": "📬 Lote SQS con fallos parciales",
+        "triggers": ("SQS",),
+        "source": SQS_BATCH,
+        "responsibilities": "recorrer el lote, decodificar el cuerpo JSON, procesar los mensajes en paralelo "
+                            "en un pool de hilos y devolver a la cola solo los que fallan",
+        "signature": "def process_record(payload, record):",
+        "contract": "Procesa UN mensaje. `payload` es el cuerpo ya decodificado de JSON (o el texto si no es "
+                    "JSON) y `record` el registro de SQS completo (messageId, attributes, messageAttributes). "
+                    "No devuelve nada: lanza una excepción si el mensaje no se puede procesar. Se ejecuta a la "
+                    "vez en varios hilos, así que no modifiques estado global sin protegerlo y haz que sea "
+                    "idempotente (un mensaje puede llegar más de una vez).",
+        "metrics": (("ProcessedMessages", "len(records)"), ("FailedMessages", "len(failed)"))
+    },
+    "s3_stream": {
+        "label": "📁 Lectura en streaming de S3",
+        "triggers": ("S3 Upload",),
+        "source": S3_STREAM,
+        "responsibilities": "decodificar la clave del objeto, abrirlo como stream, cerrarlo al terminar y "
+                            "procesar varios objetos del evento en paralelo",
+        "signature": "def process_object(body, bucket, key):",
+        "contract": "Procesa UN objeto. `body` es el StreamingBody de get_object, que se lee una sola vez y "
+                    "la plantilla cierra al terminar. Para texto usa el helper `iter_lines(body)`, que lo lee "
+                    "por bloques y devuelve las líneas sin el salto de línea (para CSV, "
+                    "csv.reader(iter_lines(body))). Para binarios recorre `body.iter_chunks(CHUNK_SIZE)` (por "
+                    "ejemplo, para calcular un hash o subir el objeto por partes). No llames a `body.read()` "
+                    "ni leas el objeto de nuevo: la memoria no debe depender del tamaño del fichero. "
+                    "`bucket` y `key` identifican el objeto; el cliente `s3` ya existe. No devuelve nada: "
+                    "lanza una excepción si el objeto no se puede procesar.",
+        "whole_object": {
+            "signature": "def process_object(data, bucket, key):",
+            "contract": "Procesa UN objeto. `data` son los bytes del objeto completo, ya leído por la "
+                        "plantilla con un límite de tamaño según la memoria de la función: úsalo con "
+                        "io.BytesIO(data) en las librerías que necesitan el fichero entero (una imagen con "
+                        "Pillow, un zip con zipfile). No leas el objeto de nuevo. `bucket` y `key` identifican "
+                        "el objeto; el cliente `s3` ya existe. No devuelve nada: lanza una excepción si el "
+                        "objeto no se puede procesar."
+        },
+        "metrics": (("ProcessedObjects", "len(keys)"),)
+    },
+    "fanout": {
+        "label": "🧵 Reparto del trabajo en hilos",
+        "triggers": ("SNS", "Scheduled Event"),
+        "source": FANOUT,
+        "responsibilities": "leer el evento, repartir los elementos de trabajo en un pool de hilos, registrar "
+                            "los fallos y hacer fallar la invocación para que Lambda la reintente",
+        "signature": "def list_items(payload):\ndef process_item(item):",
+        "contract": "`list_items` recibe {payload} y devuelve la lista de elementos de trabajo independientes. "
+                    "`process_item` procesa UN elemento (una llamada a una API, una escritura...) y lanza una "
+                    "excepción si falla. Los elementos se procesan a la vez en varios hilos: no modifiques "
+                    "estado global sin protegerlo y haz que sea idempotente (un reintento vuelve a procesar "
+                    "todos los elementos).",
+        "metrics": (("ProcessedItems", "len(items)"), ("FailedItems", "len(failed)"))
+    },
+    "api_gateway": {
+        "label": "🌐 Endpoint de API Gateway",
+        "triggers": ("API Gateway",),
+        "source": API_GATEWAY,
+        "responsibilities": "decodificar la petición, devolver las respuestas JSON con sus cabeceras y convertir "
+                            "los errores en respuestas 4xx/5xx",
+        "signature": "def handle_request(request):",
+        "contract": "`request` es un diccionario con method, path, body (JSON ya decodificado o None), query, "
+                    "path_params y headers. Devuelve una tupla (código_http, datos) con datos serializables a "
+                    "JSON. Para los errores del cliente lanza HttpError(400, \"mensaje\") (la clase ya existe); "
+                    "cualquier otra excepción se convierte en un 500.",
+        "metrics": ()
+    }
+}
+
+FANOUT_PAYLOADS = {
+    "SNS": (SNS_PAYLOADS, "el mensaje de SNS (decodificado de JSON si lo es)"),
+    "Scheduled Event": (SCHEDULED_PAYLOADS, "el evento programado de EventBridge (time, resources, detail)")
+}
+
+############################
+# Selección
+############################
+def skeletons_for(trigger):
+    """Nombres de las plantillas disponibles para un trigger."""
+    return [name for name, skeleton in SKELETONS.items() if trigger in skeleton["triggers"]]
+
+
+def skeleton_settings(config):
+    """Plantilla elegida en la configuración con sus parámetros por defecto, o None.
+
+    `config["skeleton"]` es {name, max_workers, chunk_size, whole_object}; en SQS
+    los hilos no pasan del tamaño del lote. Con `whole_object` (solo `s3_stream`)
+    la plantilla lee cada objeto entero, hasta `max_object_mb`: la parte de la
+    memoria de la función que le corresponde a cada hilo.
+    """
+    settings = config.get("skeleton")
+    if not settings or settings.get("name") not in SKELETONS:
+        return None
+    if config.get("trigger_type") not in SKELETONS[settings["name"]]["triggers"]:
+        return None
+    max_workers = DEFAULT_MAX_WORKERS
+    if settings["name"] == "sqs_batch":
+        max_workers = min(max_workers, sqs_settings(config)["batch_size"])
+    settings = dict({"max_workers": max_workers, "chunk_size": DEFAULT_CHUNK_SIZE, "whole_object": False}, **settings)
+    settings["whole_object"] = settings["name"] == "s3_stream" and bool(settings["whole_object"])
+    if settings["whole_object"]:
+        memory = config.get("memory", 128)
+        settings["max_object_mb"] = max(1, int(memory * WHOLE_OBJECT_MEMORY_SHARE / settings["max_workers"]))
+    return settings
+
+
+def skeleton_contract(config):
+    """Responsabilidades de la plantilla, firma y contrato de la función que escribe el modelo."""
+    settings = skeleton_settings(config)
+    skeleton = SKELETONS[settings["name"]]
+    signature, contract = skeleton["signature"], skeleton["contract"]
+    if settings["name"] == "fanout":
+        contract = contract.format(payload=FANOUT_PAYLOADS[config["trigger_type"]][1])
+    if settings["whole_object"]:
+        signature, contract = skeleton["whole_object"]["signature"], skeleton["whole_object"]["contract"]
+    return {
+        "responsibilities": skeleton["responsibilities"],
+        "signature": signature,
+        "contract": contract
+    }
+
+############################
+# Montaje
+############################
+def _observability(config, metrics):
+    """Imports, init y decoradores de logging: Powertools si está activado, logging si no."""
+    if (config.get("observability") or {}).get("powertools"):
+        imports = "from aws_lambda_powertools import Logger, Metrics, Tracer"
+        if metrics:
+            imports += "\nfrom aws_lambda_powertools.metrics import MetricUnit"
+        metric_lines = "".join(f"\n    metrics.add_metric(name=\"{name}\", unit=MetricUnit.Count, value={value})"
+                               for name, value in metrics)
+        return {
+            "observability_imports": imports,
+            "observability_setup": "logger = Logger()\ntracer = Tracer()\nmetrics = Metrics()",
+            "handler_decorators": "@logger.inject_lambda_context\n@tracer.capture_lambda_handler\n"
+                                  "@metrics.log_metrics(capture_cold_start_metric=True)\n",
+            "metrics": metric_lines
+        }
+    return {
+        "observability_imports": "import logging",
+        "observability_setup": "logger = logging.getLogger()\nlogger.setLevel(os.environ.get(\"LOG_LEVEL\", \"INFO\"))",
+        "handler_decorators": "",
+        "metrics": ""
+    }
+
+
+def split_imports(code):
+    """Separa los imports de nivel superior del resto del código: (imports, resto).
+
+    Si el código no compila se devuelve tal cual; la validación se encarga del error.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return [], code.strip()
+    lines = code.splitlines()
+    imports, rows = [], set()
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append("\n".join(lines[node.lineno - 1:node.end_lineno]))
+            rows.update(range(node.lineno, node.end_lineno + 1))
+    rest = "\n".join(line for number, line in enumerate(lines, 1) if number not in rows)
+    return imports, rest.strip()
+
+
+def fill_skeleton(config, business_logic):
+    """Monta la lógica de negocio generada en la plantilla elegida y devuelve el handler completo."""
+    settings = skeleton_settings(config)
+    skeleton = SKELETONS[settings["name"]]
+    values = _observability(config, skeleton["metrics"])
+
+    imports, code = split_imports(business_logic)
+    existing = set(skeleton["source"].splitlines()) | set(values["observability_imports"].splitlines())
+    logic_imports = [line for line in dict.fromkeys(imports) if line not in existing]
+
+    if settings["name"] == "sqs_batch":
+        report_failures = sqs_settings(config)["report_failures"]
+        values["failure_return"] = REPORT_FAILURES_RETURN if report_failures else RAISE_FAILURES_RETURN
+    if settings["name"] == "fanout":
+        values["payloads"] = FANOUT_PAYLOADS[config["trigger_type"]][0]
+    if settings["name"] == "s3_stream":
+        whole_object = settings["whole_object"]
+        values["object_limit"] = WHOLE_OBJECT_LIMIT.format(max_object_mb=settings.get("max_object_mb")) \
+            if whole_object else ""
+        values["read_object"] = WHOLE_OBJECT_READ if whole_object else STREAM_READ
+
+    source = string.Template(skeleton["source"]).substitute(
+        values,
+        logic_imports="\n".join(logic_imports),
+        business_logic=f"{BUSINESS_LOGIC_START}\n{code}\n{BUSINESS_LOGIC_END}",
+        handler_name=config.get("handler_name", "lambda_handler"),
+        max_workers=settings["max_workers"],
+        chunk_size=settings["chunk_size"]
+    )
+    # Sin imports de la lógica ni de observabilidad quedan líneas vacías de más
+    while "\n\n\n\n" in source:
+        source = source.replace("\n\n\n\n", "\n\n\n")
+    return source
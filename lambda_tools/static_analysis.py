@@ -0,0 +1,362 @@
+"""Análisis estático de anti-patrones de rendimiento en handlers Lambda.
+
+Recorre el AST del handler (sin ejecutarlo) y detecta en milisegundos los
+problemas que no necesitan un LLM para decidirse: clientes y conexiones creados
+en cada invocación, imports pesados, lecturas completas de objetos S3, bucles
+síncronos sobre los registros de SQS y llamadas HTTP sin reutilizar conexiones.
+También verifica que un handler sigue la estructura optimizada para el cold start
+(y para SnapStart) que pide el modo de optimización del generador.
+"""
+import ast
+from dataclasses import dataclass
+
+AWS_CLIENT_FACTORIES = {
+    "boto3.client", "boto3.resource", "boto3.Session", "boto3.session.Session",
+    "aioboto3.Session", "botocore.session.get_session"
+}
+DB_CONNECTION_FACTORIES = {
+    "psycopg2.connect", "psycopg.connect", "pymysql.connect", "mysql.connector.connect",
+    "pg8000.connect", "oracledb.connect", "cx_Oracle.connect", "pyodbc.connect",
+    "redis.Redis", "redis.StrictRedis", "redis.from_url", "pymongo.MongoClient",
+    "sqlalchemy.create_engine", "elasticsearch.Elasticsearch", "opensearchpy.OpenSearch"
+}
+HTTP_ONE_SHOT_CALLS = {
+    "requests.get", "requests.post", "requests.put", "requests.patch", "requests.delete",
+    "requests.head", "requests.request", "httpx.get", "httpx.post", "httpx.put",
+    "httpx.patch", "httpx.delete", "httpx.request", "urllib.request.urlopen"
+}
+HTTP_POOL_FACTORIES = {
+    "requests.Session", "requests.session", "httpx.Client", "httpx.AsyncClient",
+    "urllib3.PoolManager", "http.client.HTTPConnection", "http.client.HTTPSConnection",
+    "aiohttp.ClientSession"
+}
+HEAVY_MODULES = {
+    "pandas", "numpy", "scipy", "sklearn", "tensorflow", "torch", "matplotlib", "seaborn",
+    "plotly", "spacy", "transformers", "nltk", "cv2", "pyarrow", "openpyxl", "xgboost",
+    "lightgbm", "langchain", "statsmodels", "sympy"
+}
+BATCH_ALTERNATIVES = {
+    "send_message": "send_message_batch",
+    "delete_message": "delete_message_batch",
+    "change_message_visibility": "change_message_visibility_batch",
+    "put_item": "batch_writer() / batch_write_item",
+    "get_item": "batch_get_item",
+    "delete_item": "batch_writer() / batch_write_item",
+    "put_record": "put_records",
+    "publish": "publish_batch",
+    "put_metric_data": "put_metric_data con varias métricas por llamada"
+}
+CACHE_DECORATORS = {"lru_cache", "cache", "cached_property"}
+# Valores que deben ser únicos por invocación o por contenedor: con SnapStart, si se
+# calculan en el init se repiten en todos los entornos restaurados del snapshot
+UNIQUE_VALUE_CALLS = {
+    "uuid.uuid1", "uuid.uuid4", "random.random", "random.randint", "random.choice", "random.seed",
+    "os.urandom", "secrets.token_hex", "secrets.token_bytes", "secrets.token_urlsafe",
+    "time.time", "datetime.datetime.now", "datetime.datetime.utcnow", "datetime.date.today"
+}
+AFTER_RESTORE_HOOK = "register_after_restore"
+# Reglas de `analyze_handler` que también forman parte de la estructura optimizada para el init
+STRUCTURE_RULES = {"LP000", "LP001", "LP002", "LP003", "LP006"}
+
+SEVERITY_ICONS = {"alta": "🔴", "media": "🟠", "baja": "🟡"}
+
+
+@dataclass
+class Finding:
+    """Hallazgo del análisis estático."""
+    rule: str
+    severity: str
+    line: int
+    message: str
+    suggestion: str
+
+
+def _dotted_name(node):
+    """Convierte `a.b.c` en la cadena "a.b.c" (o None si no es un nombre simple)."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return None
+
+
+def _is_records_iter(node):
+    """Detecta `event["Records"]` y `event.get("Records")`."""
+    if isinstance(node, ast.Subscript):
+        key = node.slice
+        return isinstance(key, ast.Constant) and key.value == "Records"
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get":
+        return bool(node.args) and isinstance(node.args[0], ast.Constant) and node.args[0].value == "Records"
+    return False
+
+
+def _is_body_access(node):
+    """Detecta `respuesta["Body"]` y `respuesta.get("Body")`."""
+    if isinstance(node, ast.Subscript):
+        return isinstance(node.slice, ast.Constant) and node.slice.value == "Body"
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get":
+        return bool(node.args) and isinstance(node.args[0], ast.Constant) and node.args[0].value == "Body"
+    return False
+
+
+class _Analyzer(ast.NodeVisitor):
+
+    def __init__(self):
+        self.aliases = {}
+        self.findings = []
+        self.function_stack = []
+        self.globals_stack = []
+        self.loop_depth = 0
+        self.body_names = set()
+
+    ############################
+    # Utilidades
+    ############################
+    def _add(self, rule, severity, node, message, suggestion):
+        self.findings.append(Finding(rule, severity, getattr(node, "lineno", 0), message, suggestion))
+
+    def _resolve(self, node):
+        """Resuelve el nombre completo de una llamada teniendo en cuenta los alias de import."""
+        name = _dotted_name(node)
+        if name is None:
+            return None
+        head, _, rest = name.partition(".")
+        head = self.aliases.get(head, head)
+        return f"{head}.{rest}" if rest else head
+
+    def _in_function(self):
+        return bool(self.function_stack)
+
+    def _in_handler(self):
+        return any("handler" in name for name in self.function_stack)
+
+    def _where(self):
+        return f"dentro de `{self.function_stack[-1]}`"
+
+    ############################
+    # Imports
+    ############################
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name.split(".")[0]] = alias.name if alias.asname else alias.name.split(".")[0]
+            self._check_heavy_import(alias.name, node)
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ""
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name] = f"{module}.{alias.name}" if module else alias.name
+        self._check_heavy_import(module, node)
+
+    def _check_heavy_import(self, module, node):
+        root = module.split(".")[0]
+        if root in HEAVY_MODULES and not self._in_function():
+            self._add(
+                "LP003", "media", node,
+                f"Import pesado a nivel de módulo: `{root}`",
+                "Se carga en cada cold start. Si solo se usa en algunos caminos, impórtalo dentro de la "
+                "función que lo necesita o sustitúyelo por una alternativa más ligera."
+            )
+
+    ############################
+    # Funciones y bucles
+    ############################
+    def _visit_function(self, node):
+        decorators = {(_dotted_name(d.func if isinstance(d, ast.Call) else d) or "").split(".")[-1]
+                      for d in node.decorator_list}
+        if decorators & CACHE_DECORATORS:
+            # Las funciones cacheadas solo crean sus recursos una vez por contenedor
+            return
+        declared_globals = {name for stmt in ast.walk(node) if isinstance(stmt, ast.Global) for name in stmt.names}
+        self.function_stack.append(node.name)
+        self.globals_stack.append(declared_globals)
+        self.generic_visit(node)
+        self.globals_stack.pop()
+        self.function_stack.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_For(self, node):
+        if self._in_function() and _is_records_iter(node.iter):
+            self._check_records_loop(node)
+        self.loop_depth += 1
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    visit_AsyncFor = visit_For
+
+    def _check_records_loop(self, node):
+        per_record_calls = []
+        for child in ast.walk(node):
+            if isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute):
+                if child.func.attr in BATCH_ALTERNATIVES:
+                    per_record_calls.append(child.func.attr)
+                elif self._resolve(child.func) in HTTP_ONE_SHOT_CALLS:
+                    per_record_calls.append(self._resolve(child.func))
+        if per_record_calls:
+            alternatives = sorted({
+                f"`{call}` → `{BATCH_ALTERNATIVES[call]}`" for call in per_record_calls if call in BATCH_ALTERNATIVES
+            })
+            self._add(
+                "LP005", "alta", node,
+                "Bucle síncrono sobre `Records` con una llamada de E/S por registro: "
+                + ", ".join(f"`{call}`" for call in sorted(set(per_record_calls))),
+                "Agrupa las llamadas con las APIs batch"
+                + (f" ({'; '.join(alternatives)})" if alternatives else "")
+                + " o reparte el trabajo de E/S con un ThreadPoolExecutor. Con SQS, devuelve "
+                "`batchItemFailures` para reintentar solo los mensajes fallidos."
+            )
+
+    ############################
+    # Asignaciones y llamadas
+    ############################
+    def visit_Assign(self, node):
+        if self._in_function() and _is_body_access(node.value):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.body_names.add(target.id)
+        if self._in_function() and isinstance(node.value, ast.Call):
+            targets = {t.id for t in node.targets if isinstance(t, ast.Name)}
+            if targets & self.globals_stack[-1]:
+                # Inicialización perezosa en una variable global: se reutiliza entre invocaciones
+                for arg in node.value.args:
+                    self.visit(arg)
+                return
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        name = self._resolve(node.func)
+        method = node.func.attr if isinstance(node.func, ast.Attribute) else None
+
+        if self._in_function() and name is not None:
+            severity = "alta" if self._in_handler() or self.loop_depth else "media"
+            if name in AWS_CLIENT_FACTORIES or (method in ("client", "resource") and "session" in name.lower()):
+                self._add(
+                    "LP001", severity, node,
+                    f"Cliente AWS creado {self._where()} (`{name}`)",
+                    "Crea el cliente una sola vez a nivel de módulo para reutilizar su pool de conexiones "
+                    "entre invocaciones del mismo contenedor."
+                )
+            elif name in DB_CONNECTION_FACTORIES:
+                self._add(
+                    "LP002", "alta", node,
+                    f"Conexión a base de datos abierta {self._where()} (`{name}`)",
+                    "Abre la conexión a nivel de módulo (o en una variable global inicializada una vez) y "
+                    "reutilízala; considera RDS Proxy para limitar el número de conexiones."
+                )
+            elif name in HTTP_POOL_FACTORIES:
+                self._add(
+                    "LP006", severity, node,
+                    f"Pool HTTP creado {self._where()} (`{name}`)",
+                    "Crea la sesión o el pool a nivel de módulo para mantener el keep-alive entre invocaciones."
+                )
+
+        if name in HTTP_ONE_SHOT_CALLS:
+            self._add(
+                "LP006", "media", node,
+                f"Llamada HTTP sin reutilizar conexiones (`{name}`)",
+                "Cada llamada abre una conexión TCP/TLS nueva. Usa una `requests.Session()` (o `httpx.Client`) "
+                "creada a nivel de módulo."
+            )
+
+        if method == "read" and not node.args and not node.keywords:
+            target = node.func.value
+            if _is_body_access(target) or (isinstance(target, ast.Name) and target.id in self.body_names):
+                self._add(
+                    "LP004", "alta", node,
+                    "Lectura completa de un objeto S3 en memoria (`Body.read()` sin límite)",
+                    "Procesa el objeto por partes con `Body.iter_chunks()` / `iter_lines()` o lee rangos "
+                    "(`Range`) para no depender del tamaño del fichero ni de la memoria configurada."
+                )
+
+        self.generic_visit(node)
+
+
+def analyze_handler(source):
+    """Analiza el código de un handler y devuelve la lista de hallazgos ordenada por línea."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as exc:
+        return [Finding(
+            "LP000", "alta", exc.lineno or 0,
+            f"El código no es Python válido: {exc.msg}",
+            "Corrige el error de sintaxis antes de analizar el rendimiento."
+        )]
+
+    analyzer = _Analyzer()
+    analyzer.visit(tree)
+    return sorted(analyzer.findings, key=lambda finding: (finding.line, finding.rule))
+
+
+def _module_level_calls(tree):
+    """Llamadas que se ejecutan durante el init (fuera de funciones y clases)."""
+    pending = [node for node in tree.body if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Call):
+            yield node
+        pending.extend(ast.iter_child_nodes(node))
+
+
+def check_cold_start_structure(source, handler_name="lambda_handler", snapstart=False):
+    """Comprueba que el handler sigue la estructura optimizada para el cold start.
+
+    Esa estructura es: handler definido a nivel de módulo, clientes y conexiones
+    creados una sola vez en el init, imports pesados diferidos y, con SnapStart,
+    conexiones restablecidas tras la restauración y sin valores únicos calculados
+    en el init. Devuelve los hallazgos de lo que no se cumple (vacío si la cumple).
+    """
+    findings = [finding for finding in analyze_handler(source) if finding.rule in STRUCTURE_RULES]
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return findings
+
+    if not any(isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == handler_name
+               for node in tree.body):
+        findings.append(Finding(
+            "LP007", "alta", 0,
+            f"No hay una función `{handler_name}` definida a nivel de módulo",
+            "El runtime de Lambda busca el handler como función de nivel superior del módulo."
+        ))
+
+    if snapstart:
+        analyzer = _Analyzer()
+        analyzer.visit(tree)
+        has_restore_hook = any(
+            (isinstance(node, ast.Name) and node.id == AFTER_RESTORE_HOOK)
+            or (isinstance(node, ast.Attribute) and node.attr == AFTER_RESTORE_HOOK)
+            for node in ast.walk(tree)
+        )
+        for call in _module_level_calls(tree):
+            name = analyzer._resolve(call.func)
+            if name in DB_CONNECTION_FACTORIES and not has_restore_hook:
+                findings.append(Finding(
+                    "LP008", "alta", call.lineno,
+                    f"Conexión abierta en el init sin restablecerla tras el snapshot (`{name}`)",
+                    "Con SnapStart la conexión queda congelada en el snapshot y llega cerrada a cada entorno "
+                    "restaurado. Vuelve a abrirla en una función decorada con "
+                    "`@register_after_restore` (paquete `snapshot_restore_py`)."
+                ))
+            elif name in UNIQUE_VALUE_CALLS:
+                findings.append(Finding(
+                    "LP009", "media", call.lineno,
+                    f"Valor único o dependiente del tiempo calculado en el init (`{name}`)",
+                    "Con SnapStart todos los entornos restaurados comparten ese valor. Calcúlalo dentro del "
+                    "handler o regenéralo con `@register_after_restore`."
+                ))
+
+    return sorted(findings, key=lambda finding: (finding.line, finding.rule))
+
+
+def format_findings(findings):
+    """Formatea los hallazgos como lista en texto (para la interfaz y los prompts)."""
+    return "\n".join(
+        f"- {SEVERITY_ICONS.get(f.severity, '')} [{f.rule}] Línea {f.line}: {f.message}. {f.suggestion}"
+        for f in findings
+    )
@@ -0,0 +1,192 @@
+"""Control del tamaño de los prompts: recuento de tokens, limpieza y troceado de handlers.
+
+Los tokens se cuentan con tiktoken si está instalado y, si no, con una
+aproximación de 4 caracteres por token. Antes de enviar un handler se eliminan
+los comentarios, los docstrings y el bloque `if __name__ == "__main__"`
+conservando la numeración de líneas, para que los hallazgos del análisis
+estático y las respuestas del modelo sigan apuntando a las líneas originales.
+Los handlers que aun así no caben se dividen por funciones de nivel superior.
+"""
+import ast
+import io
+import math
+import os
+import tokenize
+from functools import lru_cache
+
+from lambda_tools.config import DEFAULT_MODEL
+
+DEFAULT_PROMPT_BUDGET = int(os.getenv("LAMBDA_TOOLS_PROMPT_BUDGET", "8000"))
+CHARS_PER_TOKEN = 4
+FALLBACK_ENCODING = "o200k_base"
+TRUNCATION_MARKER = "# ... [truncado: {omitted} líneas omitidas]"
+# Parte del presupuesto de cada fragmento que puede ocupar el contexto de módulo
+PRELUDE_SHARE = 0.3
+
+############################
+# Recuento de tokens
+############################
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Número de tokens del texto para el modelo indicado (aproximado si no hay tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_budget(text, budget, model=DEFAULT_MODEL):
+    """Recorta el texto por líneas completas para que no supere `budget` tokens."""
+    if count_tokens(text, model) <= budget:
+        return text
+    lines = text.splitlines()
+    budget -= count_tokens(TRUNCATION_MARKER.format(omitted=len(lines)), model)
+    kept, used = [], 0
+    for line in lines:
+        used += count_tokens(line + "\n", model)
+        if used > budget:
+            break
+        kept.append(line)
+    kept.append(TRUNCATION_MARKER.format(omitted=len(lines) - len(kept)))
+    return "\n".join(kept) + "\n"
+
+############################
+# Limpieza
+############################
+def _docstring(node):
+    body = getattr(node, "body", None)
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        return body[0]
+    return None
+
+
+def _is_main_guard(node):
+    test = node.test if isinstance(node, ast.If) else None
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+            and any(isinstance(value, ast.Constant) and value.value == "__main__" for value in test.comparators))
+
+
+def strip_boilerplate(source):
+    """Elimina comentarios, docstrings y el bloque `__main__` sin cambiar la numeración de líneas."""
+    try:
+        tree = ast.parse(source)
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (SyntaxError, tokenize.TokenError):
+        return source
+
+    lines = source.splitlines()
+    for token in tokens:
+        if token.type == tokenize.COMMENT:
+            row, column = token.start
+            lines[row - 1] = lines[row - 1][:column]
+
+    def blank(start, end):
+        for row in range(start, end + 1):
+            lines[row - 1] = ""
+
+    def blank_node(node, replacement=""):
+        # Solo las columnas del nodo: en `def f(): """doc"""` la línea del def se conserva.
+        # Los offsets de ast son en bytes UTF-8
+        before = lines[node.lineno - 1].encode("utf-8")[:node.col_offset].decode("utf-8")
+        after = lines[node.end_lineno - 1].encode("utf-8")[node.end_col_offset:].decode("utf-8")
+        if not replacement:
+            after = after.lstrip().removeprefix(";").lstrip()
+        blank(node.lineno, node.end_lineno)
+        lines[node.lineno - 1] = before + replacement + after
+
+    for node in ast.walk(tree):
+        docstring = _docstring(node) if isinstance(
+            node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) else None
+        if docstring is not None:
+            # Si el cuerpo quedaría vacío se deja un `...` para que siga siendo Python válido
+            blank_node(docstring, "..." if len(node.body) == 1 else "")
+    for node in tree.body:
+        if _is_main_guard(node):
+            blank(node.lineno, node.end_lineno)
+
+    return "\n".join(line.rstrip() for line in lines).rstrip() + "\n"
+
+
+def strip_template(template):
+    """Quita los comentarios y las líneas vacías de un template SAM."""
+    return "\n".join(
+        line.rstrip() for line in template.splitlines() if line.strip() and not line.lstrip().startswith("#")
+    ) + "\n"
+
+############################
+# Troceado
+############################
+def _numbered(lines, start, end):
+    """Líneas [start, end] (1-indexadas) sin las vacías, precedidas de su rango."""
+    code = "\n".join(line for line in lines[start - 1:end] if line.strip())
+    return f"# Líneas {start}-{end}\n{code}\n"
+
+
+def split_handler(source):
+    """Divide el handler en el contexto de módulo y una pieza por función o clase de nivel superior.
+
+    Devuelve (contexto, piezas); cada pieza es {name, start, end, code} con las
+    líneas originales (decoradores incluidos). Si el código no compila, todo
+    el fichero es una única pieza.
+    """
+    lines = source.splitlines()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return "", [{"name": "<módulo>", "start": 1, "end": len(lines), "code": _numbered(lines, 1, len(lines))}]
+
+    pieces, covered = [], set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            pieces.append({"name": node.name, "start": start, "end": node.end_lineno,
+                           "code": _numbered(lines, start, node.end_lineno)})
+            covered.update(range(start, node.end_lineno + 1))
+
+    prelude = "\n".join(line for number, line in enumerate(lines, 1) if number not in covered and line.strip())
+    return prelude + "\n" if prelude else "", pieces
+
+
+def chunk_handler(source, budget=DEFAULT_PROMPT_BUDGET, model=DEFAULT_MODEL, extra_tokens=None):
+    """Agrupa las piezas del handler en fragmentos de como mucho `budget` tokens.
+
+    Cada fragmento lleva el contexto de módulo (imports y variables globales)
+    para que el modelo sepa qué clientes y conexiones hay en el init. Las piezas
+    que por sí solas no caben se recortan. `extra_tokens(pieza)` permite sumar
+    lo que el llamador añadirá por cada pieza (por ejemplo, sus hallazgos).
+    Devuelve [{names, ranges, code}].
+    """
+    prelude, pieces = split_handler(source)
+    prelude = truncate_to_budget(prelude, int(budget * PRELUDE_SHARE), model) if prelude else ""
+    available = budget - count_tokens(prelude, model)
+
+    chunks, current, used = [], [], 0
+    for piece in pieces:
+        extra = extra_tokens(piece) if extra_tokens else 0
+        code = truncate_to_budget(piece["code"], max(available - extra, 0), model)
+        size = count_tokens(code, model) + extra
+        if current and used + size > available:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(dict(piece, code=code))
+        used += size
+    if current:
+        chunks.append(current)
+
+    return [{
+        "names": [piece["name"] for piece in chunk],
+        "ranges": [(piece["start"], piece["end"]) for piece in chunk],
+        "code": prelude + "\n" + "\n".join(piece["code"] for piece in chunk)
+    } for chunk in chunks] or [{"names": [], "ranges": [], "code": prelude}]
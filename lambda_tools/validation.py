@@ -0,0 +1,178 @@
+"""Validación local del handler generado antes de ofrecer su descarga.
+
+Etapas: análisis sintáctico (AST), compilación, importación en un proceso
+aislado con boto3 simulado, una invocación de prueba con un evento sintético
+del trigger y una comprobación del tiempo frente al `timeout` configurado. Las
+etapas estáticas se ejecutan en el proceso actual mientras el proceso aislado
+(el mismo runner que el benchmark) importa e invoca el handler, así que la
+validación dura lo que tarda ese proceso. Si alguna etapa falla, se puede
+pedir al modelo que corrija el código con el error, hasta un número de intentos.
+"""
+import ast
+import os
+import re
+import sys
+import time
+
+from lambda_tools.bench import build_sample_event, run_handler
+from lambda_tools.cache import cached_invoke
+from lambda_tools.power_tuning import cpu_share
+from lambda_tools.prompts import build_repair_prompt, extract_python_code
+
+STAGES = {
+    "parse": "🌳 Análisis sintáctico (AST)",
+    "compile": "⚙️ Compilación",
+    "import": "📦 Importación en sandbox",
+    "invoke": "🧪 Invocación de prueba",
+    "timing": "⏱️ Tiempo frente al timeout"
+}
+OK, WARNING, FAILED, SKIPPED = "ok", "warning", "failed", "skipped"
+STATUS_ICONS = {OK: "✅", WARNING: "⚠️", FAILED: "❌", SKIPPED: "⏭️"}
+DEFAULT_MAX_REPAIRS = int(os.getenv("LAMBDA_TOOLS_MAX_REPAIRS", "2"))
+# Espera máxima de la invocación de prueba aunque el timeout configurado sea mayor
+MAX_SANDBOX_SECONDS = 30
+SANDBOX_MARGIN_SECONDS = 10
+# Con boto3 simulado, las respuestas de AWS son mocks: solo los errores que no
+# pueden deberse a ellos indican un fallo del código
+CODE_ERRORS = ("NameError", "UnboundLocalError", "SyntaxError", "IndentationError", "ImportError",
+               "ModuleNotFoundError", "RecursionError")
+MISSING_MODULE = re.compile(r"No module named '([\w.]+)'")
+TIMEOUT_WARNING_RATIO = 0.8
+
+
+def _stage(name, status, detail="", ms=None):
+    return {"stage": name, "label": STAGES[name], "status": status, "detail": detail,
+            "ms": round(ms, 1) if ms is not None else None}
+
+
+def _elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+############################
+# Etapas
+############################
+def _static_stages(source, handler_name):
+    """Análisis sintáctico y compilación, en el proceso actual."""
+    started = time.perf_counter()
+    try:
+        tree = ast.parse(source, "handler.py")
+    except SyntaxError as exc:
+        return [_stage("parse", FAILED, f"Línea {exc.lineno}: {exc.msg}", _elapsed_ms(started)),
+                _stage("compile", SKIPPED)]
+    defined = any(isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == handler_name
+                  for node in tree.body)
+    stages = [_stage("parse", OK if defined else FAILED,
+                     "" if defined else f"No se define la función `{handler_name}` a nivel de módulo",
+                     _elapsed_ms(started))]
+
+    started = time.perf_counter()
+    try:
+        compile(tree, "handler.py", "exec")
+    except (SyntaxError, ValueError) as exc:
+        stages.append(_stage("compile", FAILED, str(exc), _elapsed_ms(started)))
+    else:
+        stages.append(_stage("compile", OK, ms=_elapsed_ms(started)))
+    return stages
+
+
+def _missing_third_party(error):
+    match = MISSING_MODULE.search(error or "")
+    if match and match.group(1).split(".")[0] not in sys.stdlib_module_names:
+        return match.group(1)
+    return None
+
+
+def _sandbox_stages(source, trigger, config, handler_name):
+    """Importación, invocación de prueba y tiempo, en un proceso aislado con boto3 simulado."""
+    timeout_s = config.get("timeout", 30)
+    memory_mb = config.get("memory", 128)
+    wait_s = min(timeout_s, MAX_SANDBOX_SECONDS)
+    run = run_handler(source, build_sample_event(trigger, config), 0, memory_mb, timeout_s, aws="stub",
+                      handler_name=handler_name, max_seconds=wait_s + SANDBOX_MARGIN_SECONDS)
+
+    if run.get("timed_out"):
+        detail = f"El handler no terminó en {wait_s} s"
+        return [_stage("import", SKIPPED, "Sin resultado: el proceso no terminó"),
+                _stage("invoke", SKIPPED, "Sin resultado: el proceso no terminó"),
+                _stage("timing", FAILED if wait_s >= timeout_s else WARNING,
+                       f"{detail} (timeout configurado: {timeout_s} s)")]
+
+    if run.get("init_ms") is None:
+        missing = _missing_third_party(run.get("error"))
+        if missing:
+            import_stage = _stage("import", WARNING, f"`{missing}` no está instalado en local: no se puede importar "
+                                                     "el handler (añádelo al requirements.txt)")
+        else:
+            import_stage = _stage("import", FAILED, run.get("error") or "El handler no se pudo importar")
+        return [import_stage, _stage("invoke", SKIPPED), _stage("timing", SKIPPED)]
+
+    stages = [_stage("import", OK, ms=run["init_ms"])]
+    error = run.get("error")
+    if not error:
+        stages.append(_stage("invoke", OK, f"Evento sintético de {trigger}", run["cold_ms"]))
+    elif error.split(":")[0] in CODE_ERRORS and not _missing_third_party(error):
+        stages.append(_stage("invoke", FAILED, error, run["cold_ms"]))
+    else:
+        stages.append(_stage("invoke", WARNING, f"{error} (puede deberse a las respuestas simuladas de AWS)",
+                             run["cold_ms"]))
+
+    # En Lambda la parte de CPU se ralentiza si la memoria no da una vCPU completa
+    measured_ms = run["init_ms"] + run["cold_ms"]
+    cpu_ms = min(run["cold_ms"], run.get("cold_cpu_ms") or 0)
+    estimated_ms = measured_ms - cpu_ms + cpu_ms / cpu_share(memory_mb)
+    timeout_ms = timeout_s * 1000
+    detail = f"{measured_ms:.0f} ms en local, hasta {estimated_ms:.0f} ms con {memory_mb} MB (timeout: {timeout_s} s)"
+    if measured_ms > timeout_ms:
+        stages.append(_stage("timing", FAILED, detail, measured_ms))
+    elif estimated_ms > timeout_ms * TIMEOUT_WARNING_RATIO:
+        stages.append(_stage("timing", WARNING, detail, measured_ms))
+    else:
+        stages.append(_stage("timing", OK, detail, measured_ms))
+    return stages
+
+
+def validate_handler(source, trigger, config=None, handler_name=None):
+    """Ejecuta todas las etapas de validación y devuelve {stages, passed, seconds}.
+
+    `passed` es falso solo si alguna etapa ha fallado; los avisos (dependencias
+    no instaladas, errores que pueden venir de los mocks de AWS) no bloquean.
+    """
+    config = config or {}
+    handler_name = handler_name or config.get("handler_name", "lambda_handler")
+    started = time.perf_counter()
+    # Las etapas estáticas tardan milisegundos: el proceso aislado solo se lanza si el código
+    # compila, para no esperar un timeout completo por cada intento con un error de sintaxis
+    stages = _static_stages(source, handler_name)
+    if stages[1]["status"] != OK:
+        stages += [_stage(name, SKIPPED, "El código no compila") for name in ("import", "invoke", "timing")]
+    else:
+        stages += _sandbox_stages(source, trigger, config, handler_name)
+    return {
+        "stages": stages,
+        "passed": all(stage["status"] != FAILED for stage in stages),
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+
+def failed_stages(report):
+    """Etapas fallidas de un informe de validación."""
+    return [stage for stage in report["stages"] if stage["status"] == FAILED]
+
+############################
+# Corrección automática
+############################
+def validate_and_repair(llm, code, trigger, config=None, max_repairs=DEFAULT_MAX_REPAIRS, on_attempt=None):
+    """Valida el código y, si falla, pide al modelo que lo corrija hasta `max_repairs` veces.
+
+    `on_attempt(intento, código, informe)` se llama tras cada validación.
+    Devuelve (código, informe, intentos) con la última versión del código.
+    """
+    attempt = 0
+    while True:
+        report = validate_handler(code, trigger, config)
+        if on_attempt is not None:
+            on_attempt(attempt, code, report)
+        if report["passed"] or attempt >= max_repairs:
+            return code, report, attempt
+        attempt += 1
+        code = extract_python_code(cached_invoke(llm, build_repair_prompt(code, failed_stages(report))))
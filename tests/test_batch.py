@@ -0,0 +1,92 @@
+import asyncio
+import types
+
+import pytest
+
+from lambda_tools import batch
+from lambda_tools.batch import TokenBucket, is_rate_limit_error
+
+
+class Clock:
+    """Reloj simulado: `sleep` avanza el tiempo en lugar de esperar."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(batch, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(batch.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def acquire_many(bucket, count):
+    async def run():
+        for _ in range(count):
+            await bucket.acquire()
+    asyncio.run(run())
+
+
+def test_burst_up_to_capacity_does_not_wait(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    acquire_many(bucket, 3)
+    assert clock.sleeps == []
+    assert bucket.tokens == 0
+
+
+def test_tokens_are_emitted_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=1)
+    acquire_many(bucket, 5)
+    # Tras el primer token, cada petición espera 1 / rate segundos
+    assert clock.sleeps == pytest.approx([0.5] * 4)
+    assert clock.now == pytest.approx(102.0)
+
+
+def test_refill_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    acquire_many(bucket, 2)
+    clock.now += 60
+    bucket._refill(clock.now)
+    assert bucket.tokens == 2
+
+
+def test_pause_blocks_until_deadline(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(5)
+    assert bucket.tokens == 0
+    acquire_many(bucket, 1)
+    assert clock.sleeps[0] == pytest.approx(5)
+    assert clock.now >= 105
+
+
+def test_pause_keeps_the_longest_deadline(clock):
+    bucket = TokenBucket(rate=1)
+    bucket.pause(10)
+    bucket.pause(2)
+    assert bucket.paused_until == pytest.approx(110)
+
+
+def test_default_capacity_allows_at_least_one_token():
+    assert TokenBucket(rate=0.5).capacity == 1.0
+    assert TokenBucket(rate=4).capacity == 4
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (types.SimpleNamespace(status_code=429), True),
+    (types.SimpleNamespace(response=types.SimpleNamespace(status_code=429)), True),
+    (type("RateLimitError", (Exception,), {})(), True),
+    (types.SimpleNamespace(status_code=500), False),
+    (ValueError("x"), False),
+])
+def test_is_rate_limit_error(exc, expected):
+    assert is_rate_limit_error(exc) is expected
@@ -0,0 +1,96 @@
+import asyncio
+import types
+
+import pytest
+
+from lambda_tools import cache as cache_module
+from lambda_tools.cache import ResponseCache, acached_invoke, cached_invoke, make_cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class FakeLLM:
+    model_name = "fake"
+    temperature = 0
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, prompt):
+        self.calls.append(prompt)
+        return types.SimpleNamespace(content=f"respuesta a {prompt}")
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+def test_key_depends_on_prompt_model_and_temperature():
+    key = make_cache_key("prompt", "gpt-4o-mini", 0.2)
+    assert key == make_cache_key("prompt", "gpt-4o-mini", 0.2)
+    assert key != make_cache_key("prompt", "gpt-4o", 0.2)
+    assert key != make_cache_key("prompt", "gpt-4o-mini", 0.7)
+    assert key != make_cache_key("otro", "gpt-4o-mini", 0.2)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(":memory:", ttl_seconds=60)
+    cache.set("a", "uno")
+    clock.now += 59
+    assert cache.get("a") == "uno"
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 0}
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ResponseCache(":memory:", max_entries=2, ttl_seconds=0)
+    cache.set("a", "uno")
+    clock.now += 1
+    cache.set("b", "dos")
+    clock.now += 1
+    # Leer "a" la convierte en la más reciente: al llenar la caché sale "b"
+    assert cache.get("a") == "uno"
+    clock.now += 1
+    cache.set("c", "tres")
+    assert cache.get("b") is None
+    assert cache.get("a") == "uno"
+    assert cache.get("c") == "tres"
+
+
+def test_set_replaces_existing_entry(clock):
+    cache = ResponseCache(":memory:")
+    cache.set("a", "uno")
+    cache.set("a", "otro")
+    assert cache.get("a") == "otro"
+    assert cache.stats()["entries"] == 1
+
+
+def test_cached_invoke_calls_the_model_once():
+    cache = ResponseCache(":memory:")
+    llm = FakeLLM()
+    assert cached_invoke(llm, "hola", cache) == "respuesta a hola"
+    assert cached_invoke(llm, "hola", cache) == "respuesta a hola"
+    assert llm.calls == ["hola"]
+    cached_invoke(llm, "hola", cache, refresh=True)
+    assert llm.calls == ["hola", "hola"]
+
+
+def test_acached_invoke_shares_entries_with_cached_invoke():
+    cache = ResponseCache(":memory:")
+    llm = FakeLLM()
+    assert asyncio.run(acached_invoke(llm, "hola", cache)) == "respuesta a hola"
+    assert cached_invoke(llm, "hola", cache) == "respuesta a hola"
+    assert llm.calls == ["hola"]
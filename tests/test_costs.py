@@ -0,0 +1,49 @@
+import numpy as np
+
+from lambda_tools.costs import pareto_front
+
+
+def brute_force_front(cost, time, mask):
+    front = np.zeros(len(cost), dtype=bool)
+    for i in np.flatnonzero(mask):
+        front[i] = not any(
+            mask[j] and cost[j] <= cost[i] and time[j] <= time[i] and (cost[j] < cost[i] or time[j] < time[i])
+            for j in range(len(cost))
+        )
+    return front
+
+
+def test_simple_front():
+    cost = [1, 2, 3, 4]
+    time = [10, 5, 7, 1]
+    assert pareto_front(cost, time).tolist() == [True, True, False, True]
+
+
+def test_mask_excludes_points():
+    cost = [1, 2, 3]
+    time = [10, 5, 1]
+    # Sin el punto más rápido, el de coste 2 pasa a cerrar el frente
+    assert pareto_front(cost, time, mask=[True, True, False]).tolist() == [True, True, False]
+    assert not pareto_front(cost, time, mask=[False, False, False]).any()
+
+
+def test_ties_keep_a_single_point():
+    cost = [1, 1, 2]
+    time = [5, 3, 3]
+    assert pareto_front(cost, time).tolist() == [False, True, False]
+    assert pareto_front([1, 1], [2, 2]).sum() == 1
+
+
+def test_infinite_times_are_dominated():
+    cost = [1, 2]
+    time = [np.inf, 4]
+    assert pareto_front(cost, time).tolist() == [False, True]
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        cost = rng.random(40)
+        time = rng.random(40)
+        mask = rng.random(40) > 0.2
+        assert (pareto_front(cost, time, mask) == brute_force_front(cost, time, mask)).all()
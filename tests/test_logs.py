@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+
+from lambda_tools import logs
+from lambda_tools.logs import _iter_array_items, _parse_report, analyze_cloudwatch_logs
+
+TEXT_REPORT = (
+    "REPORT RequestId: 8f5e1c2a-1111-2222-3333-444455556666\tDuration: 102.35 ms\t"
+    "Billed Duration: 103 ms\tMemory Size: 512 MB\tMax Memory Used: 87 MB\tInit Duration: 245.10 ms\t\n"
+)
+JSON_REPORT = json.dumps({
+    "time": "2024-05-01T10:00:00Z",
+    "type": "platform.report",
+    "record": {
+        "requestId": "8f5e1c2a",
+        "metrics": {
+            "durationMs": 12.5,
+            "billedDurationMs": 13,
+            "memorySizeMB": 256,
+            "maxMemoryUsedMB": 70
+        }
+    }
+}) + "\n"
+
+
+@pytest.mark.parametrize("chunk_size", [4, 7, 64, 1024 * 1024])
+def test_iter_array_items_across_chunk_boundaries(monkeypatch, chunk_size):
+    monkeypatch.setattr(logs, "READ_CHUNK_SIZE", chunk_size)
+    items = [{"Id": f"1-{index}", "Segments": [{"Document": "{\"a\": [1, 2]}"}]} for index in range(5)]
+    text = io.StringIO(json.dumps({"Padding": "x" * 30, "Traces": items, "NextToken": None}, indent=2))
+    assert list(_iter_array_items(text, "Traces")) == items
+
+
+def test_iter_array_items_missing_key_or_empty_array():
+    assert list(_iter_array_items(io.StringIO('{"Other": [1, 2]}'), "Traces")) == []
+    assert list(_iter_array_items(io.StringIO('{"Traces": [ ]}'), "Traces")) == []
+
+
+def test_iter_array_items_stops_on_truncated_input():
+    text = io.StringIO('{"Traces": [{"Id": 1}, {"Id": 2}, {"Id"')
+    assert list(_iter_array_items(text, "Traces")) == [{"Id": 1}, {"Id": 2}]
+
+
+def test_parse_text_report():
+    assert _parse_report(TEXT_REPORT) == {
+        "duration": 102.35,
+        "billed_duration": 103.0,
+        "memory_size": 512.0,
+        "max_memory_used": 87.0,
+        "init_duration": 245.10
+    }
+
+
+def test_parse_text_report_without_cold_start():
+    report = _parse_report(TEXT_REPORT.replace("\tInit Duration: 245.10 ms", ""))
+    assert "init_duration" not in report
+    assert report["duration"] == 102.35
+
+
+def test_parse_json_platform_report():
+    assert _parse_report(JSON_REPORT) == {
+        "duration": 12.5,
+        "billed_duration": 13.0,
+        "memory_size": 256.0,
+        "max_memory_used": 70.0
+    }
+
+
+@pytest.mark.parametrize("line", [
+    "START RequestId: 8f5e1c2a Version: $LATEST\n",
+    "[ERROR] ValueError: REPORT de prueba\n",
+    '{"type": "platform.report", "record": "no es un objeto"\n',
+])
+def test_non_report_lines(line):
+    assert _parse_report(line) is None
+
+
+def test_analyze_cloudwatch_logs_counts_reports_timeouts_and_errors():
+    lines = [
+        TEXT_REPORT,
+        JSON_REPORT,
+        "2024-05-01T10:00:01Z 8f5e1c2a Task timed out after 3.00 seconds\n",
+        "[ERROR] KeyError: 'body'\n",
+        "INFO procesado\n",
+    ]
+    stats = analyze_cloudwatch_logs(iter(lines))
+    assert stats["lines"] == 5
+    assert stats["invocations"] == 2
+    assert stats["cold_starts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["errors"] == 1
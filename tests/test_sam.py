@@ -0,0 +1,142 @@
+import pytest
+import yaml
+
+from lambda_tools.sam import (
+    generate_project_template, generate_sam_template, snapstart_blocker, snapstart_enabled, trigger_errors,
+    validate_config
+)
+
+BASE = {
+    "trigger_type": "API Gateway", "handler_name": "lambda_handler", "memory": 512, "timeout": 30,
+    "runtime": "python3.12", "architecture": "arm64"
+}
+
+
+def config(**overrides):
+    return {**BASE, **overrides}
+
+
+def test_snapstart_allowed_on_supported_runtime():
+    assert snapstart_blocker(config()) is None
+    assert snapstart_blocker(config(runtime="python3.13")) is None
+    assert snapstart_enabled(config(cold_start={"enabled": True}))
+
+
+@pytest.mark.parametrize("overrides, reason", [
+    ({"runtime": "python3.11"}, "python3.12"),
+    ({"runtime": "python3.9"}, "python3.12"),
+    ({"runtime": "python4.0"}, "python3.12"),
+    ({"deployment": {"type": "container"}}, "contenedor"),
+    ({"concurrency": {"provisioned": 2}}, "Provisioned Concurrency"),
+])
+def test_snapstart_blockers(overrides, reason):
+    blocker = snapstart_blocker(config(**overrides))
+    assert blocker is not None and reason in blocker
+    assert not snapstart_enabled(config(cold_start={"enabled": True}, **overrides))
+
+
+def test_snapstart_ignores_zero_provisioned_and_zip_deployments():
+    assert snapstart_blocker(config(concurrency={"provisioned": 0}, deployment={"type": "zip"})) is None
+
+
+def autoscaling(**overrides):
+    return {"enabled": True, "max": 8, **overrides}
+
+
+def test_valid_concurrency_configuration():
+    concurrency = {"reserved": 10, "provisioned": 2, "autoscaling": autoscaling(windows=[
+        {"name": "mañanas", "start": "cron(0 8 * * ? *)", "end": "cron(0 20 * * ? *)", "min": 4, "max": 8}
+    ])}
+    assert validate_config(config(concurrency=concurrency)) == []
+
+
+@pytest.mark.parametrize("concurrency, message", [
+    ({"reserved": 950}, "no puede superar 900"),
+    ({"reserved": 5, "provisioned": 6}, "no puede superar la reserved"),
+    ({"autoscaling": autoscaling()}, "al menos 1"),
+    ({"provisioned": 4, "autoscaling": autoscaling(max=2)}, "es menor que la provisioned"),
+    ({"reserved": 6, "provisioned": 2, "autoscaling": autoscaling()}, "supera la reserved"),
+    ({"provisioned": 2, "autoscaling": autoscaling(target_utilization=0.95)}, "entre 0.1 y 0.9"),
+    ({"provisioned": 2, "autoscaling": autoscaling(windows=[{"start": "08:00", "end": "cron(0 20 * * ? *)"}])},
+     "cron() o at()"),
+    ({"provisioned": 2, "autoscaling": autoscaling(windows=[
+        {"start": "cron(0 8 * * ? *)", "end": "cron(0 20 * * ? *)", "min": 6, "max": 3}
+    ])}, "supera al máximo"),
+])
+def test_concurrency_errors(concurrency, message):
+    errors = validate_config(config(concurrency=concurrency))
+    assert any(message in error for error in errors), errors
+
+
+def test_disabled_autoscaling_is_not_validated():
+    assert validate_config(config(concurrency={"autoscaling": {"enabled": False, "max": 0}})) == []
+
+
+def test_autoscaling_resources_in_template():
+    template = yaml.safe_load(generate_sam_template(config(
+        concurrency={"reserved": 10, "provisioned": 2, "autoscaling": autoscaling()}
+    )))
+    resources = template["Resources"]
+    assert resources["ProvisionedConcurrencyScalableTarget"]["Properties"]["MinCapacity"] == 2
+    assert resources["ProvisionedConcurrencyScalableTarget"]["Properties"]["MaxCapacity"] == 8
+    assert resources["MyFunction"]["Properties"]["AutoPublishAlias"] == "live"
+
+
+def test_project_template_rejects_function_concurrency():
+    project = {
+        "name": "pedidos",
+        "globals": {"memory": 256, "timeout": 30, "runtime": "python3.12", "architecture": "arm64"},
+        "functions": [
+            {"name": "alta", "trigger_type": "SNS"},
+            {"name": "cola", "trigger_type": "SQS", "concurrency": {"provisioned": 2, "autoscaling": autoscaling()}}
+        ],
+        "layer_requirements": []
+    }
+    with pytest.raises(ValueError, match="cola"):
+        generate_project_template(project)
+
+    project["functions"].pop()
+    resources = yaml.safe_load(generate_project_template(project))["Resources"]
+    assert "AltaFunction" in resources
+    assert not any("Scaling" in name for name in resources)
+
+
+@pytest.mark.parametrize("trigger", [
+    {"trigger_type": "API Gateway", "route": "/pedidos", "http_method": "post"},
+    {"trigger_type": "S3 Upload", "bucket_name": "mi-bucket"},
+    {"trigger_type": "SNS"},
+    {"trigger_type": "SQS", "queue_arn": "arn:aws:sqs:eu-west-1:123456789012:pedidos"},
+    {"trigger_type": "Scheduled Event", "schedule": "rate(5 minutes)"},
+])
+def test_valid_triggers(trigger):
+    assert trigger_errors(trigger) == []
+
+
+@pytest.mark.parametrize("trigger, message", [
+    ({}, "Falta el trigger"),
+    ({"trigger_type": "Kinesis"}, "Trigger no soportado"),
+    ({"trigger_type": "S3 Upload"}, "bucket_name"),
+    ({"trigger_type": "API Gateway", "route": "pedidos"}, "debe empezar por"),
+    ({"trigger_type": "API Gateway", "http_method": "FETCH"}, "Método HTTP no soportado"),
+    ({"trigger_type": "Scheduled Event", "schedule": "cada 5 minutos"}, "rate(...) o cron(...)"),
+    ({"trigger_type": "SNS", "topic_arn": "pedidos"}, "topic SNS"),
+    ({"trigger_type": "SQS", "queue_arn": "pedidos"}, "cola SQS"),
+])
+def test_trigger_errors(trigger, message):
+    errors = trigger_errors(trigger)
+    assert len(errors) == 1 and message in errors[0], errors
+
+
+def test_validate_config_checks_trigger_unless_disabled():
+    shared = {key: value for key, value in BASE.items() if key != "trigger_type"}
+    assert any("Falta el trigger" in error for error in validate_config(shared))
+    assert validate_config(shared, trigger=False) == []
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"runtime": "python3.8"}, "obsoleto"),
+    ({"runtime": "python2.7"}, "Runtime no soportado"),
+    ({"architecture": "ppc64"}, "Arquitectura no soportada"),
+])
+def test_validate_config_runtime_and_architecture(overrides, message):
+    assert any(message in error for error in validate_config(config(**overrides)))
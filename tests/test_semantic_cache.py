@@ -0,0 +1,53 @@
+import pytest
+
+from lambda_tools.cache import ResponseCache
+from lambda_tools.semantic_cache import HashingEmbedder, SemanticCache, compatible
+
+STORED = "Convertir archivos CSV en JSON"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    responses = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+    responses.set("key", "codigo")
+    semantic = SemanticCache(path=str(tmp_path / "index.npz"), embedder=HashingEmbedder(), response_cache=responses)
+    semantic.add(STORED, "scope", "key")
+    return semantic
+
+
+@pytest.mark.parametrize("description", [
+    "convertir archivos csv en JSON",
+    "Convierte archivos CSV a JSON",
+    "Convertir los ficheros CSV a JSON",
+    "Convertir archivos CSV en formato JSON"
+])
+def test_paraphrase_hits(cache, description):
+    match = cache.lookup(description, "scope")
+    assert match is not None
+    assert match["content"] == "codigo"
+
+
+@pytest.mark.parametrize("description", [
+    "Convertir archivos JSON a CSV",
+    "Leer pedidos de la cola y borrarlos en DynamoDB",
+    "Generar un informe semanal en PDF"
+])
+def test_different_request_misses(cache, description):
+    assert cache.lookup(description, "scope") is None
+
+
+def test_other_scope_misses(cache):
+    assert cache.lookup(STORED, "other") is None
+
+
+def test_guard_checks_numbers_and_format_order():
+    assert compatible("Redimensionar imágenes a 200px", "redimensiona las imagenes a 200 px")
+    assert compatible("Redimensionar imágenes a 200px", "Redimensionar fotos a 200px")
+    assert not compatible("Redimensionar imágenes a 200px", "Redimensionar imágenes a 800px")
+    assert not compatible("CSV a JSON", "JSON a CSV")
+
+
+def test_stale_entries_are_dropped(cache):
+    cache.response_cache.clear()
+    assert cache.lookup(STORED, "scope") is None
+    assert cache.stats()["entries"] == 0
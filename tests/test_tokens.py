@@ -0,0 +1,83 @@
+import ast
+
+from lambda_tools.tokens import strip_boilerplate, strip_template
+
+SOURCE = '''"""Docstring del módulo."""
+import json  # comentario
+
+
+def handler(event, context):
+    """Docstring del handler.
+
+    Ocupa varias líneas.
+    """
+    # comentario de línea completa
+    body = json.loads(event["body"])
+    return {"statusCode": 200, "body": json.dumps(body)}
+
+
+class Repo:
+    """Solo docstring."""
+
+
+if __name__ == "__main__":
+    handler({}, None)
+'''
+
+
+def assert_same_positions(original, stripped, snippets):
+    original_lines = original.splitlines()
+    stripped_lines = stripped.splitlines()
+    for snippet in snippets:
+        row = next(i for i, line in enumerate(original_lines) if snippet in line)
+        assert snippet in stripped_lines[row]
+
+
+def test_removes_comments_docstrings_and_main_guard():
+    stripped = strip_boilerplate(SOURCE)
+    assert "Docstring" not in stripped
+    assert "comentario" not in stripped
+    assert "__main__" not in stripped
+    ast.parse(stripped)
+
+
+def test_preserves_line_numbers():
+    stripped = strip_boilerplate(SOURCE)
+    assert_same_positions(SOURCE, stripped, [
+        "import json", "def handler", "body = json.loads", "return {", "class Repo"
+    ])
+
+
+def test_one_line_docstring_body_becomes_ellipsis():
+    source = 'def f(): """doc"""\nx = 1\n'
+    stripped = strip_boilerplate(source)
+    assert stripped.splitlines() == ["def f(): ...", "x = 1"]
+    ast.parse(stripped)
+
+
+def test_docstring_followed_by_statement_on_same_line():
+    source = 'def f():\n    """doc"""; return 1\n'
+    stripped = strip_boilerplate(source)
+    assert stripped.splitlines() == ["def f():", "    return 1"]
+    ast.parse(stripped)
+
+
+def test_keeps_hash_inside_strings():
+    source = 'url = "https://x/#frag"  # comentario\n'
+    assert strip_boilerplate(source) == 'url = "https://x/#frag"\n'
+
+
+def test_non_ascii_before_docstring():
+    source = 'class Año: """doc"""\n'
+    stripped = strip_boilerplate(source)
+    assert stripped == "class Año: ...\n"
+
+
+def test_invalid_source_is_returned_unchanged():
+    source = "def f(:\n    pass  # comentario\n"
+    assert strip_boilerplate(source) == source
+
+
+def test_strip_template_drops_comments_and_blank_lines():
+    template = "# cabecera\nResources:\n\n  Fn:  # inline se conserva\n    Type: X   \n"
+    assert strip_template(template) == "Resources:\n  Fn:  # inline se conserva\n    Type: X\n"